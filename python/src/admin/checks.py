@@ -31,7 +31,6 @@ from admin.server_context import ctx
 from config import config
 from game_board.board import overlay_grid
 from hardware import camera
-from processing import warp_image
 from scrabblewatch import ScrabbleWatch
 from state import GameState, State
 from utils import upload
@@ -69,8 +68,7 @@ def do_test_display():
 @admin_test_bp.route('/test_analyze')
 def do_test_analyze():  # pylint: disable=too-many-locals
     """start simple analyze test"""
-    from analyzer import ANALYZE_THREADS, analyze
-    from customboard import filter_image
+    from analyzer import ANALYZE_THREADS
     from scrabble import board_to_string
 
     if State.ctx.current_state in (GameState.START, GameState.EOG, GameState.P0, GameState.P1):
@@ -82,11 +80,9 @@ def do_test_analyze():  # pylint: disable=too-many-locals
         img = camera.cam.read(peek=True)
 
         start = perf_counter()
-        warped, warped_gray = warp_image(img)
-        _, tiles_candidates = filter_image(warped)
-
-        board = {}
-        board = analyze(warped_gray, board, tiles_candidates)
+        frame = State.ctx.game.frames.get(img)
+        warped, _ = frame.warp()
+        board = frame.analyze({}, frame.tiles_candidates())
         logger.info(f'analyze took {(perf_counter() - start):.4f} sec(s). ({ANALYZE_THREADS} threads)')
 
         logger.info(f'\n{board_to_string(board)}')
@@ -116,8 +112,10 @@ def do_test_upload():
     """is ftp accessible"""
 
     logger.info('test upload config entries')
-    if upload.upload_config.server is None:
+    if upload.upload_config.server is None and upload.upload_config.hub is None:
         logger.info('  no server entry found')
+    if upload.upload_config.hub is not None:
+        logger.info(f'  upload to hub {upload.upload_config.hub} as table {upload.upload_config.table}')
     if upload.upload_config.user in (None, ''):
         logger.info('  no user entry found')
     if upload.upload_config.password in (None, ''):
@@ -35,7 +35,7 @@ from processing import (
 )
 from scrabble import MoveType
 from state import GameState, State
-from utils.threadpool import Command, command_queue
+from utils.threadpool import Command, Lane, command_queue
 
 logger = logging.getLogger()
 admin_edit_bp = Blueprint('admin_edit', __name__)
@@ -65,7 +65,7 @@ def handle_btnblanko(form, game):
     if coord and is_blanko(char):
         char = char.lower()
         flash_and_log(f'set blanko: {coord} = {char}')
-        command_queue.put_nowait(Command(set_blankos, game, coord, char, State.ctx.op_event))
+        command_queue.put_nowait(Command(set_blankos, game, coord, char, State.ctx.op_event, lane=Lane.ADMIN))
     else:
         flash_and_log('invalid character for blanko')
 
@@ -75,14 +75,14 @@ def handle_btnblankodelete(form, game):
     coord = form.get('coord')
     if coord:
         flash_and_log(f'delete blanko: {coord}')
-        command_queue.put_nowait(Command(remove_blanko, game, coord, State.ctx.op_event))
+        command_queue.put_nowait(Command(remove_blanko, game, coord, State.ctx.op_event, lane=Lane.ADMIN))
 
 
 def handle_btninsmoves(game, move_number):
     """handle insert exchange moves"""
     if move_number is not None and (0 <= move_number < len(game.moves)):
         flash_and_log(f'insert two exchanges before move# {move_number}')
-        command_queue.put_nowait(Command(admin_insert_moves, game, move_number, State.ctx.op_event))
+        command_queue.put_nowait(Command(admin_insert_moves, game, move_number, State.ctx.op_event, lane=Lane.ADMIN))
     else:
         flash_and_log(f'invalid move {move_number}')
 
@@ -90,7 +90,9 @@ def handle_btninsmoves(game, move_number):
 def handle_btnexchange(game, move_number):
     """handle toggle regular move to exchange move"""
     if move_number is not None and (0 <= move_number < len(game.moves)):
-        command_queue.put_nowait(Command(admin_change_move, game, move_number, MoveType.EXCHANGE, event=State.ctx.op_event))
+        command_queue.put_nowait(
+            Command(admin_change_move, game, move_number, MoveType.EXCHANGE, event=State.ctx.op_event, lane=Lane.ADMIN)
+        )
         flash_and_log(f'change move {move_number} to exchange')
     else:
         flash_and_log(f'invalid move {move_number}')
@@ -99,25 +101,29 @@ def handle_btnexchange(game, move_number):
 def handle_btndelchallenge(game, move_number):
     """handle delete challenge"""
     flash_and_log(f'delete challenge {move_number=}')
-    command_queue.put_nowait(Command(admin_del_challenge, game, move_number, State.ctx.op_event))
+    command_queue.put_nowait(Command(admin_del_challenge, game, move_number, State.ctx.op_event, lane=Lane.ADMIN))
 
 
 def handle_btntogglechallenge(game, move_number):
     """handle toggle challange type"""
     flash_and_log(f'toggle challenge type on move {move_number}')
-    command_queue.put_nowait(Command(admin_toggle_challenge_type, game, move_number, State.ctx.op_event))
+    command_queue.put_nowait(Command(admin_toggle_challenge_type, game, move_number, State.ctx.op_event, lane=Lane.ADMIN))
 
 
 def handle_btninswithdraw(game, move_number):
     """handle insert withdraw"""
     flash_and_log(f'insert withdraw for move {move_number}')
-    command_queue.put_nowait(Command(admin_ins_challenge, game, move_number, MoveType.WITHDRAW, State.ctx.op_event))
+    command_queue.put_nowait(
+        Command(admin_ins_challenge, game, move_number, MoveType.WITHDRAW, State.ctx.op_event, lane=Lane.ADMIN)
+    )
 
 
 def handle_btninschallenge(game, move_number):
     """handle insert challenge"""
     flash_and_log(f'insert invalid challenge for move {move_number}')
-    command_queue.put_nowait(Command(admin_ins_challenge, game, move_number, MoveType.CHALLENGE_BONUS, State.ctx.op_event))
+    command_queue.put_nowait(
+        Command(admin_ins_challenge, game, move_number, MoveType.CHALLENGE_BONUS, State.ctx.op_event, lane=Lane.ADMIN)
+    )
 
 
 WORD_PATTERN = re.compile(r'[A-ZÜÄÖ_\.]+')
@@ -154,15 +160,27 @@ def handle_btnmove(form, game, move_number):
             flash_and_log(f'invalid character in word {word}')
             return
         command_queue.put_nowait(
-            Command(admin_change_move, game, move_number, MoveType.REGULAR, (col, row), vert, word, State.ctx.op_event)
+            Command(
+                admin_change_move,
+                game,
+                move_number,
+                MoveType.REGULAR,
+                (col, row),
+                vert,
+                word,
+                State.ctx.op_event,
+                lane=Lane.ADMIN,
+            )
         )
     elif move_type == MoveType.EXCHANGE.name:
-        command_queue.put_nowait(Command(admin_change_move, game, move_number, MoveType.EXCHANGE, event=State.ctx.op_event))
+        command_queue.put_nowait(
+            Command(admin_change_move, game, move_number, MoveType.EXCHANGE, event=State.ctx.op_event, lane=Lane.ADMIN)
+        )
     else:
         flash_and_log(f'change move {move_number} missing parameter {move_type=} {coord=} {word=}')
         return
     if State.ctx.current_state == GameState.EOG:
-        command_queue.put_nowait(Command(State.do_end_of_game))
+        command_queue.put_nowait(Command(State.do_end_of_game, lane=Lane.ADMIN))
     flash_and_log(f'change move {move_number} to exchange')
 
 
@@ -33,7 +33,18 @@ from time import sleep
 
 import cv2
 import psutil
-from flask import Flask, abort, make_response, redirect, render_template, request, send_file, send_from_directory, url_for
+from flask import (
+    Flask,
+    abort,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    send_from_directory,
+    url_for,
+)
 from flask_sock import ConnectionClosed, Sock, Server
 from werkzeug.serving import make_server
 
@@ -42,10 +53,15 @@ from admin.edit import admin_edit_bp
 from admin.server_context import ctx
 from admin.settings import admin_settings_bp
 from config import config, version
+from hardware.capture import capture
 from hardware.led import LED, LEDEnum
 from processing import event_set
+from repair import repair_progress
 from scrabblewatch import ScrabbleWatch
 from state import GameState, State
+from utils.metrics import metrics
+from utils.profiler import DEFAULT_DURATION, profiler
+from utils.threadpool import command_queue, lane_metrics
 
 logger = logging.getLogger()
 app = Flask(__name__, template_folder=config.path.src_dir / 'templates', static_folder=config.path.src_dir / 'static')
@@ -160,6 +176,56 @@ def route_logs():
     return render_template('logs.html', apiserver=ctx)
 
 
+def _metrics_snapshot() -> dict:
+    result = metrics.snapshot()
+    result['lanes'] = lane_metrics()
+    return result
+
+
+@app.route('/metrics', methods=['GET', 'POST'])
+def route_metrics():
+    """display runtime metrics (counters, latency histograms, gauges)"""
+    if request.method == 'POST':
+        if request.form.get('btnreset'):
+            metrics.reset()
+        elif request.form.get('btntoggle'):
+            metrics.enabled = not metrics.enabled
+            logger.info(f'metrics enabled: {metrics.enabled}')
+        return redirect(url_for('route_metrics'))
+    return render_template('metrics.html', apiserver=ctx, metrics=_metrics_snapshot())
+
+
+@app.route('/metrics.json')
+def route_metrics_json():
+    """runtime metrics as json"""
+    return jsonify(_metrics_snapshot())
+
+
+@app.route('/profiler', methods=['GET', 'POST'])
+def route_profiler():
+    """start/stop the sampling profiler of all threads"""
+    if request.method == 'POST':
+        if request.form.get('btnstart'):
+            try:
+                duration = float(request.form.get('duration', DEFAULT_DURATION))
+            except ValueError:
+                duration = DEFAULT_DURATION
+            profiler.start(duration=duration)
+        elif request.form.get('btnstop'):
+            profiler.stop()
+        return redirect(url_for('route_profiler'))
+    return render_template('profiler.html', apiserver=ctx, profiler=profiler.status())
+
+
+@app.route('/profiler/<fmt>')
+def do_download_profile(fmt: str):
+    """download samples of the last profiler run as pstats or folded stacks (flamegraph)"""
+    if fmt not in ('pstats', 'folded') or profiler.running or not profiler.count:
+        abort(404)
+    path = profiler.dump(config.path.log_dir / f'profile.{fmt}', fmt=fmt)
+    return send_from_directory(f'{config.path.log_dir}', path.name, as_attachment=True)
+
+
 def bytes2human(n):
     """Convert bytes to human-readable string."""
     # http://code.activestate.com/recipes/578019
@@ -196,10 +262,29 @@ def log_sysinfo():  # pylint: disable=too-many-locals,too-many-statements
     _mem_info()
     _disk_info()
     log_process_info()
+    _queue_info()
+    _capture_info()
     _git_info()
     return redirect('/logs')
 
 
+def _capture_info():
+    stats = capture.stats()
+    logger.info(f'{"=" * 40} Camera Capture {"=" * 26}')
+    logger.info(f'frames captured: {stats["captured"]} consumed: {stats["consumed"]} high rate: {stats["boosted"]}')
+    logger.info(f'fps: {config.video.fps} idle fps: {config.video.idle_fps}')
+
+
+def _queue_info():
+    logger.info(f'{"=" * 40} Command Queue {"=" * 27}')
+    logger.info(f'waiting commands: {command_queue.qsize()}')
+    for lane, m in lane_metrics().items():
+        logger.info(
+            f'{lane:10} count: {m["count"]:5} wait avg/max: {m["wait_avg"]:.3f}s/{m["wait_max"]:.3f}s '
+            f'run avg/max: {m["run_avg"]:.3f}s/{m["run_max"]:.3f}s'
+        )
+
+
 def _git_info():
     cmd = ['git', 'log', '--oneline', '-n', '20']
     process = subprocess.run(cmd, check=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
@@ -518,6 +603,7 @@ def echo(socket: Server):
             json_data['state'] = State.ctx.current_state.name
             json_data['clock1'] = config.scrabble.max_time - clock1
             json_data['clock2'] = config.scrabble.max_time - clock2
+            json_data['repair'] = repair_progress.as_dict()
             socket.send(f'{json.dumps(json_data)}')
         except ConnectionClosed:
             logger.warning('connection closed /ws_status')
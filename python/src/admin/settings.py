@@ -37,7 +37,8 @@ from config import config
 from customboard import get_last_warp
 from game_board.board import overlay_grid
 from hardware import camera
-from processing import warp_image
+from hardware.capture import capture
+from hardware.crop import board_crop
 from scrabblewatch import ScrabbleWatch
 from state import State
 from utils import upload
@@ -51,6 +52,7 @@ def handle_cam_post(form):
     if form.get('btndelete'):
         config.config.remove_option('video', 'warp_coordinates')
         config.save()
+        board_crop.reset()
     elif form.get('btnstore'):
         if 'video' not in config.config.sections():
             config.config.add_section('video')
@@ -93,11 +95,13 @@ def route_cam():  # pylint: disable=too-many-branches
         return handle_cam_post(request.form)
     update_warp_coordinates_from_args(request.args)
     warp_coord_cnf = str(config.video.warp_coordinates)
-    img = camera.cam.read()
+    capture.boost()  # high capture rate while the camera view is used
+    board_crop.suspend()  # show and warp the full frame
+    img = camera.cam.read(peek=True)
     if img is not None:
         _, im_buf_arr = cv2.imencode('.jpg', img)
         png_output = base64.b64encode(bytes(im_buf_arr))
-        warped, _ = warp_image(img)
+        warped, _ = State.ctx.game.frames.get(img).warp()
         last_warped = get_last_warp()
         if last_warped is not None:
             warp_coord = json.dumps(last_warped.tolist())
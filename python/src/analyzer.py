@@ -18,7 +18,12 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
+import importlib
+import json
 import logging
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from concurrent import futures
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
@@ -29,20 +34,22 @@ import imutils
 import numpy as np
 from cv2.typing import MatLike
 
+from bitboard import bit, connected, from_coords, to_coords
 from config import SCORES, config
 from game_board.board import GRID_H, GRID_W, get_x_position, get_y_position
-from scrabble import BoardType, Tile
+from move import BoardType, Tile
+from utils.util import runtime_measure
 
 ANALYZE_THREADS = 4
 BLANK_PROP = 76
 MAX_TILE_PROB = 99
+MARGIN = 15  # border around a field for the template matching
 MATCH_ROTATIONS = [0, -5, 5, -10, 10, -15, 15]
 THRESHOLD_PROP_BOARD = 97
 THRESHOLD_PROP_TILE = 86
 THRESHOLD_UMLAUT_BONUS = 2
 UMLAUTS = ('Ä', 'Ü', 'Ö')
 ORD_A = ord('A')
-DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
 BASE_IMG_DIR = Path(__file__).resolve().parent / 'game_board' / 'img'
 PATH_TILES_IMAGES = {
     'de': BASE_IMG_DIR / 'default',
@@ -53,6 +60,7 @@ PATH_TILES_IMAGES = {
 
 logger = logging.getLogger()
 tiles_templates: list[TileTemplate] = []
+template_store: TemplateStore
 
 
 @dataclass(kw_only=True)
@@ -63,8 +71,82 @@ class TileTemplate:  # pylint: disable=too-few-public-methods
     img: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.uint8))
 
 
+@dataclass(kw_only=True)
+class TemplateStore:
+    """tile templates as zero-mean, unit-norm float32 rows of one matrix (padded to the largest template)"""
+
+    names: list[str]
+    shapes: np.ndarray  # (height, width) per template
+    matrix: np.ndarray  # one row per template, read only (memory mapped from the cache file)
+
+    @classmethod
+    def build(cls, templates: list[TileTemplate]) -> TemplateStore:
+        """normalize the templates over their own size and pack them into one matrix"""
+        shapes = np.array([t.img.shape[:2] for t in templates], dtype=np.int32).reshape(-1, 2)
+        height, width = shapes.max(axis=0) if len(templates) else (1, 1)
+        matrix = np.zeros((len(templates), height * width), dtype=np.float32)
+        for i, t in enumerate(templates):
+            img = t.img.astype(np.float64)
+            img -= img.mean()
+            padded = np.zeros((height, width), dtype=np.float64)
+            padded[: img.shape[0], : img.shape[1]] = img / max(float(np.linalg.norm(img)), 1e-12)
+            matrix[i] = padded.ravel()
+        return cls(names=[t.name for t in templates], shapes=shapes, matrix=matrix)
+
+    @classmethod
+    def cached(cls, templates: list[TileTemplate], path: Path) -> TemplateStore:
+        """memory mapped store from path (.npy with .json meta data), rebuilt if the templates changed"""
+        meta = {'names': [t.name for t in templates], 'shapes': [list(t.img.shape[:2]) for t in templates]}
+        meta['signature'] = zlib.crc32(b''.join(np.ascontiguousarray(t.img).tobytes() for t in templates))
+        meta_path = path.with_suffix('.json')
+        try:
+            if meta_path.is_file() and json.loads(meta_path.read_text(encoding='utf-8')) == meta:
+                matrix = np.load(path, mmap_mode='r')
+                return cls(names=meta['names'], shapes=np.array(meta['shapes'], dtype=np.int32).reshape(-1, 2), matrix=matrix)
+        except (OSError, ValueError):
+            logger.warning(f'template cache {path} not readable, rebuild')
+        store = cls.build(templates)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(path, store.matrix)
+            meta_path.write_text(json.dumps(meta), encoding='utf-8')
+            store.matrix = np.load(path, mmap_mode='r')
+        except OSError:
+            logger.warning(f'template cache {path} not writable, use templates in memory')
+        return store
+
+    def correlate(self, segments: list[MatLike]) -> np.ndarray:
+        """normalized correlation coefficient (TM_CCOEFF_NORMED) of each template at its best offset in each segment
+
+        the segments (same shape) are stacked into one image, each pre-normalized template is correlated once with the
+        stack and the windows are normalized via one cv2.integral2; returns (segments, templates)
+        """
+        if not segments or not self.names:
+            return np.zeros((len(segments), len(self.names)), dtype=np.float32)
+        seg_h = segments[0].shape[0]
+        stacked = np.vstack([np.asarray(s, dtype=np.uint8) for s in segments])
+        stacked_f = stacked.astype(np.float32)
+        integral, integral_sq = cv2.integral2(stacked, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        height, width = int(self.shapes[:, 0].max()), int(self.shapes[:, 1].max())
+        inv_norms: dict[tuple[int, int], np.ndarray] = {}  # 1 / norm of the windows per template shape
+        result = np.empty((len(segments), len(self.names)), dtype=np.float32)
+        for i, (h, w) in enumerate(self.shapes.tolist()):
+            if (h, w) not in inv_norms:
+                sums = integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+                sums_sq = integral_sq[h:, w:] - integral_sq[:-h, w:] - integral_sq[h:, :-w] + integral_sq[:-h, :-w]
+                norm = np.sqrt(np.maximum(sums_sq - sums * sums / (h * w), 0))
+                inv_norms[h, w] = np.divide(1, norm, out=np.zeros_like(norm), where=norm > 1e-6).astype(np.float32)
+            template = np.ascontiguousarray(self.matrix[i].reshape(height, width)[:h, :w])
+            scores = cv2.matchTemplate(stacked_f, template, cv2.TM_CCORR) * inv_norms[h, w]
+            # offsets crossing into the next segment are dropped
+            scores = np.pad(scores, ((0, h - 1), (0, 0)), constant_values=-np.inf)
+            result[:, i] = scores.reshape(len(segments), seg_h, -1)[:, : seg_h - h + 1].reshape(len(segments), -1).max(axis=1)
+        return result
+
+
 def load_tiles_templates() -> list[TileTemplate]:
-    """load tile images from disk"""
+    """load tile images from disk and build the template store"""
+    global template_store  # noqa: PLW0603 # pylint: disable=global-statement
     tiles_templates.clear()
     filepath = PATH_TILES_IMAGES[config.board.language]
 
@@ -83,49 +165,57 @@ def load_tiles_templates() -> list[TileTemplate]:
             logger.exception('load_tiles_templates: failed processing image %s for tile %s', image_path, tile_name)
             continue
         tiles_templates.append(new_tile)
+    template_store = TemplateStore.cached(tiles_templates, config.path.work_dir / f'templates-{config.board.language}.npy')
     return tiles_templates
 
 
+@runtime_measure
 def filter_candidates(
     coord: tuple[int, int], candidates: set[tuple[int, int]], ignore_set: set[tuple[int, int]]
 ) -> set[tuple[int, int]]:
-    """allow only valid field for analysis"""
-    candidates = candidates.copy()
-    result = set()
-    stack = [coord]
-    while stack:
-        coordinates = stack.pop()
-        if coordinates in candidates:
-            candidates.remove(coordinates)
-            if coordinates not in ignore_set:
-                result.add(coordinates)
-            stack.extend([(coordinates[0] + dx, coordinates[1] + dy) for dx, dy in DIRECTIONS])
+    """allow only valid field for analysis (fields connected to coord, without the fields of ignore_set)"""
+    result = set(to_coords(connected(bit(coord), from_coords(candidates)) & ~from_coords(ignore_set)))
     logger.debug(f'{result}')
     return result
 
 
+def template_scores(img: MatLike) -> Iterable[tuple[str, float]]:
+    """best TM_CCOEFF_NORMED score of each tile template (cv2.matchTemplate per template)"""
+    for _tile in tiles_templates:
+        res = cv2.matchTemplate(img, _tile.img, cv2.TM_CCOEFF_NORMED)
+        _, thresh, _, _ = cv2.minMaxLoc(res)
+        yield _tile.name, thresh
+
+
+def field_segment(warped_gray: MatLike, coord: tuple[int, int]) -> MatLike:
+    """field (col, row) of the warped gray image with MARGIN pixels around"""
+    x, y = get_x_position(coord[0]), get_y_position(coord[1])
+    return warped_gray[y - MARGIN : y + GRID_H + MARGIN, x - MARGIN : x + GRID_W + MARGIN]
+
+
+def best_tile(coord: tuple[int, int], scores: Iterable[tuple[str, float]], tile: Tile) -> Tile:
+    """tile with the best score on field coord (umlauts get a bonus), tile if no score is better"""
+    suggest_tile, suggest_prop = tile.letter, tile.prob
+    for name, score in scores:
+        thresh = int(score * 100)
+        if name in UMLAUTS and thresh > suggest_prop - THRESHOLD_UMLAUT_BONUS:
+            thresh = min(MAX_TILE_PROB, thresh + THRESHOLD_UMLAUT_BONUS)  # 2% Bonus for umlauts
+            logger.debug(f'{chr(ORD_A + coord[1])}{coord[0] + 1:2} => ({name},{thresh}) increased prop')
+        if thresh > suggest_prop:
+            suggest_tile, suggest_prop = name, thresh
+    return Tile(letter=suggest_tile, prob=suggest_prop)
+
+
 def analyze_chunk(warped_gray: MatLike, board: BoardType, coord_list: set[tuple[int, int]]) -> BoardType:
     """find tiles on board"""
 
-    def match_tile(img: MatLike, suggest_tile: str, suggest_prop: int) -> Tile:
-        for _tile in tiles_templates:
-            res = cv2.matchTemplate(img, _tile.img, cv2.TM_CCOEFF_NORMED)
-            _, thresh, _, _ = cv2.minMaxLoc(res)
-            thresh = int(thresh * 100)
-            if _tile.name in UMLAUTS and thresh > suggest_prop - THRESHOLD_UMLAUT_BONUS:
-                thresh = min(MAX_TILE_PROB, thresh + THRESHOLD_UMLAUT_BONUS)  # 2% Bonus for umlauts
-                logger.debug(f'{chr(ORD_A + row)}{col + 1:2} => ({_tile.name},{thresh}) increased prop')
-            if thresh > suggest_prop:
-                suggest_tile, suggest_prop = _tile.name, thresh
-        return Tile(letter=suggest_tile, prob=suggest_prop)
-
     def find_tile(gray: MatLike, tile: Tile) -> Tile:
         if tile.prob > THRESHOLD_PROP_BOARD:
             logger.debug(f'{chr(ORD_A + row)}{col + 1:2}: {tile} ({tile.prob}) tile on board prop > {THRESHOLD_PROP_BOARD} ')
             return tile
 
         for angle in MATCH_ROTATIONS:
-            tile = match_tile(imutils.rotate(gray, angle), tile.letter, tile.prob)
+            tile = best_tile((col, row), template_scores(imutils.rotate(gray, angle)), tile)
             if tile.prob >= config.board.min_tiles_rate:
                 break
 
@@ -134,36 +224,116 @@ def analyze_chunk(warped_gray: MatLike, board: BoardType, coord_list: set[tuple[
     try:
         for coord in coord_list:
             (col, row) = coord
-            x, y = get_x_position(col), get_y_position(row)
-            segment = warped_gray[y - 15 : y + GRID_H + 15, x - 15 : x + GRID_W + 15]
-            board[coord] = find_tile(segment, board.get(coord, Tile('_', BLANK_PROP)))
+            board[coord] = find_tile(field_segment(warped_gray, coord), board.get(coord, Tile('_', BLANK_PROP)))
             logger.info(f'{chr(ORD_A + row)}{col + 1:2}: {board[coord]}) found')
     except Exception:
         logger.exception(f'analyze_chunk failed for coords={coord_list}')
     return board
 
 
+def tile_alternatives(warped_gray: MatLike, coord: tuple[int, int], count: int = 3) -> list[Tile]:
+    """best count letters of the field (template matching over all rotations)"""
+    segment = field_segment(warped_gray, coord)
+    best: dict[str, float] = {}
+    for angle in MATCH_ROTATIONS:
+        for name, score in template_scores(imutils.rotate(segment, angle)):
+            best[name] = max(score, best.get(name, -1.0))
+    ranking = sorted(best.items(), key=lambda item: item[1], reverse=True)[:count]
+    return [Tile(letter=name, prob=min(MAX_TILE_PROB, int(score * 100))) for name, score in ranking]
+
+
+class Recognizer(ABC):
+    """Interface of a tile recognizer (see board.recognizer)"""
+
+    name = 'recognizer'
+
+    @abstractmethod
+    def recognize(self, warped_gray: MatLike, board: BoardType, candidates: set[tuple[int, int]]) -> BoardType:
+        """update board with the tiles recognized on the candidate fields of the warped gray image"""
+
+
+class TemplateRecognizer(Recognizer):
+    """template matching of the tile images with up to len(MATCH_ROTATIONS) rotations per field"""
+
+    name = 'template'
+
+    def recognize(self, warped_gray: MatLike, board: BoardType, candidates: set[tuple[int, int]]) -> BoardType:
+        def chunkify(lst, chunks):
+            return [lst[i::chunks] for i in range(chunks)]
+
+        chunks = chunkify(list(candidates), ANALYZE_THREADS)  # chunks for picture analysis
+        analyze_futures = []
+        with ThreadPoolExecutor(max_workers=ANALYZE_THREADS, thread_name_prefix='analyze') as executor:
+            for i in range(ANALYZE_THREADS):
+                board_chunk = {key: board[key] for key in chunks[i] if key in board}
+                analyze_futures.append(executor.submit(analyze_chunk, warped_gray, board_chunk, set(chunks[i])))
+            done, not_done = futures.wait(analyze_futures)  # blocking wait
+            for f in done:
+                try:
+                    board.update(f.result())
+                except Exception:  # noqa: PERF203 # `try`-`except` within a loop incurs performance overhead
+                    logger.exception('analyze future failed')
+            for f in not_done:
+                logger.error(f'analyze future not finished: {f}')
+        return board
+
+
+class MatrixRecognizer(Recognizer):
+    """template matching with the pre-normalized template store, one correlation of all open fields per rotation"""
+
+    name = 'matrix'
+
+    def recognize(self, warped_gray: MatLike, board: BoardType, candidates: set[tuple[int, int]]) -> BoardType:
+        tiles = {coord: board.get(coord, Tile('_', BLANK_PROP)) for coord in candidates}
+        segments = {
+            coord: field_segment(warped_gray, coord) for coord, tile in tiles.items() if tile.prob <= THRESHOLD_PROP_BOARD
+        }
+        open_fields = list(segments)
+        for angle in MATCH_ROTATIONS:
+            if not open_fields:
+                break
+            scores = template_store.correlate([imutils.rotate(segments[coord], angle) for coord in open_fields])
+            for coord, row in zip(open_fields, scores.tolist(), strict=True):
+                tiles[coord] = best_tile(coord, zip(template_store.names, row, strict=True), tiles[coord])
+            open_fields = [coord for coord in open_fields if tiles[coord].prob < config.board.min_tiles_rate]
+        for coord, tile in tiles.items():
+            if coord in segments and tile.prob <= THRESHOLD_PROP_TILE:
+                tile = Tile('_', BLANK_PROP)
+            board[coord] = tile
+            logger.info(f'{chr(ORD_A + coord[1])}{coord[0] + 1:2}: {tile}) found')
+        return board
+
+
+recognizers: dict[str, Recognizer] = {}
+RECOGNIZER_MODULES = {'knn': 'classifier', 'remote': 'remote'}  # modules registering their recognizer on import
+
+
+def register_recognizer(recognizer: Recognizer) -> None:
+    """make recognizer available for board.recognizer"""
+    recognizers[recognizer.name] = recognizer
+
+
+def find_recognizer(name: str) -> Recognizer | None:
+    """registered recognizer, its module (RECOGNIZER_MODULES) is imported on first use"""
+    if name not in recognizers and name in RECOGNIZER_MODULES:
+        try:
+            importlib.import_module(RECOGNIZER_MODULES[name])
+        except ImportError:
+            logger.exception(f'recognizer {name} not available')
+    return recognizers.get(name)
+
+
+def get_recognizer() -> Recognizer:
+    """configured recognizer, template matching if unknown"""
+    return find_recognizer(config.board.recognizer) or recognizers[TemplateRecognizer.name]
+
+
+@runtime_measure
 def analyze(warped_gray: MatLike, board: BoardType, candidates: set[tuple[int, int]]) -> BoardType:
-    """start threads for analyze"""
-
-    def chunkify(lst, chunks):
-        return [lst[i::chunks] for i in range(chunks)]
-
-    chunks = chunkify(list(candidates), ANALYZE_THREADS)  # chunks for picture analysis
-    analyze_futures = []
-    with ThreadPoolExecutor(max_workers=ANALYZE_THREADS, thread_name_prefix='analyze') as executor:
-        for i in range(ANALYZE_THREADS):
-            board_chunk = {key: board[key] for key in chunks[i] if key in board}
-            analyze_futures.append(executor.submit(analyze_chunk, warped_gray, board_chunk, set(chunks[i])))
-        done, not_done = futures.wait(analyze_futures)  # blocking wait
-        for f in done:
-            try:
-                board.update(f.result())
-            except Exception:  # noqa: PERF203 # `try`-`except` within a loop incurs performance overhead
-                logger.exception('analyze future failed')
-        for f in not_done:
-            logger.error(f'analyze future not finished: {f}')
-    return board
+    """recognize the tiles on the candidate fields with the configured recognizer"""
+    return get_recognizer().recognize(warped_gray, board, candidates)
 
 
+register_recognizer(TemplateRecognizer())
+register_recognizer(MatrixRecognizer())
 load_tiles_templates()
@@ -0,0 +1,108 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+# 225 bit board (python int): bit row * SIZE + col is set for field (col, row)
+SIZE = 15
+FULL = (1 << SIZE * SIZE) - 1
+ROW = (1 << SIZE) - 1  # bits of row 0
+COL = sum(1 << row * SIZE for row in range(SIZE))  # bits of column 0
+NOT_FIRST_COL = FULL & ~COL
+NOT_LAST_COL = FULL & ~(COL << SIZE - 1)
+
+
+def bit(coord: tuple[int, int]) -> int:
+    """bit of the field (col, row), 0 outside the board"""
+    col, row = coord
+    return 1 << row * SIZE + col if 0 <= col < SIZE and 0 <= row < SIZE else 0
+
+
+def from_coords(coords: Iterable[tuple[int, int]]) -> int:
+    """bitboard of the fields"""
+    bits = 0
+    for col, row in coords:
+        if 0 <= col < SIZE and 0 <= row < SIZE:
+            bits |= 1 << row * SIZE + col
+    return bits
+
+
+def to_coords(bits: int) -> Iterator[tuple[int, int]]:
+    """fields (col, row) of the bitboard in row order"""
+    while bits:
+        low = bits & -bits
+        index = low.bit_length() - 1
+        yield index % SIZE, index // SIZE
+        bits ^= low
+
+
+def neighbours(bits: int) -> int:
+    """fields left, right, above and below of the bitboard"""
+    return ((bits << 1) & NOT_FIRST_COL) | ((bits >> 1) & NOT_LAST_COL) | ((bits << SIZE) & FULL) | (bits >> SIZE)
+
+
+def connected(seed: int, mask: int) -> int:
+    """fields of mask connected horizontally or vertically to the seed fields in mask"""
+    region = seed & mask
+    while True:
+        grown = region | (neighbours(region) & mask)
+        if grown == region:
+            return region
+        region = grown
+
+
+def row_span(row: int, first: int, last: int) -> int:
+    """fields first..last (columns) of row"""
+    return (((1 << last - first + 1) - 1) << first) << row * SIZE
+
+
+def col_span(col: int, first: int, last: int) -> int:
+    """fields first..last (rows) of column col"""
+    return (COL << col) & ((1 << (last + 1) * SIZE) - (1 << first * SIZE))
+
+
+def bounds(bits: int) -> tuple[int, int, int, int]:
+    """min col, max col, min row, max row of a non empty bitboard"""
+    cols = bits
+    for rows in (8, 4, 2, 1):  # fold all rows onto row 0
+        cols |= cols >> rows * SIZE
+    cols &= ROW
+    return (
+        (cols & -cols).bit_length() - 1,
+        cols.bit_length() - 1,
+        ((bits & -bits).bit_length() - 1) // SIZE,
+        (bits.bit_length() - 1) // SIZE,
+    )
+
+
+def in_one_row(bits: int) -> bool:
+    """all fields in the same row"""
+    if not bits:
+        return True
+    first = ((bits & -bits).bit_length() - 1) // SIZE
+    return bits & ~(ROW << first * SIZE) == 0
+
+
+def in_one_col(bits: int) -> bool:
+    """all fields in the same column"""
+    if not bits:
+        return True
+    first = ((bits & -bits).bit_length() - 1) % SIZE
+    return bits & ~(COL << first) == 0
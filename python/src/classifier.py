@@ -0,0 +1,265 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+k-NN tile classifier over HOG features as alternative to the template matching (board.recognizer = knn). The k-NN
+vote picks the letter (or an empty field), the prob is the template score of this letter, so the thresholds of the
+template matching apply unchanged.
+
+    cd python
+    PYTHONPATH=src python src/classifier.py train test/game0[1-5]      # writes work/classifier-<language>.npz
+    PYTHONPATH=src python src/classifier.py compare test/game1*        # accuracy/latency against template matching
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import cv2
+import imutils
+import numpy as np
+from cv2.typing import MatLike
+
+from analyzer import (
+    BLANK_PROP,
+    MARGIN,
+    MATCH_ROTATIONS,
+    MAX_TILE_PROB,
+    THRESHOLD_PROP_BOARD,
+    THRESHOLD_PROP_TILE,
+    MatrixRecognizer,
+    Recognizer,
+    TemplateRecognizer,
+    field_segment,
+    register_recognizer,
+    tiles_templates,
+)
+from bitboard import FULL, from_coords, to_coords
+from config import config
+from game_board.board import GRID_W
+from move import BoardType, CoordType, Tile
+
+WINDOW = 48  # center of the field for the HOG features
+HOG = cv2.HOGDescriptor((WINDOW, WINDOW), (24, 24), (12, 12), (12, 12), 9)
+K_NEIGHBORS = 5
+SAMPLES_PER_CLASS = 60  # training fields per letter (before augmentation)
+AUGMENT_ROTATIONS = (-8, 8)
+AUGMENT_SHIFTS = ((3, 0), (-3, 0), (0, 3), (0, -3))
+NO_TILE = '.'  # class of the empty fields
+
+logger = logging.getLogger()
+
+
+def model_path(language: str | None = None) -> Path:
+    """model file of the language"""
+    return config.path.work_dir / f'classifier-{language or config.board.language}.npz'
+
+
+def features(segments: list[MatLike]) -> np.ndarray:
+    """unit length HOG vectors (one row per field segment)"""
+    offset = (GRID_W + 2 * MARGIN - WINDOW) // 2
+    result = np.array(
+        [
+            np.asarray(HOG.compute(np.ascontiguousarray(s[offset : offset + WINDOW, offset : offset + WINDOW]))).ravel()
+            for s in segments
+        ],
+        dtype=np.float32,
+    )
+    result /= np.linalg.norm(result, axis=1, keepdims=True) + 1e-6
+    return result
+
+
+def augment(segment: MatLike) -> list[MatLike]:
+    """segment with small rotations and shifts"""
+    return [
+        segment,
+        *(imutils.rotate(segment, angle) for angle in AUGMENT_ROTATIONS),
+        *(np.roll(segment, (dy, dx), axis=(0, 1)) for dx, dy in AUGMENT_SHIFTS),
+    ]
+
+
+def letter_prob(segment: MatLike, letter: str) -> int:
+    """template score of letter in the field (rotations like the template matching), 0 without template"""
+    template = next((t.img for t in tiles_templates if t.name == letter), None)
+    prob = 0
+    if template is None:
+        return prob
+    for angle in MATCH_ROTATIONS:
+        _, score, _, _ = cv2.minMaxLoc(cv2.matchTemplate(imutils.rotate(segment, angle), template, cv2.TM_CCOEFF_NORMED))
+        prob = max(prob, min(MAX_TILE_PROB, int(score * 100)))
+        if prob >= config.board.min_tiles_rate:
+            break
+    return prob
+
+
+@dataclass
+class KnnModel:
+    """feature vectors of the training fields with their letters"""
+
+    letters: np.ndarray  # class index => letter (NO_TILE: empty field)
+    vectors: np.ndarray  # float16, one row per training field
+    labels: np.ndarray  # class index per row
+
+    def save(self, path: Path) -> None:
+        """store model as npz"""
+        np.savez_compressed(path, letters=self.letters, vectors=self.vectors, labels=self.labels)
+
+    @classmethod
+    def load(cls, path: Path) -> KnnModel:
+        """read model from npz"""
+        with np.load(path) as data:
+            return cls(letters=data['letters'], vectors=data['vectors'], labels=data['labels'])
+
+    def classify(self, vectors: np.ndarray) -> list[str]:
+        """vote of the K_NEIGHBORS most similar training fields, all fields with one matrix product"""
+        similarity = vectors @ self.vectors.T.astype(np.float32)
+        k = min(K_NEIGHBORS, similarity.shape[1])
+        neighbors = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        letters = []
+        for row, idx in enumerate(neighbors):
+            weights = np.bincount(self.labels[idx], weights=similarity[row, idx], minlength=len(self.letters))
+            letters.append(str(self.letters[int(weights.argmax())]))
+        return letters
+
+
+class KnnRecognizer(Recognizer):
+    """k-NN classification of all candidate fields of a move at once (falls back to templates without model)"""
+
+    name = 'knn'
+
+    def __init__(self):
+        self.model: KnnModel | None = None
+        self.language: str | None = None
+
+    def _load(self) -> KnnModel | None:
+        if self.language != config.board.language:
+            self.language, self.model = config.board.language, None
+            path = model_path()
+            if path.is_file():
+                self.model = KnnModel.load(path)
+                logger.info(f'classifier model {path} with {len(self.model.labels)} fields loaded')
+            else:
+                logger.warning(f'classifier model {path} not found, use template matching')
+        return self.model
+
+    def recognize(self, warped_gray: MatLike, board: BoardType, candidates: set[CoordType]) -> BoardType:
+        model = self._load()
+        if model is None:
+            return TemplateRecognizer().recognize(warped_gray, board, candidates)
+        coords = [c for c in candidates if c not in board or board[c].prob <= THRESHOLD_PROP_BOARD]
+        if coords:
+            segments = [field_segment(warped_gray, c) for c in coords]
+            for coord, segment, letter in zip(coords, segments, model.classify(features(segments)), strict=True):
+                # prob of the classified letter on the scale of the template matching, empty fields as blank
+                tile = Tile('_', BLANK_PROP) if letter in (NO_TILE, '_') else Tile(letter, letter_prob(segment, letter))
+                if coord in board and board[coord].prob >= tile.prob:
+                    tile = board[coord]
+                board[coord] = tile if tile.prob > THRESHOLD_PROP_TILE else Tile('_', BLANK_PROP)
+        return board
+
+
+def train(folders: list[str], samples_per_class: int = SAMPLES_PER_CLASS) -> KnnModel:
+    """sample up to samples_per_class fields per letter and empty fields (NO_TILE), add rotated and shifted copies"""
+    from replay import collect  # pylint: disable=import-outside-toplevel # replay imports processing
+
+    segments, letters = [], []
+    for gray, board in collect(folders):
+        for coord, letter in board.items():
+            segments.append(field_segment(gray, coord))
+            letters.append(letter)
+        for coord in to_coords(FULL & ~from_coords(board)):
+            segments.append(field_segment(gray, coord))
+            letters.append(NO_TILE)
+    alphabet = np.array(sorted(set(letters)))
+    labels = np.searchsorted(alphabet, letters)
+    rng = np.random.default_rng(0)
+    train_segments, train_labels = [], []
+    for label in range(len(alphabet)):
+        indices = np.flatnonzero(labels == label)
+        for i in rng.choice(indices, min(samples_per_class, len(indices)), replace=False):
+            variants = augment(segments[i])
+            train_segments.extend(variants)
+            train_labels.extend([label] * len(variants))
+    return KnnModel(
+        letters=alphabet, vectors=features(train_segments).astype(np.float16), labels=np.array(train_labels, dtype=np.int16)
+    )
+
+
+def compare(folders: list[str], model: KnnModel) -> dict:
+    """accuracy and latency per move of the classifier and the template matching on all tiles of the replayed games"""
+    from replay import collect  # pylint: disable=import-outside-toplevel # replay imports processing
+
+    moves = collect(folders)
+    knn = KnnRecognizer()
+    knn.model, knn.language = model, config.board.language
+    result = {}
+    for recognizer in (TemplateRecognizer(), MatrixRecognizer(), knn):
+        correct = fields = 0
+        elapsed = []
+        for gray, letters in moves:
+            start = time.perf_counter()
+            board = recognizer.recognize(gray, {}, set(letters))
+            elapsed.append(time.perf_counter() - start)
+            fields += len(letters)
+            correct += sum(board[coord].letter == letter for coord, letter in letters.items())
+        result[recognizer.name] = {
+            'moves': len(moves),
+            'fields': fields,
+            'accuracy': correct / max(fields, 1),
+            'ms_per_move': 1000 * float(np.mean(elapsed)) if elapsed else 0.0,
+            'ms_p95': 1000 * float(np.percentile(elapsed, 95)) if elapsed else 0.0,
+        }
+    return result
+
+
+def main() -> int:
+    """train or compare the classifier on recorded game folders"""
+    parser = argparse.ArgumentParser(description='k-NN tile classifier')
+    parser.add_argument('command', choices=['train', 'compare'])
+    parser.add_argument('folders', nargs='+', help='game folders (scrabble.ini, image-N.jpg, game.csv)')
+    parser.add_argument('-m', '--model', help='model file (default: work/classifier-<language>.npz)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    folders = [str(Path(f)) for f in args.folders if (Path(f) / 'game.csv').is_file()]
+    path = Path(args.model) if args.model else None
+    if args.command == 'train':
+        model = train(folders)
+        path = path or model_path()
+        model.save(path)
+        print(f'{len(model.labels)} fields of {len(model.letters)} letters written to {path}')
+        return 0
+    path = path or model_path()
+    if not path.is_file():
+        print(f'model {path} not found')
+        return 1
+    for name, stats in compare(folders, KnnModel.load(path)).items():
+        print(
+            f'{name:10} {stats["moves"]} moves {stats["fields"]} fields: accuracy {stats["accuracy"]:.2%}, '
+            f'{stats["ms_per_move"]:.1f} ms/move (p95 {stats["ms_p95"]:.1f} ms)'
+        )
+    return 0
+
+
+register_recognizer(KnnRecognizer())
+
+if __name__ == '__main__':
+    sys.exit(main())
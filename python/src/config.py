@@ -89,7 +89,7 @@ DEFAULT = {
         'log_dir': '%(src_dir)s/../work/log',
         'web_dir': '%(src_dir)s/../work/web',
     },
-    'development': {'simulate_path': 'test/game01/image-{:d}.jpg', 'recording': 'False'},
+    'development': {'simulate_path': 'test/game01/image-{:d}.jpg', 'recording': 'False', 'prefetch': '2', 'cache_size': '0'},
     'scrabble': {
         'tournament': 'SCRABBLE SCRAPER',
         'malus_doubt': '10',
@@ -99,9 +99,23 @@ DEFAULT = {
         'timeout_malus': '10',
         'verify_moves': '3',
         'show_score': 'False',
+        'speculative': 'False',
+        'lexicon': 'False',
+        'journal': 'False',
+    },
+    'output': {'upload_server': 'False', 'upload_modus': 'http', 'move_trace': 'False'},
+    'video': {
+        'warp': 'True',
+        'width': '976',
+        'height': '976',
+        'fps': '25',
+        'idle_fps': '2',
+        'rotate': 'True',
+        'warp_coordinates': '',
+        'crop': 'False',
+        'crop_margin': '20',
+        'frame_window': '0.2',
     },
-    'output': {'upload_server': 'False', 'upload_modus': 'http'},
-    'video': {'warp': 'True', 'width': '976', 'height': '976', 'fps': '25', 'rotate': 'True', 'warp_coordinates': ''},
     'board': {
         'layout': 'custom2012',  # available: custom2012, custom2020, custom2020light
         'min_tiles_rate': '96',
@@ -112,8 +126,11 @@ DEFAULT = {
         'custom2020light-tiles_threshold': '800',
         'custom2020light-dynamic_threshold': 'True',
         'language': 'de',
+        'recognizer': 'template',  # available: template, matrix (template store), knn (python classifier.py train ...), remote
+        'remote_worker': '',  # host:port of the recognition worker (python remote.py worker)
+        'remote_timeout': '0.5',  # seconds, then the fields are analyzed on the board
     },
-    'system': {'quit': 'reboot', 'gitbranch': 'main'},
+    'system': {'quit': 'reboot', 'gitbranch': 'main', 'metrics': 'True'},
 }
 
 
@@ -168,6 +185,16 @@ class DevelopmentConfig:
         """Record high-resolution images and save them to disk"""
         return self.config.getboolean('development', 'recording', fallback=as_bool(DEFAULT['development']['recording']))
 
+    @property
+    def prefetch(self) -> int:
+        """Number of simulation images decoded ahead of the current image"""
+        return self.config.getint('development', 'prefetch', fallback=int(DEFAULT['development']['prefetch']))
+
+    @property
+    def cache_size(self) -> int:
+        """Number of decoded simulation images kept in memory (0 = only prefetched images)"""
+        return self.config.getint('development', 'cache_size', fallback=int(DEFAULT['development']['cache_size']))
+
 
 @dataclass
 class ScrabbleConfig:
@@ -207,7 +234,7 @@ class ScrabbleConfig:
 
     @property
     def verify_moves(self) -> int:
-        """Number of previous moves to check for tile corrections"""
+        """Number of analyses until a tile with a low probability is confirmed"""
         return self.config.getint('scrabble', 'verify_moves', fallback=int(DEFAULT['scrabble']['verify_moves']))
 
     @property
@@ -215,6 +242,21 @@ class ScrabbleConfig:
         """Should the display show the current score?"""
         return self.config.getboolean('scrabble', 'show_score', fallback=as_bool(DEFAULT['scrabble']['show_score']))
 
+    @property
+    def speculative(self) -> bool:
+        """Precompute the recognition while the clock is running"""
+        return self.config.getboolean('scrabble', 'speculative', fallback=as_bool(DEFAULT['scrabble']['speculative']))
+
+    @property
+    def lexicon(self) -> bool:
+        """Check the words of a move against the word list work/lexicon-<language>.txt"""
+        return self.config.getboolean('scrabble', 'lexicon', fallback=as_bool(DEFAULT['scrabble']['lexicon']))
+
+    @property
+    def journal(self) -> bool:
+        """Write the journal work/journal.jsonl and restore an unfinished game on startup"""
+        return self.config.getboolean('scrabble', 'journal', fallback=as_bool(DEFAULT['scrabble']['journal']))
+
 
 @dataclass
 class OutputConfig:
@@ -227,6 +269,11 @@ class OutputConfig:
         """Should results be uploaded to a server?"""
         return self.config.getboolean('output', 'upload_server', fallback=as_bool(DEFAULT['output']['upload_server']))
 
+    @property
+    def move_trace(self) -> bool:
+        """Write the timing trace of each move into data-N.json and the game zip"""
+        return self.config.getboolean('output', 'move_trace', fallback=as_bool(DEFAULT['output']['move_trace']))
+
 
 @dataclass
 class VideoConfig:
@@ -247,6 +294,16 @@ class VideoConfig:
             return None
         return json.loads(warp_coordinates_as_string)
 
+    @property
+    def crop(self) -> bool:
+        """Should frames be cropped to the board region right after capture?"""
+        return self.config.getboolean('video', 'crop', fallback=as_bool(DEFAULT['video']['crop']))
+
+    @property
+    def crop_margin(self) -> int:
+        """Margin (px) around the warp coordinates of a cropped frame"""
+        return self.config.getint('video', 'crop_margin', fallback=int(DEFAULT['video']['crop_margin']))
+
     @property
     def width(self) -> int:
         """used image width"""
@@ -262,11 +319,21 @@ class VideoConfig:
         """Frames per second used for video capture"""
         return self.config.getint('video', 'fps', fallback=int(DEFAULT['video']['fps']))
 
+    @property
+    def idle_fps(self) -> float:
+        """Frames per second between button presses (0 = capture only on demand)"""
+        return self.config.getfloat('video', 'idle_fps', fallback=float(DEFAULT['video']['idle_fps']))
+
     @property
     def rotate(self) -> bool:
         """Should the image be rotated by 180°?"""
         return self.config.getboolean('video', 'rotate', fallback=as_bool(DEFAULT['video']['rotate']))
 
+    @property
+    def frame_window(self) -> float:
+        """Window (sec) around a button press to select the best frame (0 = nearest frame)"""
+        return self.config.getfloat('video', 'frame_window', fallback=float(DEFAULT['video']['frame_window']))
+
 
 @dataclass
 class BoardConfig:
@@ -306,6 +373,21 @@ class BoardConfig:
         # use german language as default
         return self.config.get('board', 'language', fallback=DEFAULT['board']['language']).replace('"', '')
 
+    @property
+    def recognizer(self) -> str:
+        """tile recognizer: template matching (cv2 or template store) or a trained classifier"""
+        return self.config.get('board', 'recognizer', fallback=DEFAULT['board']['recognizer']).replace('"', '')
+
+    @property
+    def remote_worker(self) -> str:
+        """host:port of the recognition worker (recognizer = remote)"""
+        return self.config.get('board', 'remote_worker', fallback=DEFAULT['board']['remote_worker']).replace('"', '')
+
+    @property
+    def remote_timeout(self) -> float:
+        """timeout (sec) of the recognition worker, then the fields are analyzed on the board"""
+        return self.config.getfloat('board', 'remote_timeout', fallback=float(DEFAULT['board']['remote_timeout']))
+
 
 @dataclass
 class SystemConfig:
@@ -323,6 +405,11 @@ class SystemConfig:
         """Git branch or tag used for updates"""
         return self.config.get('system', 'gitbranch', fallback=DEFAULT['system']['gitbranch']).replace('"', '')
 
+    @property
+    def metrics(self) -> bool:
+        """Record runtime metrics (admin page /metrics)"""
+        return self.config.getboolean('system', 'metrics', fallback=as_bool(DEFAULT['system']['metrics']))
+
 
 @dataclass
 class TestConfig:
@@ -28,6 +28,7 @@ from cv2.typing import MatLike
 
 from config import DOUBLE_LETTER, DOUBLE_WORDS, TRIPLE_LETTER, TRIPLE_WORDS, config
 from game_board.board import GRID_H, GRID_W, OFFSET
+from hardware.crop import BoardCrop, board_crop
 from utils.util import TWarp, runtime_measure
 
 # dimension board custom
@@ -63,13 +64,16 @@ class CustomBoard:
 
     BOARD_MASK_BORDER = 5
     TWORD_MASK, DWORD_MASK, TLETTER_MASK, DLETTER_MASK, FIELD_MASK = None, None, None, None, None
-    last_warp: TWarp | None = None
 
     @classmethod
-    def warp(cls, image: MatLike) -> MatLike:  # pylint: disable=too-many-locals
-        """ " implement warp of a custom board"""
+    def warp(cls, image: MatLike, crop: BoardCrop = board_crop) -> MatLike:  # pylint: disable=too-many-locals
+        """ " implement warp of a custom board (crop: crop and last warp of the camera)"""
 
+        origin = np.array(crop.origin(image), dtype='float32')  # offset of a cropped camera frame
         rect = cls.find_board(image)
+        if config.video.warp_coordinates is None:
+            rect = rect + origin  # detected in image coordinates
+        crop.set_warp(rect)
 
         # construct our destination points which will be used to
         # map the screen to a top-down, "birds eye" view
@@ -77,8 +81,7 @@ class CustomBoard:
 
         # calculate the perspective transform matrix and warp
         # the perspective to grab the screen
-        cls.last_warp = rect
-        matrix = cv2.getPerspectiveTransform(rect, dst)
+        matrix = cv2.getPerspectiveTransform(rect - origin, dst)
         return cv2.warpPerspective(image, matrix, (800, 800), flags=cv2.INTER_AREA)
 
     @classmethod
@@ -284,20 +287,20 @@ class Custom2020LightBoard(CustomBoard):
 BOARD_CLASSES = {'custom2012': Custom2012Board, 'custom2020': Custom2020Board, 'custom2020light': Custom2020LightBoard}
 
 
-def get_last_warp() -> TWarp | None:
-    """Delegates the warp of the ``img`` according to the configured board style"""
-    return BOARD_CLASSES.get(config.board.layout, Custom2012Board).last_warp
+def get_last_warp(crop: BoardCrop = board_crop) -> TWarp | None:
+    """last warp of the camera (default: board camera)"""
+    return crop.last_warp
 
 
-def clear_last_warp() -> None:
-    """Delegates the last_warp according to the configured board style"""
-    BOARD_CLASSES.get(config.board.layout, Custom2012Board).last_warp = None
+def clear_last_warp(crop: BoardCrop = board_crop) -> None:
+    """forget last warp and crop region of the camera (default: board camera)"""
+    crop.reset()
 
 
 @runtime_measure
-def warp_image(img: MatLike) -> tuple[MatLike, MatLike]:
+def warp_image(img: MatLike, crop: BoardCrop = board_crop) -> tuple[MatLike, MatLike]:
     """Delegates the warp of the ``img`` according to the configured board style"""
-    warped = BOARD_CLASSES.get(config.board.layout, Custom2012Board).warp(img) if config.video.warp else img
+    warped = BOARD_CLASSES.get(config.board.layout, Custom2012Board).warp(img, crop) if config.video.warp else img
     return warped, cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
 
 
@@ -0,0 +1,152 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+from cv2.typing import MatLike
+
+from analyzer import analyze
+from config import config
+from customboard import filter_image, warp_image
+from hardware.crop import BoardCrop, board_crop
+from move import BoardType, CoordType
+from utils.metrics import metrics
+
+FRAME_CACHE_SIZE = 4  # cached camera frames
+
+logger = logging.getLogger()
+
+
+def frame_key(img: MatLike, crop: BoardCrop = board_crop) -> tuple:
+    """content hash of a camera frame and the warp settings"""
+    warp_coordinates = config.video.warp_coordinates
+    return (
+        img.shape,
+        zlib.crc32(np.ascontiguousarray(img).data),
+        crop.origin(img),
+        config.board.layout,
+        config.video.warp,
+        None if warp_coordinates is None else tuple(map(tuple, warp_coordinates)),
+    )
+
+
+@dataclass
+class FrameAnalysis:
+    """results of the recognition stages of a camera frame, computed on first use"""
+
+    img: MatLike | None  # own copy of the frame, released after the warp
+    cache: FrameCache = field(repr=False)
+    warped: MatLike | None = None
+    warped_gray: MatLike | None = None
+    candidates: set[CoordType] | None = None
+    boards: dict[tuple, BoardType] = field(default_factory=dict)  # analyze input => result
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def _warp(self) -> tuple[MatLike, MatLike, bool]:
+        with self.lock:
+            hit = self.warped is not None and self.warped_gray is not None
+            if not hit:
+                self.warped, self.warped_gray = warp_image(self.img, self.cache.crop)  # type: ignore[arg-type]
+                self.img = None
+                self.cache.count('warp', hit=False)
+            return self.warped, self.warped_gray, hit  # type: ignore[return-value]
+
+    def warp(self) -> tuple[MatLike, MatLike]:
+        """warped image and gray image (read only)"""
+        warped, warped_gray, hit = self._warp()
+        if hit:  # a hit of the other stages is not a hit of the warp
+            self.cache.count('warp', hit=True)
+        return warped, warped_gray
+
+    def tiles_candidates(self) -> set[CoordType]:
+        """copy of the tile candidates of the warped image"""
+        warped, _, _ = self._warp()
+        with self.lock:
+            candidates = self.candidates
+            self.cache.count('filter', hit=candidates is not None)
+            if candidates is None:
+                _, candidates = filter_image(warped)
+                self.candidates = candidates
+            return set(candidates)
+
+    def analyze(self, board: BoardType, candidates: set[CoordType]) -> BoardType:
+        """copy of the analyzed board for the board before the analysis and the candidates"""
+        _, warped_gray, _ = self._warp()
+        key = (tuple(sorted((coord, tile.letter, tile.prob) for coord, tile in board.items())), frozenset(candidates))
+        with self.lock:
+            result = self.boards.get(key)
+            self.cache.count('analyze', hit=result is not None)
+            if result is None:
+                result = self.boards[key] = analyze(warped_gray, board.copy(), candidates)
+            return result.copy()
+
+
+class FrameCache:
+    """Bounded cache of the recognition stages of the last camera frames of a game session.
+
+    move, check_resume, end_of_game, speculate and the admin routes /cam and /test_analyze share the warped
+    image, the tile candidates and the analyze results of the same frame. The crop holds the last warp of the
+    camera of the session.
+    """
+
+    def __init__(self, crop: BoardCrop = board_crop):
+        self.crop = crop
+        self.lock = threading.Lock()
+        self.frames: OrderedDict[tuple, FrameAnalysis] = OrderedDict()
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    def get(self, img: MatLike) -> FrameAnalysis:
+        """cached analysis of the frame img"""
+        key = frame_key(img, self.crop)
+        with self.lock:
+            entry = self.frames.get(key)
+            if entry is None:
+                entry = self.frames[key] = FrameAnalysis(img=img.copy(), cache=self)  # img may be a slot of the frame ring
+                while len(self.frames) > FRAME_CACHE_SIZE:
+                    self.frames.popitem(last=False)
+            else:
+                self.frames.move_to_end(key)
+            return entry
+
+    def count(self, stage: str, hit: bool) -> None:
+        """count hit or miss of a stage"""
+        counter = self.hits if hit else self.misses
+        counter[stage] = counter.get(stage, 0) + 1
+        metrics.inc(f'frame_cache_{"hit" if hit else "miss"}')
+
+    def hit_rate(self) -> float:
+        """share of the stage results taken from the cache"""
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    def clear(self) -> None:
+        """drop all frames (e.g. after the warp was reset)"""
+        with self.lock:
+            self.frames.clear()
+
+
+frame_cache = FrameCache()  # frames of the board camera
+metrics.gauge('frame_cache_hit_rate', lambda: round(frame_cache.hit_rate(), 3))
@@ -45,6 +45,7 @@ from cv2.typing import MatLike
 GRID_W = 50
 GRID_H = 50
 OFFSET = 25
+BOARD_CENTER_COORD = (7, 7)
 
 
 def calc_x_position(x: int) -> int:
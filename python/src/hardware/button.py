@@ -60,7 +60,7 @@ class Button(Static):
         """perform button press"""
         press = time.time()
         if button.pin and press > cls.bounce[ButtonEnum(button.pin.number).name] + 0.1 and cls.func_pressed:
-            cls.func_pressed(ButtonEnum(button.pin.number).name)  # pylint: disable=not-callable
+            cls.func_pressed(ButtonEnum(button.pin.number).name, press)  # pylint: disable=not-callable
 
     @classmethod
     def button_released(cls, button: GpioButton) -> None:  # pragma: no cover  # currently not used callback
@@ -21,8 +21,12 @@ from __future__ import annotations
 import atexit
 import importlib.util
 import logging
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from threading import Event
+from threading import Event, Lock
 from time import sleep
 from typing import Protocol
 
@@ -31,21 +35,60 @@ import numpy as np
 from cv2.typing import MatLike
 
 from config import config
+from hardware.capture import capture
+from hardware.crop import BoardCrop, board_crop
+from hardware.framebuffer import FrameRing, ring_slots
 from utils.util import runtime_measure
 
+MAX_FRAME_WAIT = 1.0  # max wait for a new frame if the capture was idle
+
 camera_dict: dict = {}
 logging.basicConfig(filename=f'{config.path.work_dir}/log/messages.log', level=logging.INFO, force=True)
 logger = logging.getLogger()
 
 
+def read_ring(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    ring: FrameRing,
+    resolution: tuple[int, int],
+    peek: bool,
+    timestamp: float | None,
+    window: float = 0.0,
+    crop: BoardCrop = board_crop,
+) -> MatLike:
+    """read frame from ring buffer: peek returns a read-only view, otherwise a private copy
+
+    With a timestamp the best frame within timestamp +/- window is selected (nearest frame if window is 0).
+    """
+    capture.add_consumed()
+    if timestamp is None:
+        frame = ring.latest()
+        outdated = frame is None or time.time() - frame.timestamp > capture.max_age()  # capture was suspended
+        if frame is not None and crop.is_suspended():  # full frame requested
+            outdated = outdated or frame.image.shape[:2] != (resolution[1], resolution[0])
+        if outdated:
+            capture.boost()
+            ring.wait_for(time.time(), timeout=MAX_FRAME_WAIT)
+            frame = ring.latest()
+    elif window > 0:
+        ring.wait_for(timestamp + window, timeout=2 * window)  # frames after the press
+        frame = ring.best(timestamp, window)
+    else:
+        frame = ring.nearest(timestamp)
+    if frame is None:
+        return np.zeros((resolution[1], resolution[0], 3), dtype=np.uint8)
+    return frame.image if peek else ring.copy(frame)
+
+
 class Camera(Protocol):
     """Camera Protocol"""
 
+    crop: BoardCrop  # region of the board, each game session has its own crop
+
     def __init__(self, src: int = 0, resolution: tuple[int, int] | None = None, framerate: int | None = None):
         """constructor"""
 
-    def read(self, peek: bool = False) -> MatLike:  # type: ignore
-        """read next picture"""
+    def read(self, peek: bool = False, timestamp: float | None = None) -> MatLike:  # type: ignore
+        """read next picture (peek: read-only view, timestamp: frame captured closest to timestamp)"""
 
     def update(self, event: Event) -> None:
         """update to next picture on thread event"""
@@ -69,7 +112,10 @@ if importlib.util.find_spec('picamera2'):
             logger.info('### init CameraRPI64')
             self.resolution = resolution or (config.video.width, config.video.height)
             self.framerate = framerate or config.video.fps
-            self.frame = np.zeros(shape=(self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+            self.ring = FrameRing(
+                shape=(self.resolution[1], self.resolution[0], 3), slots=ring_slots(self.framerate, config.video.frame_window)
+            )
+            self.crop = board_crop
             self.event: Event | None = None
             try:
                 self.camera = Picamera2()
@@ -84,7 +130,7 @@ if importlib.util.find_spec('picamera2'):
                 raise
             self.wait = round(1 / self.framerate, 2)
             sleep(2)  # warmup camera
-            self.frame = self.camera.capture_array()
+            self.ring.write(self.camera.capture_array())
             atexit.register(self._atexit)
 
         def log_camera_info(self) -> None:
@@ -99,24 +145,26 @@ if importlib.util.find_spec('picamera2'):
                 self.camera.close()
 
         @runtime_measure
-        def read(self, peek: bool = False) -> MatLike:
+        def read(self, peek: bool = False, timestamp: float | None = None) -> MatLike:
             """read next picture"""
-            return self.frame.copy()
+            return read_ring(self.ring, self.resolution, peek, timestamp, config.video.frame_window, self.crop)
 
         def update(self, event: Event) -> None:
             """update to next picture on thread event"""
             self.event = event
             while True:
-                self.frame = self.camera.capture_array()
+                self.ring.write(self.crop.apply(self.camera.capture_array()))
+                capture.add_captured()
                 if event.is_set():
                     break
-                sleep(self.wait)
+                capture.wait()
             event.clear()
             self._atexit()
 
         def cancel(self) -> None:
             if self.event:
                 self.event.set()
+                capture.wake()
                 sleep(2 * self.wait)
             else:
                 self._atexit()
@@ -130,8 +178,27 @@ if importlib.util.find_spec('picamera2'):
         logger.error(' ❌ picamera2 not detected')
 
 
+def index_images(formatter: str) -> dict[int, Path]:
+    """index of the existing image files of a formatter like 'test/game01/image-{:d}.jpg'"""
+    path = Path(formatter)
+    prefix, _, rest = path.name.partition('{')
+    suffix = rest.partition('}')[2]
+    pattern = re.compile(f'{re.escape(prefix)}(\\d+){re.escape(suffix)}')
+    if not path.parent.is_dir():
+        return {}
+    files = {}
+    for file in path.parent.iterdir():
+        if (match := pattern.fullmatch(file.name)) and Path(formatter.format(int(match[1]))) == file:
+            files[int(match[1])] = file
+    return files
+
+
 class CameraFile(Camera):
-    """Implementation for file access"""
+    """Implementation for file access
+
+    The image sequence is indexed once; the next development.prefetch images are decoded in a background
+    thread and up to development.cache_size decoded images are kept (LRU).
+    """
 
     def __init__(self, src: int = 0, resolution: tuple[int, int] | None = None, framerate: int | None = None):
         logger.info('### init CameraFile')
@@ -140,12 +207,17 @@ class CameraFile(Camera):
         self._counter = 1
         self._formatter = config.development.simulate_path
         self._resize = True
+        self.crop = board_crop
         self.frame = np.zeros(shape=(self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+        self._files: dict[int, Path] | None = None
+        self._cache: OrderedDict[tuple[Path, bool], Future] = OrderedDict()
+        self._cache_lock = Lock()
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
 
     def log_camera_info(self) -> None:
         logger.info('using camera CameraFile')
         logger.info(f'{self.resolution=} {self.framerate=}')
-        logger.info(f'{self._counter=} {self._formatter=}')
+        logger.info(f'{self._counter=} {self._formatter=} files={len(self.files)}')
 
     @property
     def resize(self) -> bool:
@@ -163,6 +235,8 @@ class CameraFile(Camera):
 
     @formatter.setter
     def formatter(self, value: str) -> None:
+        if value != self._formatter:
+            self._files = None  # new image sequence
         self._formatter = value
 
     @property
@@ -174,18 +248,48 @@ class CameraFile(Camera):
     def counter(self, value: int) -> None:
         self._counter = value
 
+    @property
+    def files(self) -> dict[int, Path]:
+        """index of the image sequence"""
+        if self._files is None:
+            self._files = index_images(self._formatter)
+            logger.debug(f'CameraFile indexed {len(self._files)} images of {self._formatter}')
+        return self._files
+
+    def _decode(self, path: Path, resize: bool) -> MatLike | None:
+        img = cv2.imread(str(path))
+        if img is not None and resize:
+            img = cv2.resize(img, self.resolution)
+        return img
+
+    def _load(self, number: int, wait: bool = True) -> MatLike | None:
+        """decoded image from cache, decode (in background if not wait) on cache miss"""
+        path = self.files.get(number)
+        if path is None:
+            return None
+        key = (path, self._resize)
+        with self._cache_lock:
+            future = self._cache.get(key)
+            if future is None:
+                future = self._loader.submit(self._decode, path, self._resize)
+                self._cache[key] = future
+            self._cache.move_to_end(key)
+            while len(self._cache) > max(config.development.cache_size, config.development.prefetch + 1):
+                self._cache.popitem(last=False)
+        return future.result() if wait else None
+
     @runtime_measure
-    def read(self, peek: bool = False) -> MatLike:
+    def read(self, peek: bool = False, timestamp: float | None = None) -> MatLike:
         logger.debug(f'CameraFile read: {self._formatter.format(self._counter)}')
-        img = cv2.imread(self._formatter.format(self._counter))
+        img = self._load(self._counter)
         if img is None:
             logger.warning(f'CameraFile.read: image not found {self._formatter.format(self._counter)}')
             return np.zeros((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
         if not peek:
-            self._counter += 1 if Path(self._formatter.format(self._counter + 1)).is_file() else 0
-        if img is not None and self._resize:
-            img = cv2.resize(img, self.resolution)
-        return img  # type: ignore
+            self._counter += 1 if self._counter + 1 in self.files else 0
+        for number in range(self._counter, self._counter + 1 + config.development.prefetch):
+            self._load(number, wait=False)
+        return self.crop.apply(img).copy()  # cached image stays unchanged
 
     def update(self, event: Event) -> None:
         pass
@@ -210,7 +314,10 @@ class CameraOpenCV(Camera):
             self.stream.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
             self.stream.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
             self.stream.set(cv2.CAP_PROP_FPS, self.framerate)
-        self.frame = np.array([])
+        self.ring = FrameRing(
+            shape=(self.resolution[1], self.resolution[0], 3), slots=ring_slots(self.framerate, config.video.frame_window)
+        )
+        self.crop = board_crop
         self.event: Event | None = None
         sleep(2)  # warm up camera
         atexit.register(self._atexit)  # cleanup on exit
@@ -222,29 +329,30 @@ class CameraOpenCV(Camera):
     def _atexit(self) -> None:
         atexit.unregister(self._atexit)
         self.stream.release()
-        self.frame = np.array([])
 
     @runtime_measure
-    def read(self, peek: bool = False) -> MatLike:
-        return self.frame.copy()
+    def read(self, peek: bool = False, timestamp: float | None = None) -> MatLike:
+        return read_ring(self.ring, self.resolution, peek, timestamp, config.video.frame_window, self.crop)
 
     def update(self, event: Event) -> None:
         self.event = event
         while True:
-            valid, self.frame = self.stream.read()
+            valid, frame = self.stream.read()
             if not valid:
                 logger.warning('CameraOpenCV: frame not valid')
-            if config.video.rotate:
-                self.frame = cv2.rotate(self.frame, cv2.ROTATE_180)
+            else:
+                self.ring.write(self.crop.apply(cv2.rotate(frame, cv2.ROTATE_180) if config.video.rotate else frame))
+                capture.add_captured()
             if event.is_set():
                 break
-            sleep(self.wait)
+            capture.wait()
         event.clear()
         self._atexit()
 
     def cancel(self) -> None:
         if self.event:
             self.event.set()
+            capture.wake()
             sleep(2 * self.wait)
         else:
             self._atexit()
@@ -0,0 +1,92 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from config import config
+from utils.metrics import metrics
+
+BOOST_TIME = 3.0  # seconds of high rate capture after a request
+SUSPEND_WAIT = 60.0  # max sleep of a suspended capture loop
+
+logger = logging.getLogger()
+
+
+class CaptureScheduler:
+    """Capture rate of the camera update loop.
+
+    The loop captures with video.idle_fps (0 = suspended) and switches to video.fps for BOOST_TIME seconds
+    after a button press, a /cam request or a read of an outdated frame.
+    """
+
+    def __init__(self):
+        self.captured = 0
+        self.consumed = 0
+        self._boost_until = 0.0
+        self._wakeup = threading.Event()
+
+    def boost(self, seconds: float = BOOST_TIME) -> None:
+        """capture with high rate for the next seconds"""
+        self._boost_until = max(self._boost_until, time.time() + seconds)
+        self._wakeup.set()
+
+    def wake(self) -> None:
+        """interrupt the current wait (e.g. on cancel)"""
+        self._wakeup.set()
+
+    def is_boosted(self) -> bool:
+        """high rate capture active"""
+        return time.time() < self._boost_until
+
+    def interval(self) -> float | None:
+        """seconds until the next capture, None if suspended"""
+        if self.is_boosted():
+            return 1 / config.video.fps
+        return 1 / config.video.idle_fps if config.video.idle_fps > 0 else None
+
+    def max_age(self) -> float:
+        """max age of a frame to be delivered without waiting for a new capture"""
+        interval = self.interval()
+        return 2 * interval if interval is not None else 0.0
+
+    def wait(self) -> None:
+        """wait for the next capture of the update loop"""
+        interval = self.interval()
+        self._wakeup.wait(timeout=interval if interval is not None else SUSPEND_WAIT)
+        self._wakeup.clear()
+
+    def add_captured(self) -> None:
+        """count captured frame"""
+        self.captured += 1
+
+    def add_consumed(self) -> None:
+        """count delivered frame"""
+        self.consumed += 1
+
+    def stats(self) -> dict:
+        """frames captured vs. consumed"""
+        return {'captured': self.captured, 'consumed': self.consumed, 'boosted': self.is_boosted()}
+
+
+capture = CaptureScheduler()
+metrics.gauge('frames_captured', lambda: capture.captured)
+metrics.gauge('frames_consumed', lambda: capture.consumed)
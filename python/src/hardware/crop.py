@@ -0,0 +1,106 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+import numpy as np
+from cv2.typing import MatLike
+
+from config import config
+
+SUSPEND_TIME = 3.0  # seconds of full frames after a suspend (e.g. /cam)
+
+logger = logging.getLogger()
+
+
+class BoardCrop:
+    """Region of interest around the board.
+
+    With video.crop the camera crops each frame right after capture to the bounding box of the warp
+    coordinates (video.warp_coordinates or the last detected warp) plus video.crop_margin. Warp coordinates
+    stay in full frame coordinates, origin() returns the offset of a cropped frame.
+    """
+
+    def __init__(self):
+        self.region: tuple[int, int, int, int] | None = None  # x0, y0, x1, y1
+        self.last_warp: np.ndarray | None = None
+        self._suspended_until = 0.0
+
+    def set_warp(self, rect) -> None:
+        """last detected warp in full frame coordinates"""
+        self.last_warp = np.array(rect, dtype='float32')
+
+    def reset(self) -> None:
+        """forget detected warp and region"""
+        self.last_warp, self.region = None, None
+
+    def suspend(self, seconds: float = SUSPEND_TIME) -> None:
+        """deliver full frames for the next seconds"""
+        self._suspended_until = max(self._suspended_until, time.time() + seconds)
+        self.region = None
+
+    def is_suspended(self) -> bool:
+        """crop is temporarily disabled"""
+        return time.time() < self._suspended_until
+
+    def _warp_rect(self) -> np.ndarray | None:
+        if config.video.warp_coordinates is not None:
+            return np.array(config.video.warp_coordinates, dtype='float32')
+        return self.last_warp
+
+    def _update_region(self, shape: tuple[int, ...]) -> tuple[int, int, int, int] | None:
+        rect = self._warp_rect() if config.video.crop and config.video.warp and not self.is_suspended() else None
+        if rect is None:
+            self.region = None
+            return None
+        margin = config.video.crop_margin
+        x0, y0 = np.floor(rect.min(axis=0)).astype(int) - margin
+        x1, y1 = np.ceil(rect.max(axis=0)).astype(int) + margin
+        x0, y0, x1, y1 = max(int(x0), 0), max(int(y0), 0), min(int(x1), shape[1]), min(int(y1), shape[0])
+        if x1 <= x0 or y1 <= y0:
+            self.region = None
+            return None
+        if self.region is not None:  # keep region while the board stays inside (stable frame shape)
+            r_x0, r_y0, r_x1, r_y1 = self.region
+            inner = margin // 2
+            if r_x0 <= x0 + inner and r_y0 <= y0 + inner and x1 - inner <= r_x1 and y1 - inner <= r_y1:
+                return self.region
+        self.region = (x0, y0, x1, y1)
+        logger.info(f'crop region {self.region} of {shape[1]}x{shape[0]}')
+        return self.region
+
+    def apply(self, image: MatLike) -> MatLike:
+        """view of the board region of a full frame"""
+        region = self._update_region(image.shape)
+        if region is None:
+            return image
+        x0, y0, x1, y1 = region
+        return image[y0:y1, x0:x1]
+
+    def origin(self, image: MatLike) -> tuple[int, int]:
+        """offset of the image in the full frame, (0, 0) if the image is not cropped"""
+        region = self.region
+        if region is None or image.shape[:2] != (region[3] - region[1], region[2] - region[0]):
+            return 0, 0
+        return region[0], region[1]
+
+
+board_crop = BoardCrop()
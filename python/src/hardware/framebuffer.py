@@ -0,0 +1,159 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+FRAME_SLOTS = 4  # minimum number of slots
+SCORE_SIZE = (244, 244)  # downscaled size for sharpness/motion scores
+
+logger = logging.getLogger()
+
+
+@dataclass(frozen=True)
+class Frame:
+    """captured frame, the image is a read-only view into the ring buffer"""
+
+    seq: int
+    timestamp: float
+    image: MatLike
+
+
+def ring_slots(fps: float, window: float) -> int:
+    """slots for the frames within +/- window around a button press captured with fps"""
+    return max(FRAME_SLOTS, math.ceil(2 * window * fps) + 2)
+
+
+def _score_image(img: MatLike) -> MatLike:
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if len(img.shape) == 3 else img
+    return cv2.resize(gray, SCORE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def sharpness(img: MatLike) -> float:
+    """variance of the laplacian (higher = sharper)"""
+    return float(cv2.Laplacian(img, cv2.CV_64F).var())
+
+
+def motion(img: MatLike, previous: MatLike) -> float:
+    """mean absolute difference to the previous frame (higher = more motion)"""
+    return float(np.mean(cv2.absdiff(img, previous)))
+
+
+class FrameRing:
+    """Preallocated ring buffer for camera frames.
+
+    The capture thread copies each frame into the oldest slot. Readers get read-only views without copying;
+    a view stays valid until the slot is reused (slots - 1 captures later), see is_valid().
+    """
+
+    def __init__(self, shape: tuple[int, ...], slots: int = FRAME_SLOTS):
+        self.slots = slots
+        self._buffer = np.zeros((slots, *shape), dtype=np.uint8)
+        self._seq = [-1] * slots
+        self._timestamp = [0.0] * slots
+        self._next = 0
+        self._lock = threading.Lock()
+        self._written = threading.Condition(self._lock)
+
+    def write(self, image: MatLike | None, timestamp: float | None = None) -> int:
+        """copy image into the next slot (single writer) and return its sequence number"""
+        if image is None or image.size == 0:
+            return -1
+        with self._lock:
+            if image.shape != self._buffer.shape[1:]:  # camera delivers another resolution
+                logger.info(f'frame ring: reallocate for shape {image.shape}')
+                self._buffer = np.zeros((self.slots, *image.shape), dtype=np.uint8)
+                self._seq = [-1] * self.slots
+            seq, slot, buffer = self._next, self._next % self.slots, self._buffer
+            self._seq[slot] = -1  # hide slot while writing
+        np.copyto(buffer[slot], image)
+        with self._lock:
+            self._seq[slot] = seq
+            self._timestamp[slot] = timestamp if timestamp is not None else time.time()
+            self._next = seq + 1
+            self._written.notify_all()
+        return seq
+
+    def _frame(self, slot: int) -> Frame:
+        image = self._buffer[slot].view()
+        image.flags.writeable = False
+        return Frame(seq=self._seq[slot], timestamp=self._timestamp[slot], image=image)
+
+    def frames(self) -> list[Frame]:
+        """all valid frames, oldest first"""
+        with self._lock:
+            slots = sorted((s for s in range(self.slots) if self._seq[s] >= 0), key=lambda s: self._seq[s])
+            return [self._frame(s) for s in slots]
+
+    def latest(self) -> Frame | None:
+        """last captured frame"""
+        frames = self.frames()
+        return frames[-1] if frames else None
+
+    def nearest(self, timestamp: float) -> Frame | None:
+        """frame captured closest to timestamp"""
+        frames = self.frames()
+        return min(frames, key=lambda f: abs(f.timestamp - timestamp)) if frames else None
+
+    def wait_for(self, timestamp: float, timeout: float) -> bool:
+        """wait until a frame captured at or after timestamp is available"""
+
+        def captured() -> bool:
+            return any(seq >= 0 and ts >= timestamp for seq, ts in zip(self._seq, self._timestamp, strict=True))
+
+        with self._written:
+            return self._written.wait_for(captured, timeout=timeout)
+
+    def best(self, timestamp: float, window: float) -> Frame | None:
+        """sharpest frame with least motion captured within timestamp +/- window"""
+        frames = self.frames()
+        candidates = [i for i, f in enumerate(frames) if abs(f.timestamp - timestamp) <= window]
+        if not candidates:
+            return self.nearest(timestamp)
+        scaled = [_score_image(f.image) for f in frames]
+
+        def score(i: int) -> float:
+            neighbour = i - 1 if i > 0 else i + 1  # the oldest frame is compared with its successor
+            move = motion(scaled[i], scaled[neighbour]) if neighbour < len(scaled) else 0.0
+            return sharpness(scaled[i]) / (1.0 + move)
+
+        best = max(candidates, key=score)
+        logger.debug(f'best frame {frames[best].seq} of {[frames[i].seq for i in candidates]} around {timestamp:.3f}')
+        return frames[best]
+
+    def is_valid(self, frame: Frame) -> bool:
+        """slot of the frame is not yet reused"""
+        with self._lock:
+            return self._seq[frame.seq % self.slots] == frame.seq
+
+    def copy(self, frame: Frame) -> MatLike:
+        """private copy of the frame, falls back to the latest frame if the slot was reused while copying"""
+        image = frame.image.copy()
+        if self.is_valid(frame):
+            return image
+        latest = self.latest()
+        return latest.image.copy() if latest is not None else image
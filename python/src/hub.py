@@ -0,0 +1,351 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Tournament hub: collects the move files of many boards (hub = http://<host>:<port> in upload-secret.ini) and
+serves the latest state of all tables as combined live feed.
+
+    cd python
+    PYTHONPATH=src python src/hub.py --port 8765 --dir work/hub --user USER --password PASSWORD
+
+    POST /upload/<table>           zip archive with the files of one or more moves (basic auth)
+    POST /delete/<table>           delete the moves of the table (basic auth)
+    GET  /tables                   latest status of all tables (json)
+    GET  /live                     server-sent events: snapshot of all tables, then one update per upload
+    GET  /files/<table>/<name>     persisted file of a table
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import json
+import logging
+import re
+import sys
+import time
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger()
+
+MAX_BODY = 64 * 1024 * 1024  # upload size of a batch
+MAX_FILE = 16 * 1024 * 1024  # unpacked size of a file in a batch
+MAX_UNPACKED = 128 * 1024 * 1024  # unpacked size of a batch
+LIVE_BACKLOG = 64  # queued updates per spectator, the oldest are dropped
+ALLOWED_EXTENSIONS = ('.jpeg', '.jpg', '.png', '.json', '.zip', '.log')  # same as php/scrabscrap.php
+TABLE_NAME = re.compile(r'[A-Za-z0-9_-]{1,32}')
+DATA_NAME = re.compile(r'data-(\d+)\.json')
+MOVE_FILES = ('image-', 'data-')  # deleted with a new game
+REASONS = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found', 413: 'Payload Too Large'}
+
+
+class BatchTooLargeError(ValueError):
+    """unpacked files of a batch exceed MAX_FILE or MAX_UNPACKED"""
+
+
+@dataclass
+class TableState:
+    """latest state of a table"""
+
+    name: str
+    move: int = -1  # index of the last data-N.json
+    status: dict | None = None  # content of status.json
+    files: set[str] = field(default_factory=set)
+    updated: float = 0.0
+    uploads: int = 0
+
+    def to_json(self) -> dict:
+        """state for the live feed"""
+        return {'table': self.name, 'move': self.move, 'updated': self.updated, 'status': self.status}
+
+
+class Hub:
+    """asyncio ingestion service for the uploads of many boards"""
+
+    def __init__(self, root: Path, auth: tuple[str, str] | None = None):
+        self.root = root
+        self.auth = f'Basic {base64.b64encode(":".join(auth).encode()).decode()}' if auth else None
+        self.tables: dict[str, TableState] = {}
+        self.spectators: set[asyncio.Queue[bytes]] = set()
+        self._pending: dict[Path, bytes | None] = {}  # path => content, None: delete
+        self._wake: asyncio.Event | None = None
+        self._write_lock: asyncio.Lock | None = None
+        self._writer: asyncio.Task | None = None
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = '0.0.0.0', port: int = 8765) -> asyncio.Server:  # noqa: S104
+        """start server and background persistence"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._wake, self._write_lock = asyncio.Event(), asyncio.Lock()
+        self._writer = asyncio.create_task(self._persist())
+        self._server = await asyncio.start_server(self._handle, host, port)
+        logger.info(f'hub listening on {[s.getsockname() for s in self._server.sockets]}, files in {self.root}')
+        return self._server
+
+    async def stop(self) -> None:
+        """stop server and write pending files"""
+        if self._server is not None:
+            self._server.close()
+            for queue in self.spectators:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(b'')  # end of feed
+            for writer in self._connections:
+                writer.close()
+            await self._server.wait_closed()
+        if self._writer is not None:
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+        await self.flush()
+
+    # persistence
+    async def flush(self) -> None:
+        """write pending files"""
+        if self._write_lock is None:
+            return
+        async with self._write_lock:
+            pending, self._pending = self._pending, {}
+            if pending:
+                await asyncio.to_thread(write_files, pending)
+
+    async def _persist(self) -> None:
+        while True:
+            await self._wake.wait()  # type: ignore[union-attr]
+            self._wake.clear()  # type: ignore[union-attr]
+            try:
+                await self.flush()
+            except OSError:
+                logger.exception('hub: can not write files')
+
+    def _store(self, path: Path, content: bytes | None) -> None:
+        self._pending[path] = content  # a newer version of a pending file replaces the older one
+        self._wake.set()  # type: ignore[union-attr]
+
+    # state
+    async def ingest(self, table: str, batch: bytes) -> TableState:
+        """take the files of an uploaded zip archive (unpacked in a worker thread)"""
+        files = await asyncio.to_thread(unpack, batch)
+        state = self.tables.setdefault(table, TableState(name=table))
+        for name, content, status in files:
+            self._store(self.root / table / name, content)
+            state.files.add(name)
+            if status is not None:
+                state.status = status
+            elif match := DATA_NAME.fullmatch(name):
+                state.move = max(state.move, int(match.group(1)))
+        state.updated, state.uploads = time.time(), state.uploads + 1
+        return state
+
+    def delete(self, table: str) -> TableState:
+        """drop the moves of a table (new game)"""
+        state = self.tables.setdefault(table, TableState(name=table))
+        folder = self.root / table
+        for path in [p for p in self._pending if p.parent == folder and p.name.startswith(MOVE_FILES)]:
+            del self._pending[path]
+        self._store(folder, None)
+        state.files = {name for name in state.files if not name.startswith(MOVE_FILES)}
+        state.move, state.updated = -1, time.time()
+        return state
+
+    # live feed
+    def snapshot(self) -> dict:
+        """latest state of all tables"""
+        return {name: state.to_json() for name, state in self.tables.items()}
+
+    def publish(self, state: TableState) -> None:
+        """send the update once encoded to all spectators"""
+        message = sse('update', state.to_json())
+        for queue in self.spectators:
+            if queue.full():
+                queue.get_nowait()  # slow spectator: drop the oldest update
+            queue.put_nowait(message)
+
+    async def _live(self, writer: asyncio.StreamWriter) -> None:
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=LIVE_BACKLOG)
+        self.spectators.add(queue)
+        try:
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n\r\n')
+            writer.write(sse('snapshot', self.snapshot()))
+            await writer.drain()
+            while message := await queue.get():
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self.spectators.discard(queue)
+
+    # http
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        try:
+            while request := await read_request(reader):
+                method, target, headers, body = request
+                if method == 'GET' and target == '/live':
+                    await self._live(writer)
+                    break
+                status, content_type, content = await self._route(method, target, headers, body)
+                respond(writer, status, content_type, content)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as oops:
+            respond(writer, 400, 'text/plain', str(oops).encode())
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _route(self, method: str, target: str, headers: dict[str, str], body: bytes) -> tuple[int, str, bytes]:
+        parts = target.split('?', maxsplit=1)[0].strip('/').split('/')
+        if method == 'GET' and parts == ['tables']:
+            return 200, 'application/json', json.dumps(self.snapshot()).encode()
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'files' and TABLE_NAME.fullmatch(parts[1]):
+            path = self.root / parts[1] / Path(parts[2]).name
+            content = self._pending.get(path)
+            if content is None:
+                try:
+                    content = await asyncio.to_thread(path.read_bytes)
+                except OSError:
+                    return 404, 'text/plain', b'not found'
+            return 200, content_type(path), content
+        if method == 'POST' and len(parts) == 2 and parts[0] in ('upload', 'delete'):
+            if self.auth is not None and headers.get('authorization') != self.auth:
+                return 401, 'text/plain', b'unauthorized'
+            if not TABLE_NAME.fullmatch(parts[1]):
+                return 400, 'text/plain', b'invalid table name'
+            try:
+                state = await self.ingest(parts[1], body) if parts[0] == 'upload' else self.delete(parts[1])
+            except BatchTooLargeError as oops:
+                logger.warning(f'hub: rejected upload of {parts[1]}: {oops}')
+                return 413, 'text/plain', b'batch too large'
+            except (zipfile.BadZipFile, json.JSONDecodeError, EOFError) as oops:
+                logger.warning(f'hub: invalid upload of {parts[1]}: {oops}')
+                return 400, 'text/plain', b'invalid batch'
+            self.publish(state)
+            return 200, 'application/json', json.dumps(state.to_json()).encode()
+        return 404, 'text/plain', b'not found'
+
+
+def unpack(batch: bytes) -> list[tuple[str, bytes, dict | None]]:
+    """name, content and parsed status.json of the files in a zip archive, limited to MAX_FILE per file"""
+    files: list[tuple[str, bytes, dict | None]] = []
+    total = 0
+    with zipfile.ZipFile(io.BytesIO(batch)) as archive:
+        for info in archive.infolist():
+            name = Path(info.filename).name
+            if info.is_dir() or not name.lower().endswith(ALLOWED_EXTENSIONS):
+                logger.warning(f'hub: {info.filename} ignored')
+                continue
+            if info.file_size > MAX_FILE:
+                raise BatchTooLargeError(f'{name}: {info.file_size} bytes')
+            with archive.open(info) as member:
+                content = member.read(MAX_FILE + 1)  # the size in the header is not trusted
+            total += len(content)
+            if len(content) > MAX_FILE or total > MAX_UNPACKED:
+                raise BatchTooLargeError(f'{name}: more than {MAX_FILE} bytes or batch more than {MAX_UNPACKED} bytes')
+            files.append((name, content, json.loads(content) if name == 'status.json' else None))
+    return files
+
+
+def sse(event: str, data: dict) -> bytes:
+    """server-sent event"""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+def content_type(path: Path) -> str:
+    """content type of a persisted file"""
+    return {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.json': 'application/json'}.get(
+        path.suffix.lower(), 'application/octet-stream'
+    )
+
+
+async def read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str], bytes] | None:
+    """method, target, headers and body of the next request, None at the end of the connection"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, _ = line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        raise ValueError(f'batch too large: {length}')
+    return method, target, headers, await reader.readexactly(length) if length else b''
+
+
+def respond(writer: asyncio.StreamWriter, status: int, content_type: str, content: bytes) -> None:
+    """write http response"""
+    writer.write(
+        f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\nContent-Type: {content_type}\r\n'
+        f'Content-Length: {len(content)}\r\n\r\n'.encode('latin-1')
+        + content
+    )
+
+
+def write_files(files: dict[Path, bytes | None]) -> None:
+    """write files (replaced atomically), None deletes a file or the move files of a table folder"""
+    for path, content in files.items():
+        if content is None:
+            for move_file in [p for p in path.glob('*') if p.name.startswith(MOVE_FILES)] if path.is_dir() else [path]:
+                move_file.unlink(missing_ok=True)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'{path.name}.part')
+        tmp.write_bytes(content)
+        tmp.replace(path)
+
+
+def main() -> int:
+    """run the hub"""
+    parser = argparse.ArgumentParser(description='tournament hub for the uploads of many boards')
+    parser.add_argument('--host', default='0.0.0.0')  # noqa: S104
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--dir', default='work/hub', help='folder of the persisted files (one sub folder per table)')
+    parser.add_argument('--user', help='user of the uploads (basic auth)')
+    parser.add_argument('--password', help='password of the uploads (basic auth)')
+    parser.add_argument('--insecure', action='store_true', help='accept uploads without credentials (test setups)')
+    args = parser.parse_args()
+    if not args.user and not args.insecure:
+        parser.error('--user is required (or --insecure to accept uploads without credentials)')
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format='%(asctime)s [%(levelname)-5.5s] %(message)s')
+    hub = Hub(Path(args.dir), auth=(args.user, args.password or '') if args.user else None)
+
+    async def serve() -> None:
+        server = await hub.start(args.host, args.port)
+        try:
+            await server.serve_forever()
+        finally:
+            await hub.stop()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Journal of the running game (work_dir/journal.jsonl, scrabble.journal) for the recovery after a power loss or a
+reboot. A game session with an output_dir keeps its journal there.
+
+Every button press, processed move and admin edit appends one json line. Records of the game carry the moves from
+the first changed move on (tiles, board changes, scores), so the game is rebuilt without the image recognition.
+Every SNAPSHOT_INTERVAL records the complete game is written to journal-snapshot.json together with the offset
+of the next record in the journal.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import MISSING, fields
+from datetime import datetime
+from enum import Enum
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import cv2
+
+from move import (
+    BoardType,
+    Move,
+    MoveChallenge,
+    MoveExchange,
+    MoveLastRackBonus,
+    MoveLastRackMalus,
+    MoveRegular,
+    MoveTimeMalus,
+    MoveType,
+    MoveUnknown,
+    MoveWithdraw,
+    Tile,
+)
+from utils.threadpool import Command, CommandWorker, Lane
+
+if TYPE_CHECKING:
+    from scrabble import Game
+
+JOURNAL = 'journal.jsonl'
+SNAPSHOT_INTERVAL = 20  # records between two snapshots
+MAX_AGE = 12 * 3600  # an older journal is not restored (seconds)
+
+MOVE_CLASSES: dict[MoveType, type[Move]] = {
+    cls.type: cls  # type: ignore[misc]
+    for cls in (
+        MoveRegular,
+        MoveExchange,
+        MoveWithdraw,
+        MoveChallenge,
+        MoveLastRackBonus,
+        MoveLastRackMalus,
+        MoveTimeMalus,
+        MoveUnknown,
+    )
+}
+MOVE_FIELDS = ('move', 'player', 'played_time', 'points', 'score', 'is_modified', 'rack_size', 'time')
+OPTIONAL_FIELDS = ('coord', 'is_vertical', 'is_scrabble', 'word', 'rack')
+TILE_FIELDS = ('new_tiles', 'removed_tiles')
+
+logger = logging.getLogger()
+
+Fingerprint = list[tuple]
+
+
+def tiles_to_json(tiles: BoardType) -> list:
+    """tiles as list of [col, row, letter, prob]"""
+    return [[col, row, tile.letter, tile.prob] for (col, row), tile in tiles.items()]
+
+
+def tiles_from_json(data: list) -> BoardType:
+    """tiles from list of [col, row, letter, prob]"""
+    return {(col, row): Tile(letter=letter, prob=prob) for col, row, letter, prob in data}
+
+
+def move_to_json(m: Move, previous_board: BoardType) -> dict:
+    """move as dict, the board is stored as changes to previous_board"""
+    data: dict[str, Any] = {'type': m.type.name}
+    data.update({key: getattr(m, key) for key in MOVE_FIELDS + OPTIONAL_FIELDS if hasattr(m, key)})
+    data.update({key: tiles_to_json(getattr(m, key)) for key in TILE_FIELDS if hasattr(m, key)})
+    data['board'] = tiles_to_json({c: t for c, t in m.board.items() if previous_board.get(c) != t})
+    data['cleared'] = [list(c) for c in previous_board.keys() - m.board.keys()]
+    return data
+
+
+def move_from_json(data: dict, game: Game, previous: Move | None) -> Move:
+    """rebuild the move without recalculation (the stored board and scores are used as they are)"""
+    move_type = MoveType[data['type']]
+    cls = MOVE_CLASSES.get(move_type, MoveExchange)
+    m = cls.__new__(cls)
+    for f in fields(cls):
+        if f.default is not MISSING:
+            setattr(m, f.name, f.default)
+        elif f.default_factory is not MISSING:
+            setattr(m, f.name, f.default_factory())
+    m.type, m.game, m.previous_move, m.img = move_type, game, previous, None
+    for key in MOVE_FIELDS + OPTIONAL_FIELDS:
+        if key in data:
+            setattr(m, key, tuple(data[key]) if isinstance(data[key], list) else data[key])
+    for key in TILE_FIELDS:
+        if key in data:
+            setattr(m, key, tiles_from_json(data[key]))
+    m.board = {**previous.board} if previous is not None else {}
+    for coord in data['cleared']:
+        m.board.pop(tuple(coord), None)
+    m.board.update(tiles_from_json(data['board']))
+    m.calculate_bag()
+    return m
+
+
+def moves_to_json(game: Game, start: int = 0) -> list[dict]:
+    """moves from index start as dicts"""
+    return [move_to_json(m, game.moves[i - 1].board if i > 0 else {}) for i, m in enumerate(game.moves[start:], start=start)]
+
+
+def fingerprint(game: Game) -> Fingerprint:
+    """cheap comparable state of the moves"""
+    return [
+        (
+            id(m),
+            m.type,
+            m.player,
+            m.points,
+            m.score,
+            m.is_modified,
+            frozenset((c, t.letter, t.prob) for c, t in m.board.items()),
+            frozenset((c, t.letter) for c, t in m.new_tiles.items()),
+        )
+        for m in game.moves
+    ]
+
+
+def first_changed(before: Fingerprint, after: Fingerprint) -> int:
+    """index of the first changed move"""
+    for i, (old, new) in enumerate(zip(before, after, strict=False)):
+        if old != new:
+            return i
+    return min(len(before), len(after))
+
+
+def as_json(value: Any) -> Any:
+    """argument of a processing function as json value (None: not recorded)"""
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (str, int, float, bool, tuple, list)):
+        return value
+    return None
+
+
+class Journal:
+    """append only journal of a game session, written by a background worker"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.snapshot_path = path.with_name(f'{path.stem}-snapshot.json')
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.status: dict[str, Any] = {}  # last state, clock and end of game for the snapshot
+        self.file = None
+        self.queue: queue.Queue = queue.Queue()
+        CommandWorker(cmd_queue=self.queue, lane=Lane.BACKGROUND).start()
+
+    def _header(self, event: str, game: Game) -> dict:
+        self.seq += 1
+        return {'seq': self.seq, 't': time.time(), 'event': event, 'nicknames': game.nicknames}
+
+    def record(self, event: str, game: Game, before: Fingerprint | None = None, **data) -> None:
+        """append event, with before the moves changed since the fingerprint are recorded"""
+        with self.lock:
+            rec = self._header(event, game) | data
+            self.status |= {key: data[key] for key in ('state', 'clock') if key in data}
+            if event == 'end_of_game':
+                self.status['finished'] = True
+            if before is not None:
+                start = first_changed(before, fingerprint(game))
+                rec |= {'from': start, 'moves': moves_to_json(game, start)}
+            snapshot = None
+            if self.seq % SNAPSHOT_INTERVAL == 0:
+                snapshot = self._snapshot(game)
+            self.queue.put_nowait(Command(self._write, json.dumps(rec), snapshot))
+
+    def restart(self, game: Game) -> None:
+        """start the journal of a new game"""
+        with self.lock:
+            self.seq = 0
+            self.status = {}
+            rec = self._header('new_game', game) | {'gamestart': str(game.gamestart), 'from': 0, 'moves': []}
+            self.queue.put_nowait(Command(self._restart, json.dumps(rec)))
+
+    def flush(self) -> None:
+        """wait until the journal is written"""
+        self.queue.join()
+
+    def _snapshot(self, game: Game) -> dict:
+        return {
+            'seq': self.seq,
+            'nicknames': game.nicknames,
+            'gamestart': str(game.gamestart),
+            'moves': moves_to_json(game),
+        } | self.status
+
+    def _restart(self, line: str) -> None:
+        try:
+            self.snapshot_path.unlink(missing_ok=True)  # must not be combined with the new journal
+            if self.file is not None:
+                self.file.close()
+            self.file = self.path.open('w', encoding='utf-8')
+        except OSError:
+            logger.exception(f'can not restart journal {self.path}')
+            self.file = None
+            return
+        self._write(line)
+
+    def _write(self, line: str, snapshot: dict | None = None) -> None:
+        try:
+            if self.file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.file = self.path.open('a', encoding='utf-8')
+            self.file.write(line + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            if snapshot is not None:
+                snapshot['offset'] = self.file.tell()
+                tmp = self.snapshot_path.with_suffix('.tmp')
+                tmp.write_text(json.dumps(snapshot), encoding='utf-8')
+                tmp.replace(self.snapshot_path)
+        except OSError:
+            logger.exception(f'can not write journal {self.path}')
+
+    def load(self) -> dict | None:
+        """game data, state and clock of the journal (None: no journal, journal too old or invalid)"""
+        try:
+            if time.time() - self.path.stat().st_mtime > MAX_AGE:
+                logger.info(f'journal {self.path} too old')
+                return None
+            data: dict = {'seq': 0, 'offset': 0, 'moves': [], 'finished': False}
+            if self.snapshot_path.exists():
+                data |= json.loads(self.snapshot_path.read_text(encoding='utf-8'))
+            with self.path.open('rb') as file:
+                file.seek(data['offset'])
+                for line in file:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        logger.warning(f'journal {self.path}: incomplete record after {data["seq"]}')
+                        break
+                    self._apply(data, rec)
+                    data['offset'] += len(line)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.exception(f'can not read journal {self.path}')
+            return None
+        return data if 'gamestart' in data else None
+
+    @staticmethod
+    def _apply(data: dict, rec: dict) -> None:
+        if rec['seq'] <= data['seq'] and rec['event'] != 'new_game':
+            return
+        data['seq'] = rec['seq']
+        data['finished'] = data['finished'] or rec['event'] == 'end_of_game'
+        data.update({key: rec[key] for key in ('nicknames', 'gamestart', 'state', 'clock') if key in rec})
+        if 'moves' in rec:
+            data['moves'][rec['from'] :] = rec['moves']
+
+    def restore(self, game: Game, data: dict) -> Game:
+        """rebuild the game from the loaded journal and continue the journal"""
+        game.nicknames = tuple(data['nicknames'])  # type: ignore[assignment]
+        game.gamestart = datetime.fromisoformat(data['gamestart'])
+        game.moves.clear()
+        previous = None
+        for move_data in data['moves']:
+            previous = move_from_json(move_data, game, previous)
+            game.moves.append(previous)
+        if previous is not None and (image := game.web_dir / f'image-{previous.move}.jpg').exists():
+            previous.img = cv2.imread(str(image))  # used for a withdraw of the last move
+        with self.lock:
+            self.seq = data['seq']
+            self.status = {key: data[key] for key in ('state', 'clock', 'finished') if key in data}
+            with self.path.open('r+b') as file:
+                file.truncate(data['offset'])  # an incomplete record is dropped
+        logger.info(f'game restored from journal with {len(game.moves)} moves (record {self.seq})')
+        return game
+
+
+def journaled(func: Callable) -> Callable:
+    """record the changes of the game (first argument) made by the processing function"""
+
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(game: Game, *args, **kwargs):
+        journal = game.journal
+        if journal is None:
+            return func(game, *args, **kwargs)
+        before = fingerprint(game)
+        try:
+            return func(game, *args, **kwargs)
+        finally:
+            arguments = signature.bind_partial(game, *args, **kwargs).arguments
+            params = {k: as_json(v) for k, v in arguments.items() if k != 'game' and as_json(v) is not None}
+            journal.record(func.__name__, game, before=before, args=params)
+
+    return wrapper
@@ -0,0 +1,324 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Word list of a language as minimal automaton (DAWG), memory mapped from work/lexicon-<language>.dawg
+(scrabble.lexicon = True). The file is built from work/lexicon-<language>.txt (one word per line) on first use
+or with
+
+    cd python
+    PYTHONPATH=src python src/lexicon.py build work/lexicon-de.txt
+    PYTHONPATH=src python src/lexicon.py check ZUG ZUGX
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import mmap
+import sys
+import threading
+from array import array
+from collections.abc import Callable, Iterable
+from itertools import product
+from pathlib import Path
+
+from bitboard import from_coords, in_one_col, in_one_row
+from config import config
+from move import BoardType, CoordType, Tile
+from utils.metrics import metrics
+from utils.util import Static
+
+MAGIC = 0x47574144  # 'DAWG'
+VERSION = 1
+HEADER = 5  # magic, version, nodes, edges, root
+BLANK = '_'  # unknown letter of a blank, matches every letter
+MAX_SUSPECTS = 3  # low probability tiles tried with alternative letters
+
+logger = logging.getLogger()
+
+
+def words_path(language: str | None = None) -> Path:
+    """word list of the language"""
+    return config.path.work_dir / f'lexicon-{language or config.board.language}.txt'
+
+
+def dawg_path(language: str | None = None) -> Path:
+    """automaton file of the language"""
+    return config.path.work_dir / f'lexicon-{language or config.board.language}.dawg'
+
+
+class _Node:  # pylint: disable=too-few-public-methods
+    __slots__ = ('edges', 'final')
+
+    def __init__(self):
+        self.edges: dict[str, _Node] = {}
+        self.final = False
+
+    def key(self) -> tuple:
+        return self.final, tuple((label, id(child)) for label, child in sorted(self.edges.items()))
+
+
+def build(words: Iterable[str], path: Path) -> int:
+    """write the minimal automaton of the words (incremental construction over the sorted words), returns node count"""
+    root = _Node()
+    register: dict[tuple, _Node] = {}
+    unchecked: list[tuple[_Node, str, _Node]] = []
+
+    def minimize(down_to: int) -> None:
+        while len(unchecked) > down_to:
+            parent, label, child = unchecked.pop()
+            parent.edges[label] = register.setdefault(child.key(), child)
+
+    previous = ''
+    for word in sorted({w.strip().upper() for w in words if w.strip()}):
+        common = next(
+            (i for i, (a, b) in enumerate(zip(word, previous, strict=False)) if a != b), min(len(word), len(previous))
+        )
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for label in word[common:]:
+            child = _Node()
+            node.edges[label] = child
+            unchecked.append((node, label, child))
+            node = child
+        node.final = True
+        previous = word
+    minimize(0)
+
+    numbers: dict[int, int] = {id(root): 0}
+    nodes = [root]
+    for node in nodes:  # breadth first numbering
+        for child in node.edges.values():
+            if id(child) not in numbers:
+                numbers[id(child)] = len(nodes)
+                nodes.append(child)
+    offsets, labels, targets = array('I', [0]), array('I'), array('I')
+    for node in nodes:
+        for label, child in sorted(node.edges.items()):
+            labels.append(ord(label))
+            targets.append(numbers[id(child)])
+        offsets.append(len(labels))
+    final = array('I', (node.final for node in nodes))
+    with path.open('wb') as file:
+        array('I', [MAGIC, VERSION, len(nodes), len(labels), 0]).tofile(file)
+        for part in (offsets, labels, targets, final):
+            part.tofile(file)
+    return len(nodes)
+
+
+class Dawg:
+    """memory mapped automaton (native byte order uint32: header, edge offsets per node, labels, targets, final)"""
+
+    def __init__(self, path: Path):
+        with path.open('rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._words = memoryview(self._mmap).cast('I')
+        magic, version, nodes, edges, self.root = self._words[:HEADER]
+        if magic != MAGIC or version != VERSION or len(self._words) != HEADER + 2 * nodes + 1 + 2 * edges:
+            self.close()
+            raise ValueError(f'invalid lexicon file {path}')
+        start = HEADER
+        self.offsets = self._words[start : start + nodes + 1]
+        start += nodes + 1
+        self.labels = self._words[start : start + edges]
+        self.targets = self._words[start + edges : start + 2 * edges]
+        self.final = self._words[start + 2 * edges :]
+        self.nodes = nodes
+
+    def close(self) -> None:
+        """release the memory map"""
+        for view in ('offsets', 'labels', 'targets', 'final'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._words.release()
+        self._mmap.close()
+
+    def _child(self, node: int, label: int) -> int:
+        """binary search of the edge label, -1 if missing"""
+        low, high = self.offsets[node], self.offsets[node + 1]
+        while low < high:
+            mid = (low + high) // 2
+            if self.labels[mid] < label:
+                low = mid + 1
+            else:
+                high = mid
+        return self.targets[low] if low < self.offsets[node + 1] and self.labels[low] == label else -1
+
+    def __contains__(self, word: str) -> bool:
+        return self.match(word.upper())
+
+    def match(self, word: str, node: int | None = None) -> bool:
+        """word (upper case) is in the word list, BLANK matches every letter"""
+        node = self.root if node is None else node
+        for pos, letter in enumerate(word):
+            if letter == BLANK:
+                return any(
+                    self.match(word[pos + 1 :], self.targets[i]) for i in range(self.offsets[node], self.offsets[node + 1])
+                )
+            node = self._child(node, ord(letter))
+            if node < 0:
+                return False
+        return bool(self.final[node])
+
+
+def line_word(board: BoardType, coord: CoordType, vertical: bool) -> list[CoordType]:
+    """coordinates of the word through coord"""
+    d_col, d_row = (0, 1) if vertical else (1, 0)
+    col, row = coord
+    while (col - d_col, row - d_row) in board:
+        col, row = col - d_col, row - d_row
+    coords = []
+    while (col, row) in board:
+        coords.append((col, row))
+        col, row = col + d_col, row + d_row
+    return coords
+
+
+def played_words(board: BoardType, new_tiles: BoardType) -> list[tuple[str, list[CoordType]]]:
+    """main word and cross words (at least 2 letters) of the new tiles on the board"""
+    if not new_tiles:
+        return []
+    bits = from_coords(new_tiles)
+    if not (in_one_row(bits) or in_one_col(bits)):
+        return []
+    directions = {False, True} if len(new_tiles) == 1 else {not in_one_row(bits)}
+    words: list[list[CoordType]] = []
+    for vertical in directions:
+        words.append(line_word(board, next(iter(new_tiles)), vertical))
+        if len(new_tiles) > 1:
+            words.extend(line_word(board, coord, not vertical) for coord in new_tiles)
+    result, seen = [], set()
+    for coords in words:
+        if len(coords) > 1 and tuple(coords) not in seen:
+            seen.add(tuple(coords))
+            result.append((''.join(board[c].letter.upper() for c in coords), coords))
+    return result
+
+
+class Lexicon(Static):
+    """word check of the moves with the memory mapped automaton of the configured language"""
+
+    lock = threading.Lock()
+    dawg: Dawg | None = None
+    language: str | None = None
+
+    @classmethod
+    def load(cls) -> Dawg | None:
+        """automaton of the configured language, built from the word list if missing or outdated"""
+        with cls.lock:
+            if cls.language != config.board.language:  # the old map is released with the last reference
+                cls.language, cls.dawg = config.board.language, None
+                source, path = words_path(), dawg_path()
+                try:
+                    if source.is_file() and (not path.is_file() or path.stat().st_mtime < source.stat().st_mtime):
+                        with source.open(encoding='utf-8') as file:
+                            logger.info(f'build lexicon {path} with {build(file, path)} nodes')
+                    if path.is_file():
+                        cls.dawg = Dawg(path)
+                    else:
+                        logger.warning(f'lexicon {source} not found, words are not checked')
+                except (OSError, ValueError):
+                    logger.exception(f'can not load lexicon {path}')
+            return cls.dawg
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """lexicon is switched on and available"""
+        return config.scrabble.lexicon and cls.load() is not None
+
+    @classmethod
+    def reset(cls) -> None:
+        """reload the automaton on next use"""
+        with cls.lock:
+            cls.dawg, cls.language = None, None
+
+    @classmethod
+    def _invalid(cls, board: BoardType, new_tiles: BoardType) -> list[tuple[str, list[CoordType]]]:
+        dawg = cls.load()
+        if dawg is None:
+            return []
+        return [(word, coords) for word, coords in played_words(board, new_tiles) if not dawg.match(word)]
+
+    @classmethod
+    def invalid_words(cls, board: BoardType, new_tiles: BoardType) -> list[str]:
+        """words of the new tiles which are not in the word list"""
+        return [word for word, _ in cls._invalid(board, new_tiles)]
+
+    @classmethod
+    def correct(cls, board: BoardType, new_tiles: BoardType, alternatives: Callable[[CoordType], list[Tile]]) -> BoardType:
+        """letters for the low probability new tiles of invalid words, if alternatives make all words valid
+
+        only the MAX_SUSPECTS new tiles with the lowest probability are analyzed again; of the valid combinations the
+        one with the best probability sum is used, the tiles keep the probability of the recognition
+        """
+        invalid = cls._invalid(board, new_tiles)
+        if not invalid:
+            return {}
+        metrics.inc('lexicon_invalid')
+        suspects = sorted(
+            {
+                coord
+                for _, coords in invalid
+                for coord in coords
+                if coord in new_tiles
+                and new_tiles[coord].prob < config.board.min_tiles_rate
+                and new_tiles[coord].letter.isupper()  # not a blank
+            },
+            key=lambda coord: new_tiles[coord].prob,
+        )[:MAX_SUSPECTS]
+        if not suspects:
+            return {}
+        best, best_prob = None, -1
+        for combination in product(*(alternatives(coord) for coord in suspects)):
+            trial = dict(zip(suspects, combination, strict=True))
+            if not cls._invalid({**board, **trial}, {**new_tiles, **trial}):
+                prob = sum(tile.prob for tile in combination)
+                if prob > best_prob:
+                    best, best_prob = trial, prob
+        if best is None:
+            return {}
+        metrics.inc('lexicon_corrected')
+        return {coord: Tile(letter=tile.letter, prob=new_tiles[coord].prob) for coord, tile in best.items()}
+
+
+def main() -> int:
+    """build the automaton or check words"""
+    parser = argparse.ArgumentParser(description='lexicon (DAWG) of the configured language')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='build work/lexicon-<language>.dawg from a word list')
+    build_parser.add_argument('words', nargs='?', help='word list (default: work/lexicon-<language>.txt)')
+    check_parser = subparsers.add_parser('check', help='check words')
+    check_parser.add_argument('words', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        source = Path(args.words) if args.words else words_path()
+        with source.open(encoding='utf-8') as file:
+            nodes = build(file, dawg_path())
+        print(f'{dawg_path()} with {nodes} nodes written')
+        return 0
+    dawg = Lexicon.load()
+    if dawg is None:
+        print(f'lexicon {dawg_path()} not found')
+        return 1
+    for word in args.words:
+        print(f'{word}: {"valid" if word in dawg else "invalid"}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
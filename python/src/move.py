@@ -29,6 +29,7 @@ from typing import TYPE_CHECKING
 
 from cv2.typing import MatLike
 
+from bitboard import from_coords, in_one_col, in_one_row
 from config import BAGS, DOUBLE_LETTER, DOUBLE_WORDS, SCORES, TRIPLE_LETTER, TRIPLE_WORDS, config
 
 if TYPE_CHECKING:
@@ -50,6 +51,11 @@ def scores(tile: str) -> int:
     return SCORES[config.board.language].get(tile, 0)
 
 
+def bag_letter(tile: Tile) -> str:
+    """returns the letter of the bag tile (blanks with a lower char are counted as '_')"""
+    return '_' if tile.letter.isalpha() and tile.letter.islower() else tile.letter
+
+
 def gcg_to_coord(gcg_string: str) -> tuple[bool, tuple[int, int]]:
     """convert gcg coordinates to board coordinates"""
     gcg_coord_h = re.compile('([A-Oa-o])(\\d+)')
@@ -156,7 +162,11 @@ class Move:  # pylint: disable=too-many-instance-attributes
 
     board: BoardType = field(default_factory=dict)
     rack_size: tuple[int, int] = (7, 7)
+    bag_delta: Counter[str] = field(default_factory=Counter, repr=False)
+    board_letters: Counter[str] = field(default_factory=Counter, repr=False)
     previous_move: Move | None = None
+    trace: dict[str, float] = field(default_factory=dict, repr=False, compare=False)  # timings (see output.move_trace)
+    _bag_tiles: list[str] | None = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.new_tiles = {}
@@ -188,9 +198,34 @@ class Move:  # pylint: disable=too-many-instance-attributes
         self.rack_size = self.previous_move.rack_size if self.previous_move else (7, 7)
         return self.rack_size
 
+    def calculate_bag(self) -> Counter[str]:
+        """calculates and sets the bag delta (tiles taken from the bag) and the letters on board after move"""
+        previous_board = self.previous_move.board if self.previous_move else {}
+        self.bag_delta = Counter()
+        for coord in previous_board.keys() - self.board.keys():
+            self.bag_delta[bag_letter(previous_board[coord])] -= 1
+        for coord, tile in self.board.items():
+            previous_tile = previous_board.get(coord)
+            if previous_tile is None:
+                self.bag_delta[bag_letter(tile)] += 1
+            elif (letter := bag_letter(tile)) != (previous_letter := bag_letter(previous_tile)):
+                self.bag_delta[letter] += 1
+                self.bag_delta[previous_letter] -= 1
+        self.board_letters = self.previous_move.board_letters.copy() if self.previous_move else Counter()
+        self.board_letters.update(self.bag_delta)
+        self._bag_tiles = None  # invalidate memoized bag
+        return self.bag_delta
+
+    def tiles_in_bag(self) -> list[str]:
+        """returns list of tiles in bag after move"""
+        if self._bag_tiles is None:
+            self._bag_tiles = [k for k, count in bag.items() for _ in range(count - min(count, self.board_letters[k]))]
+        return list(self._bag_tiles)
+
     def calculate_score(self) -> tuple[int, tuple[int, int]]:
         """calculates and sets score after move"""
         previous_score = self.previous_move.score if self.previous_move else (0, 0)
+        self.calculate_bag()
         self.calculate_rack_size()
         self.calculate_points()
         dx, dy = ((self.points, 0), (0, self.points))[self.player]
@@ -202,10 +237,14 @@ class Move:  # pylint: disable=too-many-instance-attributes
         """returns word of move"""
         return ''
 
+    def invalid_blanks(self, tiles_candidates: set) -> list[CoordType]:
+        """new blanks which are not found in tiles_candidates"""
+        return [i for i in self.new_tiles if (self.board[i].letter == '_') and i not in tiles_candidates]
+
     def cleanup_invalid_blanks(self, tiles_candidates: set) -> None:
         """cleanup invalid blanks"""
         if self.new_tiles:
-            blanks_to_remove = [i for i in self.new_tiles if (self.board[i].letter == '_') and i not in tiles_candidates]
+            blanks_to_remove = self.invalid_blanks(tiles_candidates)
             for to_del in blanks_to_remove:
                 del self.new_tiles[to_del]
             if blanks_to_remove:
@@ -376,8 +415,9 @@ class MoveRegular(Move):  # pylint: disable=too-many-instance-attributes
         if not self.new_tiles:
             return False, (-1, -1)
         changed = sorted(self.new_tiles)  # ensure sorted
-        horizontal = len(Counter(col for col, _ in changed)) > 1
-        self.is_vertical = len(Counter(row for _, row in changed)) > 1
+        new_tiles = from_coords(changed)
+        horizontal = not in_one_col(new_tiles)
+        self.is_vertical = not in_one_row(new_tiles)
         if self.is_vertical and horizontal:
             raise InvalidMoveError(f'move: illegal move horizontal and vertical changes detected {changed}')
         if len(self.new_tiles) == 1:  # only 1 tile
@@ -590,3 +630,4 @@ class MoveUnknown(Move):
         self.score = self.previous_move.score if self.previous_move else (0, 0)
         self.board = {**previous_board}
         self.board.update(self.new_tiles)
+        self.calculate_bag()
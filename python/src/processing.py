@@ -19,26 +19,29 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 from __future__ import annotations
 
 import logging
+import time
 from contextlib import suppress
-from pathlib import Path
+from functools import partial
 from threading import Event
 
 import cv2
 from cv2.typing import MatLike
 
-from analyzer import BLANK_PROP, MAX_TILE_PROB, analyze, filter_candidates
+from analyzer import BLANK_PROP, MAX_TILE_PROB, filter_candidates, tile_alternatives
 from config import SCORES, config
-from customboard import filter_image, warp_image
-from move import Move, gcg_to_coord
+from framecache import FrameAnalysis
+from game_board.board import BOARD_CENTER_COORD
+from journal import journaled
+from lexicon import Lexicon
+from move import gcg_to_coord
+from repair import repair_following_moves
 from scrabble import IMAGE_FLAG, JSON_FLAG, BoardType, Game, MoveType, Tile
+from utils.metrics import metrics
 from utils.threadpool import Command
-from utils.upload import upload
-from utils.util import handle_exceptions, rotate_logs, runtime_measure, trace
+from utils.util import handle_exceptions, rotate_logs, runtime_measure, runtime_trace, trace
 
 logger = logging.getLogger()
 
-BOARD_CENTER_COORD = (7, 7)
-
 
 def event_set(event: Event | None) -> None:
     """set event and skips set if event is None. Informs the webservice about the end of the task"""
@@ -46,6 +49,7 @@ def event_set(event: Event | None) -> None:
         event.set()
 
 
+@journaled
 @handle_exceptions
 def remove_blanko(game: Game, gcg_coord: str, event: Event | None = None) -> None:
     """remove blank"""
@@ -56,6 +60,7 @@ def remove_blanko(game: Game, gcg_coord: str, event: Event | None = None) -> Non
     event_set(event=event)
 
 
+@journaled
 @handle_exceptions
 def set_blankos(game: Game, gcg_coord: str, value: str, event: Event | None = None) -> None:
     """set (lower) char for blanko"""
@@ -66,6 +71,7 @@ def set_blankos(game: Game, gcg_coord: str, value: str, event: Event | None = No
     event_set(event=event)
 
 
+@journaled
 @handle_exceptions
 def admin_insert_moves(game: Game, index: int, event: Event | None = None) -> None:
     """insert two exchange moves before move at index"""
@@ -75,6 +81,7 @@ def admin_insert_moves(game: Game, index: int, event: Event | None = None) -> No
     event_set(event=event)
 
 
+@journaled
 @handle_exceptions
 def admin_change_move(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     game: Game,
@@ -92,6 +99,7 @@ def admin_change_move(  # pylint: disable=too-many-arguments, too-many-positiona
     if index < 0 or index >= len(game.moves):
         raise ValueError(f'Invalid index: {index}')
 
+    previous_keys = [set(m.board.keys()) for m in game.moves]  # occupied fields before the edit
     required_fields = all(x is not None for x in (coord, isvertical, word))
     if movetype == MoveType.REGULAR and required_fields:
         if not word or not word.strip():
@@ -110,54 +118,11 @@ def admin_change_move(  # pylint: disable=too-many-arguments, too-many-positiona
     else:
         event_set(event=event)
         return
-    _repair_following_moves(game, index)
+    repair_following_moves(game, index, previous_keys, event=event)
     game.write_json_from(index=index, write_mode=[JSON_FLAG, IMAGE_FLAG])
     event_set(event=event)
 
 
-def _repair_following_moves(game: Game, index: int):
-    for i in range(index + 1, len(game.moves)):
-        _repair_move(game, i)
-
-
-def _repair_move(game: Game, i: int):
-    current_move = game.moves[i]
-
-    if current_move.is_modified:
-        current_move.setup_board()
-        logger.info(f'repair #{i}: type {current_move.type} edited move - skipping')
-        return
-
-    if current_move.type not in (MoveType.REGULAR, MoveType.EXCHANGE, MoveType.UNKNOWN):
-        # other move types: just recalc score/type
-        game.change_move_at(index=i, movetype=current_move.type)
-        logger.info(f'repair #{i}: type {current_move.type} recalc score')
-        return
-
-    prev_board = game.moves[i - 1].board
-    new_tiles = _get_new_tiles_for_move(current_move, prev_board)
-
-    if new_tiles:
-        game.change_move_at(index=i, movetype=MoveType.REGULAR, new_tiles=new_tiles)
-        logger.info(f'repair #{i}: type {current_move.type} as REGULAR with {new_tiles}')
-    else:
-        movetype = MoveType.EXCHANGE if current_move.type == MoveType.REGULAR else current_move.type
-        game.change_move_at(index=i, movetype=movetype)
-        logger.info(f'repair #{i}: type {current_move.type} as {movetype}')
-
-
-def _get_new_tiles_for_move(current_move: Move, prev_board: BoardType):
-    """Extract new tiles from image if available, otherwise use existing tiles"""
-    new_tiles = current_move.new_tiles
-
-    if current_move.img is None:
-        return new_tiles
-
-    # prefer reprocessing a sufficiently large image
-    new_board = _reapply_image_processing(prev_board, current_move.img)  # pyright: ignore[reportArgumentType]
-    return {c: new_board[c] for c in new_board.keys() - prev_board.keys()}
-
-
 def _create_new_tiles(isvertical: bool, coord: tuple[int, int], word: str, previous_board: BoardType) -> dict:
     directions = {True: (0, 1), False: (1, 0)}
     dcol, drow = directions[isvertical]
@@ -174,14 +139,7 @@ def _create_new_tiles(isvertical: bool, coord: tuple[int, int], word: str, previ
     return new_tiles
 
 
-def _reapply_image_processing(previous_board: BoardType, img: MatLike) -> BoardType:
-    warped_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    _, tiles_candidates = filter_image(img)  # find potential tiles on board
-    ignore_coords = set(previous_board.keys())
-    tiles_candidates = filter_candidates(BOARD_CENTER_COORD, tiles_candidates | ignore_coords, ignore_coords)
-    return analyze(warped_gray, previous_board.copy(), tiles_candidates)  # analyze image
-
-
+@journaled
 @handle_exceptions
 def admin_del_challenge(game: Game, index: int, event: Event | None = None) -> None:
     """delete challenge move index (index)"""
@@ -191,6 +149,7 @@ def admin_del_challenge(game: Game, index: int, event: Event | None = None) -> N
     event_set(event=event)
 
 
+@journaled
 @handle_exceptions
 def admin_toggle_challenge_type(game: Game, index: int, event: Event | None = None) -> None:
     """toggle challenge type on move number"""
@@ -200,6 +159,7 @@ def admin_toggle_challenge_type(game: Game, index: int, event: Event | None = No
     event_set(event=event)
 
 
+@journaled
 @handle_exceptions
 def admin_ins_challenge(game: Game, index: int, move_type: MoveType, event: Event | None = None) -> None:
     """insert invalid challenge or withdraw for move number"""
@@ -216,17 +176,24 @@ def admin_ins_challenge(game: Game, index: int, move_type: MoveType, event: Even
 
 @runtime_measure
 def _image_processing(game: Game, img: MatLike) -> tuple[MatLike, dict]:
-    warped, warped_gray = warp_image(img)  # warp image if necessary
-    _, tiles_candidates = filter_image(warped)  # find potential tiles on board
+    frame = game.frames.get(img)
+    warped, warped_gray = frame.warp()  # warp image if necessary
+    tiles_candidates = frame.tiles_candidates()  # find potential tiles on board
 
     if game.moves:
         game.moves[-1].cleanup_invalid_blanks(tiles_candidates=tiles_candidates)
-    ignore_coords = game.get_coords_to_ignore()
+    board = game.moves[-1].board.copy() if game.moves else {}  # copy board for analyze
+    return warped, _analyze_candidates(game, frame, warped_gray, tiles_candidates, board)
+
+
+def _analyze_candidates(
+    game: Game, frame: FrameAnalysis, warped_gray: MatLike, tiles_candidates: set, board: BoardType
+) -> BoardType:
+    ignore_coords = game.verification.coords_to_ignore(board, warped_gray)  # confirmed tiles with unchanged cells
     tiles_candidates |= ignore_coords  # tiles_candidates must contain ignored_coords
     # remove all tiles without path from center
     tiles_candidates = filter_candidates(BOARD_CENTER_COORD, tiles_candidates, ignore_coords)
-    board = game.moves[-1].board.copy() if game.moves else {}  # copy board for analyze
-    return warped, analyze(warped_gray, board, tiles_candidates)  # analyze image
+    return frame.analyze(board, tiles_candidates)  # analyze image
 
 
 def _board_diff(board: BoardType, previous_board: BoardType) -> tuple[BoardType, BoardType, BoardType]:
@@ -246,14 +213,23 @@ def _move_processing(game: Game, board: BoardType, previous_board: BoardType) ->
     return new_tiles, removed_tiles, changed_tiles
 
 
+def _check_words(warped: MatLike, board: BoardType, new_tiles: BoardType) -> None:
+    """analyze the low probability tiles of invalid words again and take letters which give valid words"""
+    warped_gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
+    corrected = Lexicon.correct(board, new_tiles, partial(tile_alternatives, warped_gray))
+    if corrected:
+        logger.info(f'corrected by lexicon: {corrected}')
+        board.update(corrected)
+        new_tiles.update(corrected)
+
+
 def _recalculate_score_on_tiles_change(game: Game, changed: BoardType) -> None:
     """fix scores on changed tiles after recognition"""
 
     logger.info(f'changed tiles: {changed}')
-    to_inspect = min(config.scrabble.verify_moves, len(game.moves))
     changed_coords = set(changed.keys())
     must_recalculate = False
-    for mov in game.moves[-to_inspect:]:
+    for mov in game.moves:  # a tile is analyzed again until it is confirmed, it may belong to any move
         affected_coords = changed_coords & set(mov.new_tiles.keys())
         if affected_coords:
             for coord in affected_coords:
@@ -265,31 +241,77 @@ def _recalculate_score_on_tiles_change(game: Game, changed: BoardType) -> None:
             logger.info(f'recalculated score: {str(mov)}')
 
 
-def _write_original_image(img: MatLike, index: int) -> None:
+def _write_original_image(game: Game, img: MatLike, index: int) -> None:
     if config.development.recording:
-        image_path = config.path.web_dir / f'image-{index}-camera.jpg'
+        image_path = game.web_dir / f'image-{index}-camera.jpg'
         logger.debug(f'write image {image_path!s}')
         with suppress(Exception):
             cv2.imwrite(str(image_path), img, [cv2.IMWRITE_JPEG_QUALITY, 100])  # type:ignore
+            game.archive.add(image_path)
 
 
 @trace
+@journaled
 @handle_exceptions
-def move(game: Game, img: MatLike, player: int, played_time: tuple[int, int], event: Event | None = None) -> None:
-    """Process a move"""
+def move(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    game: Game,
+    img: MatLike,
+    player: int,
+    played_time: tuple[int, int],
+    event: Event | None = None,
+    trace: dict[str, float] | None = None,
+) -> None:
+    """Process a move, trace collects the stage timings of the move (see output.move_trace)"""
+
+    if trace is not None:
+        trace['queue_wait'] = time.time() - trace.pop('queued', time.time())
+    with runtime_trace(trace):
+        precomputed = game.speculation.take(game, img) if config.scrabble.speculative else None
+        warped, board = precomputed if precomputed is not None else _image_processing(game, img)
+
+        previous_board = game.moves[-1].board.copy() if game.moves else {}  # get previous board information
+        new_tiles, removed_tiles, changed_tiles = _move_processing(game, board, previous_board)
+        if Lexicon.enabled():
+            _check_words(warped, board, new_tiles)
+
+        if len(changed_tiles) > 0:  # fix previous moves
+            _recalculate_score_on_tiles_change(game, changed_tiles)
+        if config.development.recording:  # save before upload
+            index = len(game.moves)
+            game.upload.get_upload_queue().put_nowait(Command(_write_original_image, game, img.copy(), index))
+        game.add_move(
+            player=player, played_time=played_time, img=warped, new_tiles=new_tiles, removed_tiles=removed_tiles, trace=trace
+        )
+        game.verification.update(previous_board, game.moves[-1].board, warped)
+    if trace is not None:
+        trace['processed'] = time.time() - trace['press_time']
+    metrics.inc('moves')
+    event_set(event=event)
 
-    warped, board = _image_processing(game, img)
 
-    previous_board = game.moves[-1].board.copy() if game.moves else {}  # get previous board information
-    new_tiles, removed_tiles, changed_tiles = _move_processing(game, board, previous_board)
+@trace
+def speculate(game: Game, img: MatLike, signature: MatLike) -> None:
+    """precompute the recognition of a stable board while the clock is running
 
-    if len(changed_tiles) > 0:  # fix previous moves
-        _recalculate_score_on_tiles_change(game, changed_tiles)
-    if config.development.recording:  # save before upload
-        index = len(game.moves)
-        upload.get_upload_queue().put_nowait(Command(_write_original_image, img.copy(), index))
-    game.add_move(player=player, played_time=played_time, img=warped, new_tiles=new_tiles, removed_tiles=removed_tiles)
-    event_set(event=event)
+    runs beside the command queue of the game, a move processed meanwhile outdates the result
+    """
+
+    result = None
+    moves, board = len(game.moves), {}
+    try:
+        last_move = game.moves[moves - 1] if moves else None
+        board = last_move.board.copy() if last_move is not None else {}
+        frame = game.frames.get(img)
+        warped, warped_gray = frame.warp()
+        tiles_candidates = frame.tiles_candidates()
+        if last_move is not None and last_move.invalid_blanks(tiles_candidates):
+            logger.debug('speculation skipped: last move must be cleaned up')  # must not modify the game
+        else:
+            result = warped, _analyze_candidates(game, frame, warped_gray, tiles_candidates, board.copy())
+    except Exception:
+        logger.exception('speculative recognition failed')
+    finally:
+        game.speculation.store(signature, result, moves, board)
 
 
 @trace
@@ -300,8 +322,7 @@ def check_resume(game: Game, image: MatLike, event: Event | None = None) -> None
     if last_move is not None and last_move.type == MoveType.REGULAR:  # only check regular moves
         if not last_move.new_tiles:  # no new tiles in last move
             return
-        warped, _ = warp_image(image)
-        _, tiles_candidates = filter_image(warped)
+        tiles_candidates = game.frames.get(image).tiles_candidates()
         intersection = set(last_move.new_tiles.keys()) & set(tiles_candidates)
         if not intersection:  #  empty set => tiles are removed
             valid_challenge(game, event)
@@ -312,6 +333,7 @@ def check_resume(game: Game, image: MatLike, event: Event | None = None) -> None
 
 
 @trace
+@journaled
 @handle_exceptions
 def valid_challenge(game: Game, event: Event | None = None) -> None:
     """Process a valid challenge"""
@@ -323,6 +345,7 @@ def valid_challenge(game: Game, event: Event | None = None) -> None:
 
 
 @trace
+@journaled
 @handle_exceptions
 def invalid_challenge(game: Game, event: Event | None = None) -> None:
     """Process an invalid challenge"""
@@ -338,21 +361,27 @@ def new_game(game: Game, event: Event | None = None) -> None:
     """start of game"""
 
     if not config.is_testing:
-        # first delete images and data files on ftp server
+        # first delete images and data files of the session on ftp server
         if config.output.upload_server:
-            upload.get_upload_queue().put_nowait(Command(upload.delete_files))
+            game.upload.get_upload_queue().put_nowait(Command(game.upload.delete_files))
         with suppress(OSError):
-            web_dir = Path(config.path.web_dir)
+            web_dir = game.web_dir
             file_list = list(web_dir.glob('image-*.jpg')) + list(web_dir.glob('data-*.json'))
             for file_path in file_list:
                 file_path.unlink()
             if file_list:
                 rotate_logs()
+    game.speculation.reset()
+    game.verification.reset()
+    game.frames.clear()
     game.new_game()
+    if game.journal is not None:
+        game.journal.restart(game)
     event_set(event=event)
 
 
 @trace
+@journaled
 def end_of_game(game: Game, image: MatLike | None = None, player: int = -1, event: Event | None = None) -> None:
     # pragma: no cover
     """Process end of game"""
@@ -364,11 +393,10 @@ def end_of_game(game: Game, image: MatLike | None = None, player: int = -1, even
 
     if image is not None and has_tiles:  # we have an image and both racks have tiles
         last_move = game.moves[-1]
-        warped, _ = warp_image(image)
-        _, tiles_candidates = filter_image(warped)
+        tiles_candidates = game.frames.get(image).tiles_candidates()  # reused by move()
         if set(last_move.board.keys()) != set(tiles_candidates):  #  candidates differ from last image
             logger.info(f'automatic move (player {player})')
             move(game, image, player, last_move.played_time, event)
 
-    game.end_game()
+    game.end_game(crop_region=game.frames.crop.region)
     event_set(event=event)
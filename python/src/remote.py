@@ -0,0 +1,314 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Recognition on a worker in the local network (board.recognizer = remote, board.remote_worker = host:port).
+The board sends the field crops of the candidates with the tiles of the previous board, the worker runs the same
+recognizer and returns the tiles. After board.remote_timeout the fields are analyzed on the board.
+
+    cd python
+    PYTHONPATH=src python src/remote.py worker --port 8766                        # on the laptop
+    PYTHONPATH=src python src/remote.py compare laptop:8766 test/game0[1-5]      # latency per move
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from cv2.typing import MatLike
+
+from analyzer import (
+    MARGIN,
+    THRESHOLD_PROP_BOARD,
+    Recognizer,
+    TemplateRecognizer,
+    find_recognizer,
+    recognizers,
+    register_recognizer,
+)
+from bitboard import SIZE
+from config import config
+from game_board.board import GRID_H, GRID_W, get_x_position, get_y_position
+from move import BoardType, CoordType, Tile
+from utils.metrics import metrics
+
+MAGIC = b'SCRR'
+FRAME = struct.Struct('!4sII')  # magic, json length, payload length
+CROP = (GRID_H + 2 * MARGIN, GRID_W + 2 * MARGIN)  # field with the border of the template matching
+MAX_META = 64 * 1024  # json of a request (coords and board of at most 225 fields)
+MAX_PAYLOAD = 16 * 1024 * 1024
+MAX_SHAPE = 4096  # height and width of the warped image
+RETRY_INTERVAL = 30  # seconds without worker after a failed request
+
+logger = logging.getLogger()
+
+
+def send_frame(sock: socket.socket, meta: dict, payload: bytes = b'') -> None:
+    """send json meta data and binary payload"""
+    data = json.dumps(meta).encode()
+    sock.sendall(FRAME.pack(MAGIC, len(data), len(payload)) + data + payload)
+
+
+def recv_exactly(sock: socket.socket, size: int, deadline: float | None = None) -> bytes:
+    """read size bytes, socket.timeout after the deadline (time.monotonic)"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        if deadline is not None:
+            sock.settimeout(max(deadline - time.monotonic(), 0.001))
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError('connection closed')
+        received += count
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket, deadline: float | None = None) -> tuple[dict, bytes]:
+    """receive json meta data and binary payload"""
+    magic, meta_size, payload_size = FRAME.unpack(recv_exactly(sock, FRAME.size, deadline))
+    if magic != MAGIC or meta_size > MAX_META or payload_size > MAX_PAYLOAD:
+        raise ValueError('invalid frame')
+    meta = json.loads(recv_exactly(sock, meta_size, deadline))
+    return meta, recv_exactly(sock, payload_size, deadline) if payload_size else b''
+
+
+def crop_origin(coord: CoordType) -> tuple[int, int]:
+    """top left corner (x, y) of the crop of a field"""
+    return get_x_position(coord[0]) - MARGIN, get_y_position(coord[1]) - MARGIN
+
+
+def pack_fields(warped_gray: MatLike, coords: list[CoordType]) -> bytes:
+    """crops of the fields as one byte string"""
+    crops = []
+    for coord in coords:
+        x, y = crop_origin(coord)
+        crops.append(np.ascontiguousarray(warped_gray[y : y + CROP[0], x : x + CROP[1]]).tobytes())
+    return b''.join(crops)
+
+
+def unpack_fields(shape: tuple[int, int], coords: list[CoordType], payload: bytes) -> MatLike:
+    """gray image with the crops of the fields at their positions (ValueError for invalid requests)"""
+    if len(shape) != 2 or not all(isinstance(v, int) and 0 < v <= MAX_SHAPE for v in shape):
+        raise ValueError(f'invalid shape {shape}')
+    if len(coords) > SIZE * SIZE or not all(0 <= col < SIZE and 0 <= row < SIZE for col, row in coords):
+        raise ValueError('invalid coords')
+    crops = np.frombuffer(payload, dtype=np.uint8).reshape(len(coords), *CROP)
+    image = np.zeros(shape, dtype=np.uint8)
+    for coord, crop in zip(coords, crops, strict=True):
+        x, y = crop_origin(coord)
+        image[y : y + CROP[0], x : x + CROP[1]] = crop
+    return image
+
+
+class RemoteRecognizer(Recognizer):
+    """recognition on the worker board.remote_worker with fallback to the template matching on the board"""
+
+    name = 'remote'
+    fallback = TemplateRecognizer.name  # recognizer of the worker and on the board
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sock: socket.socket | None = None
+        self.address: str | None = None
+        self.retry_at = 0.0
+        self.seq = itertools.count()
+        self.last: dict[str, float] = {}  # latency of the last move (ms)
+
+    def close(self) -> None:
+        """close the connection to the worker"""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock, self.address = None, None
+
+    def _connect(self, address: str, deadline: float) -> socket.socket:
+        if self.sock is None or self.address != address:
+            self.close()
+            host, _, port = address.rpartition(':')
+            self.sock = socket.create_connection((host, int(port)), timeout=max(deadline - time.monotonic(), 0.001))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.address = address
+        return self.sock
+
+    def request(
+        self, address: str, warped_gray: MatLike, board: BoardType, coords: list[CoordType], timeout: float | None = None
+    ) -> tuple[BoardType, float]:
+        """tiles of the fields recognized by the worker and the time of the worker (sec)"""
+        deadline = time.monotonic() + (config.board.remote_timeout if timeout is None else timeout)
+        with self.lock:
+            sock = self._connect(address, deadline)
+            seq = next(self.seq)
+            meta = {
+                'seq': seq,
+                'recognizer': self.fallback,
+                'language': config.board.language,
+                'shape': list(warped_gray.shape[:2]),
+                'coords': coords,
+                'board': [[coord, board[coord].letter, board[coord].prob] for coord in coords if coord in board],
+            }
+            sock.settimeout(max(deadline - time.monotonic(), 0.001))
+            send_frame(sock, meta, pack_fields(warped_gray, coords))
+            reply, _ = recv_frame(sock, deadline)
+        if reply.get('seq') != seq or 'error' in reply:
+            raise ValueError(reply.get('error', 'invalid reply'))
+        return {tuple(coord): Tile(letter=letter, prob=prob) for coord, letter, prob in reply['tiles']}, reply['elapsed']
+
+    def recognize(self, warped_gray: MatLike, board: BoardType, candidates: set[CoordType]) -> BoardType:
+        coords = sorted(c for c in candidates if c not in board or board[c].prob <= THRESHOLD_PROP_BOARD)
+        address = config.board.remote_worker
+        start = time.perf_counter()
+        if coords and address and time.monotonic() >= self.retry_at:
+            try:
+                tiles, worker = self.request(address, warped_gray, board, coords)
+            except (OSError, ValueError, KeyError, TypeError) as oops:
+                with self.lock:
+                    self.close()
+                self.retry_at = time.monotonic() + RETRY_INTERVAL
+                metrics.inc('remote_fallback')
+                logger.warning(f'remote recognition failed ({oops!r}), analyze on the board for {RETRY_INTERVAL}s')
+            else:
+                board.update(tiles)
+                self.last = {'remote': 1000 * (time.perf_counter() - start), 'worker': 1000 * worker}
+                metrics.observe('remote_ms', self.last['remote'])
+                logger.info(
+                    f'remote recognition of {len(coords)} fields: {self.last["remote"]:.1f} ms '
+                    f'(worker {self.last["worker"]:.1f} ms)'
+                )
+                return board
+        board = recognizers[self.fallback].recognize(warped_gray, board, candidates)
+        self.last = {'local': 1000 * (time.perf_counter() - start)}
+        metrics.observe('remote_local_ms', self.last['local'])
+        return board
+
+
+class WorkerHandler(socketserver.BaseRequestHandler):
+    """requests of a board until the connection is closed"""
+
+    def handle(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                meta, payload = recv_frame(self.request)
+            except (ConnectionError, struct.error, ValueError):
+                return
+            try:
+                send_frame(self.request, {'seq': meta.get('seq'), **recognize_fields(meta, payload)})
+            except OSError:
+                return
+
+
+def recognize_fields(meta: dict, payload: bytes) -> dict:
+    """tiles of the request (or error message)"""
+    start = time.perf_counter()
+    recognizer = find_recognizer(meta.get('recognizer', TemplateRecognizer.name))
+    if recognizer is None or meta.get('language') != config.board.language:
+        return {'error': f'worker uses {config.board.language} and {sorted(recognizers)}'}
+    try:
+        coords = [tuple(coord) for coord in meta['coords']]
+        image = unpack_fields(tuple(meta['shape']), coords, payload)
+        board = {tuple(coord): Tile(letter=letter, prob=prob) for coord, letter, prob in meta['board']}
+        board = recognizer.recognize(image, board, set(coords))
+    except (KeyError, TypeError, ValueError) as oops:
+        return {'error': repr(oops)}
+    return {
+        'tiles': [[coord, board[coord].letter, board[coord].prob] for coord in coords if coord in board],
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+class Worker(socketserver.ThreadingTCPServer):
+    """recognition worker, one thread per board"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int]):
+        super().__init__(address, WorkerHandler)
+
+
+def compare(address: str, folders: list[str]) -> list[dict]:
+    """latency per move of the local and the remote recognition on the moves of the replayed games"""
+    from replay import collect  # pylint: disable=import-outside-toplevel # replay imports processing
+
+    remote = RemoteRecognizer()
+    local = recognizers[RemoteRecognizer.fallback]
+    result = []
+    for gray, letters in collect(folders):
+        start = time.perf_counter()
+        expected = local.recognize(gray, {}, set(letters))
+        elapsed = 1000 * (time.perf_counter() - start)
+        start = time.perf_counter()
+        tiles, worker = remote.request(address, gray, {}, sorted(letters), timeout=60)
+        result.append(
+            {
+                'fields': len(letters),
+                'local_ms': elapsed,
+                'remote_ms': 1000 * (time.perf_counter() - start),
+                'worker_ms': 1000 * worker,
+                'equal': tiles == expected,
+            }
+        )
+    remote.close()
+    return result
+
+
+def main() -> int:
+    """run a worker or compare the latency with a worker"""
+    parser = argparse.ArgumentParser(description='remote tile recognition')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    worker_parser = subparsers.add_parser('worker', help='run the recognition worker')
+    worker_parser.add_argument('--host', default='0.0.0.0')  # noqa: S104
+    worker_parser.add_argument('--port', type=int, default=8766)
+    compare_parser = subparsers.add_parser('compare', help='latency per move: board vs. worker')
+    compare_parser.add_argument('worker', help='host:port of the worker')
+    compare_parser.add_argument('folders', nargs='+', help='game folders (scrabble.ini, image-N.jpg, game.csv)')
+    args = parser.parse_args()
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format='%(asctime)s [%(levelname)-5.5s] %(message)s')
+    if args.command == 'worker':
+        with Worker((args.host, args.port)) as worker:
+            logger.info(f'recognition worker on {args.host}:{args.port} ({config.board.language})')
+            worker.serve_forever()
+        return 0
+    logging.getLogger().setLevel(logging.WARNING)
+    folders = [str(Path(f)) for f in args.folders if (Path(f) / 'game.csv').is_file()]
+    moves = compare(args.worker, folders)
+    for i, move in enumerate(moves):
+        print(
+            f'{i:3d} {move["fields"]:3d} fields: local {move["local_ms"]:7.1f} ms, remote {move["remote_ms"]:7.1f} ms '
+            f'(worker {move["worker_ms"]:7.1f} ms) {"" if move["equal"] else "DIFFERENT"}'
+        )
+    if moves:
+        local, remote = (sum(m[key] for m in moves) / len(moves) for key in ('local_ms', 'remote_ms'))
+        print(f'{len(moves)} moves: local {local:.1f} ms/move, remote {remote:.1f} ms/move')
+    return 0
+
+
+register_recognizer(RemoteRecognizer())
+
+if __name__ == '__main__':
+    sys.exit(main())
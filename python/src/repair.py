@@ -0,0 +1,178 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Event
+
+import cv2
+from cv2.typing import MatLike
+
+from analyzer import analyze, filter_candidates
+from customboard import filter_image
+from game_board.board import BOARD_CENTER_COORD
+from move import BoardType, CoordType, Move, MoveType, MoveWithdraw
+from scrabble import Game
+
+REPAIR_THREADS = 2
+REPAIR_TYPES = (MoveType.REGULAR, MoveType.EXCHANGE, MoveType.UNKNOWN)
+
+logger = logging.getLogger()
+
+
+@dataclass
+class RepairProgress:
+    """progress of the running admin repair"""
+
+    index: int = -1
+    total: int = 0
+    done: int = 0
+    running: bool = False
+
+    def as_dict(self) -> dict:
+        """progress as json compatible dict"""
+        return {'index': self.index, 'total': self.total, 'done': self.done, 'running': self.running}
+
+
+@dataclass
+class RepairTask:
+    """re-analysis of some fields on the image of one move"""
+
+    index: int
+    img: MatLike
+    fields: set[CoordType]
+
+
+repair_progress = RepairProgress()
+
+
+def _notify(event: Event | None) -> None:
+    if event is not None:
+        event.set()
+
+
+def _candidate_fields(img: MatLike, board_keys: set[CoordType]) -> set[CoordType]:
+    """fields of the image which are new tiles in relation to board_keys"""
+    _, tiles_candidates = filter_image(img)  # find potential tiles on board
+    return filter_candidates(BOARD_CENTER_COORD, tiles_candidates | board_keys, board_keys)
+
+
+def _next_board_keys(mov: Move, board_keys: set[CoordType], added: set[CoordType]) -> set[CoordType]:
+    """occupied fields after move (without building the board)"""
+    if isinstance(mov, MoveWithdraw):
+        return board_keys - mov.removed_tiles.keys()
+    return board_keys | added
+
+
+def plan_repair(game: Game, index: int, previous_keys: list[set[CoordType]]) -> tuple[dict[int, BoardType], list[RepairTask]]:
+    """Determine the new tiles of the moves following (index) and the fields which must be re-analyzed.
+
+    A move is only affected by an edit if the board in front of the move has changed its occupied fields.
+    Tiles which were already recognized on the move image are reused, only new fields will be analyzed.
+    """
+    board_keys = set(game.moves[index].board.keys())
+    planned: dict[int, BoardType] = {}
+    tasks: list[RepairTask] = []
+    for i in range(index + 1, len(game.moves)):
+        mov = game.moves[i]
+        added: set[CoordType] = set(mov.new_tiles.keys())
+        if not mov.is_modified and mov.type in REPAIR_TYPES:
+            if board_keys == previous_keys[i - 1] or mov.img is None:
+                planned[i] = dict(mov.new_tiles)
+            else:
+                added = _candidate_fields(mov.img, board_keys)
+                planned[i] = {coord: tile for coord, tile in mov.new_tiles.items() if coord in added}
+                if to_analyze := added - planned[i].keys():
+                    tasks.append(RepairTask(index=i, img=mov.img, fields=to_analyze))
+                logger.debug(f'repair #{i}: affected fields={added} analyze={to_analyze}')
+        board_keys = _next_board_keys(mov, board_keys, added)
+    return planned, tasks
+
+
+def _analyze_task(task: RepairTask) -> BoardType:
+    warped_gray = cv2.cvtColor(task.img, cv2.COLOR_BGR2GRAY)
+    return analyze(warped_gray, {}, task.fields)
+
+
+def analyze_tasks(planned: dict[int, BoardType], tasks: list[RepairTask], event: Event | None = None) -> None:
+    """re-analyze the images of independent moves in parallel and report progress"""
+    repair_progress.total, repair_progress.done = len(tasks), 0
+    _notify(event)
+    if not tasks:
+        return
+    with ThreadPoolExecutor(max_workers=REPAIR_THREADS, thread_name_prefix='repair') as executor:
+        pending = {executor.submit(_analyze_task, task): task for task in tasks}
+        for f in futures.as_completed(pending):
+            task = pending[f]
+            try:
+                planned[task.index].update(f.result())
+            except Exception:  # noqa: PERF203
+                logger.exception(f'repair #{task.index}: analyze failed for {task.fields}')
+            repair_progress.done += 1
+            logger.info(f'repair progress {repair_progress.done}/{repair_progress.total}')
+            _notify(event)
+
+
+def apply_repair(game: Game, index: int, planned: dict[int, BoardType]) -> None:
+    """recalculate the moves following (index) with the planned tiles"""
+    for i in range(index + 1, len(game.moves)):
+        current_move = game.moves[i]
+
+        if current_move.is_modified:
+            current_move.setup_board()
+            current_move.calculate_bag()
+            logger.info(f'repair #{i}: type {current_move.type} edited move - skipping')
+            continue
+
+        if current_move.type not in REPAIR_TYPES:
+            # other move types: just recalc score/type
+            game.change_move_at(index=i, movetype=current_move.type)
+            logger.info(f'repair #{i}: type {current_move.type} recalc score')
+            continue
+
+        new_tiles = planned.get(i, current_move.new_tiles)
+        if new_tiles:
+            game.change_move_at(index=i, movetype=MoveType.REGULAR, new_tiles=new_tiles)
+            logger.info(f'repair #{i}: type {current_move.type} as REGULAR with {new_tiles}')
+        else:
+            movetype = MoveType.EXCHANGE if current_move.type == MoveType.REGULAR else current_move.type
+            game.change_move_at(index=i, movetype=movetype)
+            logger.info(f'repair #{i}: type {current_move.type} as {movetype}')
+
+
+def repair_following_moves(game: Game, index: int, previous_keys: list[set[CoordType]], event: Event | None = None) -> None:
+    """repair all moves after an admin edit of move (index)
+
+    Args:
+        game: current game
+        index: index of the edited move
+        previous_keys: occupied fields of each move board before the edit
+        event: event to inform the webservice about progress
+    """
+    repair_progress.index, repair_progress.running = index, True
+    try:
+        planned, tasks = plan_repair(game, index, previous_keys)
+        logger.info(f'repair after #{index}: {len(tasks)} image(s) to analyze')
+        analyze_tasks(planned, tasks, event)
+        apply_repair(game, index, planned)
+    finally:
+        repair_progress.running = False
@@ -0,0 +1,246 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+import multiprocessing
+import sys
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import cv2
+from cv2.typing import MatLike
+
+from config import config
+from customboard import clear_last_warp
+from hardware.camera import CameraFile
+from processing import check_resume, end_of_game, invalid_challenge, move, new_game, valid_challenge
+from move import CoordType
+from scrabble import Game, MoveRegular
+from state import GameState
+from utils.util import runtime_listeners
+
+logger = logging.getLogger()
+
+
+@dataclass
+class MoveResult:
+    """recognized move compared with the expected row of game.csv"""
+
+    row: int
+    button: str
+    expected: str
+    recognized: str
+    elapsed: float = 0.0  # processing time of the row
+
+    @property
+    def ok(self) -> bool:
+        """recognized move matches game.csv"""
+        return self.expected == self.recognized
+
+
+@dataclass
+class ReplayResult:
+    """result of a replayed game"""
+
+    folder: str
+    moves: list[MoveResult] = field(default_factory=list)
+    stages: dict[str, list[float]] = field(default_factory=dict)  # stage => elapsed seconds per call
+    elapsed: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """all moves recognized as expected"""
+        return self.error is None and all(m.ok for m in self.moves)
+
+
+def _player(state: GameState) -> int:
+    return 1 if state in (GameState.S1, GameState.P1) else 0
+
+
+# headless transitions of the state machine (see GameSession.transitions) without clock, leds and display
+TRANSITIONS: dict[tuple[GameState, str], tuple[Callable[[Game, object, int], None], GameState]] = {
+    (GameState.S0, 'GREEN'): (lambda game, img, player: move(game, img, player, (0, 0)), GameState.S1),
+    (GameState.S1, 'RED'): (lambda game, img, player: move(game, img, player, (0, 0)), GameState.S0),
+    (GameState.S0, 'YELLOW'): (lambda game, img, player: None, GameState.P0),
+    (GameState.S1, 'YELLOW'): (lambda game, img, player: None, GameState.P1),
+    (GameState.P0, 'RED'): (lambda game, img, player: check_resume(game, img), GameState.S0),
+    (GameState.P0, 'YELLOW'): (lambda game, img, player: check_resume(game, img), GameState.S0),
+    (GameState.P1, 'GREEN'): (lambda game, img, player: check_resume(game, img), GameState.S1),
+    (GameState.P1, 'YELLOW'): (lambda game, img, player: check_resume(game, img), GameState.S1),
+    (GameState.P0, 'DOUBT0'): (lambda game, img, player: valid_challenge(game), GameState.P0),
+    (GameState.P0, 'DOUBT1'): (lambda game, img, player: invalid_challenge(game), GameState.P0),
+    (GameState.P1, 'DOUBT0'): (lambda game, img, player: invalid_challenge(game), GameState.P1),
+    (GameState.P1, 'DOUBT1'): (lambda game, img, player: valid_challenge(game), GameState.P1),
+    (GameState.P0, 'RESET'): (lambda game, img, player: end_of_game(game, img, player), GameState.EOG),
+    (GameState.P1, 'RESET'): (lambda game, img, player: end_of_game(game, img, player), GameState.EOG),
+}
+
+
+def _compare(row: dict, game: Game, state: GameState) -> tuple[str, str]:
+    """expected and recognized state, points, scores (and word of regular moves) like the gamerunner test"""
+    last = game.moves[-1] if game.moves else None
+    if state in (GameState.P0, GameState.P1, GameState.EOG) or last is None:
+        return row['State'].upper(), state.name
+    expected = f'{row["State"].upper()} {row["Points"]} {row["Score1"]}:{row["Score2"]}'
+    recognized = f'{state.name} {last.points} {last.score[0]}:{last.score[1]}'
+    if isinstance(last, MoveRegular):
+        expected, recognized = f'{expected} {row["Word"]}', f'{recognized} {last.word}'
+    return expected, recognized
+
+
+def replay_game(folder: str) -> ReplayResult:
+    """replay the image sequence and button log (game.csv) of a recorded game folder"""
+    return play_game(folder)[0]
+
+
+@contextmanager
+def game_config(folder: str) -> Iterator[None]:
+    """configuration of the game folder in test mode, the previous configuration is restored afterwards"""
+    saved = {section: dict(config.config.items(section, raw=True)) for section in config.config.sections()}
+    ini_path, is_testing = config.ini_path, config.is_testing
+    config.reload(ini_file=str(Path(folder) / 'scrabble.ini'), clean=True)
+    config.is_testing = True
+    config.config.set('output', 'upload_server', 'False')
+    config.config.set('development', 'recording', 'False')
+    try:
+        yield
+    finally:
+        config.config.clear()
+        config.config.read_dict(saved)
+        config.ini_path, config.is_testing = ini_path, is_testing
+
+
+def play_game(folder: str) -> tuple[ReplayResult, Game | None]:
+    """replay a recorded game folder, returns the result and the replayed game"""
+    with game_config(folder):
+        return _play_game(folder)
+
+
+def _play_game(folder: str) -> tuple[ReplayResult, Game | None]:
+    result, game = ReplayResult(folder=folder), None
+
+    def measure(name: str, elapsed: float) -> None:
+        result.stages.setdefault(name, []).append(elapsed)
+
+    clear_last_warp()
+    cam = CameraFile()
+    cam.formatter = str(Path(folder) / Path(config.development.simulate_path).name)
+    cam.resize = False
+    if not cam.files:
+        result.error = f'no images {cam.formatter}'
+        return result, game
+
+    runtime_listeners.append(measure)
+    start = time.perf_counter()
+    try:
+        game = Game()
+        new_game(game)
+        game.nicknames = (config.test.name1, config.test.name2)
+        state = GameState.S0 if config.test.start.upper() == 'RED' else GameState.S1
+        with (Path(folder) / 'game.csv').open(encoding='UTF-8') as csv_file:
+            for row in csv.DictReader(csv_file, skipinitialspace=True):
+                cam.counter = int(row['Move'])
+                handler, next_state = TRANSITIONS.get((state, row['Button'].upper()), (None, state))
+                img = cam.read(peek=True)
+                row_start = time.perf_counter()
+                if handler is None:
+                    logger.warning(f'invalid transition {row["Button"]} at {state}')
+                else:
+                    handler(game, img, _player(state))
+                elapsed, state = time.perf_counter() - row_start, next_state
+                result.moves.append(MoveResult(int(row['Move']), row['Button'], *_compare(row, game, state), elapsed))
+        if state != GameState.EOG:
+            end_of_game(game, cam.read(peek=True), _player(state))
+    except Exception as oops:  # pylint: disable=broad-exception-caught
+        logger.exception(f'replay of {folder} failed')
+        result.error = repr(oops)
+    finally:
+        runtime_listeners.remove(measure)
+        result.elapsed = time.perf_counter() - start
+    return result, game
+
+
+def collect(folders: list[str]) -> list[tuple[MatLike, dict[CoordType, str]]]:
+    """warped gray image and letters of each move of the replayed games (letters of the final board, blank '_')"""
+    result = []
+    for folder in folders:
+        replayed, game = play_game(folder)
+        if game is None or not replayed.ok:
+            logger.warning(f'{folder} skipped: {replayed.error or "recognition differences"}')
+            continue
+        final = game.moves[-1].board if game.moves else {}
+        for mov in game.moves:
+            if mov.img is not None and mov.board:
+                letters = {coord: final[coord].letter if coord in final else tile.letter for coord, tile in mov.board.items()}
+                gray = cv2.cvtColor(mov.img, cv2.COLOR_BGR2GRAY)
+                result.append((gray, {coord: '_' if letter.islower() else letter for coord, letter in letters.items()}))
+    return result
+
+
+def print_result(result: ReplayResult, verbose: bool = False) -> None:
+    """print moves and stage timings of a replayed game"""
+    failed = [m for m in result.moves if not m.ok]
+    print(f'\n{result.folder}: {len(result.moves)} rows, {len(failed)} differences, {result.elapsed:.2f}s')
+    if result.error:
+        print(f'  error: {result.error}')
+    for m in result.moves if verbose else failed:
+        print(f'  {"  " if m.ok else "!!"} {m.row:3d} {m.button:7} expected: {m.expected:32} recognized: {m.recognized}')
+    print(f'  {"stage":24} {"calls":>6} {"total":>9} {"mean":>9} {"max":>9}')
+    for name, values in sorted(result.stages.items(), key=lambda item: -sum(item[1])):
+        total = sum(values)
+        print(f'  {name:24} {len(values):6d} {total:9.3f} {total / len(values):9.4f} {max(values):9.4f}')
+
+
+def replay_folders(folders: list[str], jobs: int = 1) -> list[ReplayResult]:
+    """replay game folders, with jobs > 1 in parallel processes"""
+    if jobs <= 1 or len(folders) <= 1:
+        return [replay_game(folder) for folder in folders]
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(replay_game, folders))
+
+
+def main() -> int:
+    """replay recorded games headless: python replay.py [-j JOBS] [-v] folder ..."""
+    parser = argparse.ArgumentParser(description='replay recorded games (scrabble.ini, image-N.jpg, game.csv)')
+    parser.add_argument('folders', nargs='+', help='game folders')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of parallel processes')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print all moves')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    folders = [str(Path(f)) for f in args.folders if (Path(f) / 'game.csv').is_file()]
+    start = time.perf_counter()
+    results = replay_folders(folders, jobs=args.jobs)
+    for result in results:
+        print_result(result, verbose=args.verbose)
+    failed = [r.folder for r in results if not r.ok]
+    print(f'\n{len(results)} games in {time.perf_counter() - start:.2f}s, {len(failed)} with differences {failed or ""}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,7 +22,6 @@ import json
 import logging
 import pprint
 import time
-from collections import Counter
 from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -32,7 +31,11 @@ from zipfile import ZipFile
 import cv2
 from cv2.typing import MatLike
 
+from bitboard import bounds, col_span, from_coords, in_one_col, in_one_row, row_span
 from config import config, version
+from framecache import FrameCache, frame_cache
+from journal import Journal
+from lexicon import Lexicon
 from move import (
     MAX_TILE_PROB,
     BoardType,
@@ -52,8 +55,14 @@ from move import (
     Tile,
     bag_as_list,
 )
+from speculative import Speculation
+from utils.archive import GameArchive
+from utils.archive import archive as board_archive
 from utils.threadpool import Command
-from utils.upload import upload
+from utils.upload import Upload
+from utils.upload import upload as board_upload
+from utils.util import runtime_measure
+from verification import Verification
 
 API_VERSION = '3.2'
 JSON_FLAG = 'json'
@@ -82,6 +91,18 @@ class Game:  # pylint: disable=too-many-public-methods
     nicknames: tuple[str, str] = ('Name1', 'Name2')
     gamestart: datetime = field(default_factory=datetime.now)
     moves: list[Move] = field(default_factory=list)
+    verification: Verification = field(default_factory=Verification, repr=False, compare=False)
+    speculation: Speculation = field(default_factory=Speculation, repr=False, compare=False)
+    journal: Journal | None = field(default=None, repr=False, compare=False)  # see scrabble.journal
+    # output directory and upload target, archive and frame cache of the game session (default: the board)
+    upload: Upload = field(default_factory=lambda: board_upload, repr=False, compare=False)
+    archive: GameArchive = field(default_factory=lambda: board_archive, repr=False, compare=False)
+    frames: FrameCache = field(default_factory=lambda: frame_cache, repr=False, compare=False)
+
+    @property
+    def web_dir(self) -> Path:
+        """output directory of the game"""
+        return self.upload.web_dir
 
     def __str__(self) -> str:
         return self.json_str()
@@ -133,6 +154,7 @@ class Game:  # pylint: disable=too-many-public-methods
             'moves_data': [self._serialize_move(m) for m in self.moves[: move_index + 1]],
             'board': {chr(ord('a') + y) + str(x + 1): tile.letter for (x, y), tile in move.board.items()},
             'blankos': self._collect_blankos(),
+            **({'trace': dict(move.trace)} if config.output.move_trace and move.trace else {}),
         }  # fmt: off
 
     def _determine_state(self, move: Move) -> str:
@@ -155,8 +177,12 @@ class Game:  # pylint: disable=too-many-public-methods
             'new_letter': {chr(ord('a') + y) + str(x + 1): tile.letter for (x, y), tile in m.new_tiles.items()},
             'points': m.points,
             'score': m.score,
+            **({'invalid_words': Lexicon.invalid_words(m.board, m.new_tiles)} if self._check_words(m) else {}),
         }
 
+    def _check_words(self, m: Move) -> bool:
+        return m.type == MoveType.REGULAR and Lexicon.enabled()
+
     def _collect_blankos(self) -> list[tuple[str, str]]:
         return [
             (self._cell_name(key), tile.letter)
@@ -186,11 +212,11 @@ class Game:  # pylint: disable=too-many-public-methods
         """is (index) valid"""
         return bool(self.moves) and -len(self.moves) <= index < len(self.moves)
 
-    def dev_str(self) -> str:  # pragma: no cover
-        """Return development represention of the game for using in tests"""
+    def dev_str(self, crop_region: tuple[int, int, int, int] | None = None) -> str:  # pragma: no cover
+        """Return development represention of the game for using in tests (crop_region: crop of the stored images)"""
         if self.gamestart is None:
             self.gamestart = datetime.now()
-        game_id = self.gamestart.strftime('%y%j-%H%M%S')
+        game_id = self.game_id
         out_str = (
             f'game: {game_id}\ngame.ini\n'
             '[default]\n'
@@ -202,7 +228,11 @@ class Game:  # pylint: disable=too-many-public-methods
         )
         if self.moves:
             out_str += ('start = Red\n', 'start = Green\n')[self.moves[0].player]
-        if config.video.warp_coordinates:
+        if config.video.warp_coordinates and crop_region is not None:  # stored images are cropped
+            x0, y0 = crop_region[:2]
+            out_str += f'warp-coord = {[[x - x0, y - y0] for x, y in config.video.warp_coordinates]}\n'
+            out_str += f'crop = {list(crop_region)}\n'
+        elif config.video.warp_coordinates:
             out_str += f'warp-coord = {config.video.warp_coordinates}\n'
 
         out_str += '\ngame.csv\n'
@@ -221,6 +251,8 @@ class Game:  # pylint: disable=too-many-public-methods
         """set player names"""
         logger.info(f"Setting player names to: '{name1}' and '{name2}'")
         self.nicknames = (name1, name2)
+        if self.journal is not None:
+            self.journal.record('set_player_names', self)
         self.write_json_from(index=-1, write_mode=[])  # only status file
 
     def new_game(self) -> Game:
@@ -229,51 +261,41 @@ class Game:  # pylint: disable=too-many-public-methods
         self.nicknames = ('Name1', 'Name2')
         self.gamestart = datetime.now()
         self.moves.clear()
+        if not config.is_testing:
+            self.upload.get_upload_queue().put_nowait(Command(self.archive.open, self.game_id))
         self.write_json_from(-1, [])
         return self
 
-    def end_game(self) -> Game:
-        """finish game"""
+    @property
+    def game_id(self) -> str:
+        """id of the game (based on game start)"""
+        return self.gamestart.strftime('%y%j-%H%M%S')
+
+    def end_game(self, crop_region: tuple[int, int, int, int] | None = None) -> Game:
+        """finish game (crop_region: crop of the stored images)"""
         logger.info('End of game started')
         self.add_timeout_malus()
         self.add_lastrack()
 
-        upload.get_upload_queue().put_nowait(Command(self._zip_from_game))
+        self.upload.get_upload_queue().put_nowait(Command(self._zip_from_game))
         if config.output.upload_server:
             fname = (self.nicknames[0] + '-' + self.nicknames[1]).replace(' ', '_')
             logger.debug(f'{fname=}')
-            upload.get_upload_queue().put_nowait(Command(upload.zip_files, fname))
+            self.upload.get_upload_queue().put_nowait(Command(self.upload.zip_files, fname))
 
         logger.info(f'final scores {self.moves[-1].score}\n{self.board_str()}')
         if logger.isEnabledFor(logging.DEBUG):
             msg = '\n' + ''.join(f'{mov.move:2d} {mov.gcg_str}\n' for mov in self.moves)
             pp = pprint.PrettyPrinter(indent=2, depth=1)
             logger.debug(f'{msg}\napi:\n{pp.pformat(self.get_json_data())}')  # pylint: disable=protected-access # noqa: SLF001
-        logger.info(self.dev_str())
-        upload.get_upload_queue().join()  # wait for finishing uploads
+        logger.info(self.dev_str(crop_region))
+        self.upload.get_upload_queue().join()  # wait for finishing uploads
 
         return self
 
     def tiles_in_bag(self, index: int = -1) -> list[str]:
         """returns list of tiles in bag"""
-        tiles_on_board = self.moves[index].board.values() if self.moves else []
-        values = ['_' if tile.letter.isalpha() and tile.letter.islower() else tile.letter for tile in tiles_on_board]
-        bag_counter = Counter(bag_as_list)
-        for i in values:
-            if bag_counter[i] > 0:
-                bag_counter[i] -= 1
-        result = []
-        for k, v in bag_counter.items():
-            result.extend([k] * v)
-        return result
-
-    def get_coords_to_ignore(self) -> set[tuple[int, int]]:
-        """Returns the coordinates that are to be ignored in the analysis."""
-        if not self.moves:
-            return set()
-        if len(self.moves) < config.scrabble.verify_moves:
-            return set()
-        return set(self.moves[-config.scrabble.verify_moves].board.keys()) & set(self.moves[-1].board.keys())
+        return self.moves[index].tiles_in_bag() if self.moves else bag_as_list.copy()
 
     def _recalculate_from(self, index: int) -> Game:
         """recalculate all moves from index"""
@@ -293,29 +315,62 @@ class Game:  # pylint: disable=too-many-public-methods
             prev_move = m
         return self
 
+    @runtime_measure
     def _write_image(self, index: int, web_dir: Path) -> None:
         img = self.moves[index].img
         if img is not None:
             image_path = web_dir / f'image-{index}.jpg'
             try:
                 cv2.imwrite(str(image_path), img, [cv2.IMWRITE_JPEG_QUALITY, 100])  # type:ignore
+                self.archive.add(image_path)
             except Exception:
                 logger.exception(f'Failed to write image {image_path}')
 
+    @runtime_measure
     def _write_json(self, index: int, web_dir: Path, fname: str) -> None:
         status_path = web_dir / fname
+        start = time.time()
         try:
             with status_path.open('w', encoding='utf-8') as json_file:
                 json.dump(self.get_json_data(index=index), json_file, indent=2)
+            if fname.startswith('data-'):
+                self.archive.add(status_path)
+                self._add_trace(index, 'write_json', time.time() - start)
         except OSError:
             logger.exception(f'Failed to write status file: {status_path}')
 
+    def _upload_move(self, index: int, flush: bool = True) -> None:
+        start = time.time()
+        self.upload.upload_move(index, flush=flush)
+        self._add_trace(index, 'upload', time.time() - start)
+
+    def _add_trace(self, index: int, stage: str, elapsed: float) -> None:
+        """add timing of a stage after the recognition, ends up in later writes and in the summary of the zip"""
+        if 0 <= index < len(self.moves) and self.moves[index].trace:
+            self.moves[index].trace[stage] = elapsed
+
+    def _write_trace(self, web_dir: Path) -> Path:
+        """timing traces of all moves with a summary per stage"""
+        traces = {str(m.move): dict(m.trace) for m in self.moves if m.trace}
+        summary: dict[str, dict[str, float]] = {}
+        for trace in traces.values():
+            for stage, elapsed in trace.items():
+                if stage != 'press_time':
+                    stats = summary.setdefault(stage, {'count': 0, 'avg': 0.0, 'max': 0.0})
+                    stats['count'] += 1
+                    stats['avg'] += (elapsed - stats['avg']) / stats['count']
+                    stats['max'] = max(stats['max'], elapsed)
+        trace_path = web_dir / 'trace.json'
+        with trace_path.open('w', encoding='utf-8') as json_file:
+            json.dump({'game_id': self.game_id, 'summary': summary, 'moves': traces}, json_file, indent=2)
+        return trace_path
+
     def write_json_from(self, index: int, write_mode: list[str]) -> Game:
         """Write JSON and images for moves starting from index."""
         if config.is_testing:
             return self
 
-        web_dir = Path(config.path.web_dir)
+        web_dir = self.web_dir
 
         if not self.moves:
             self._enqueue_status_only(index, web_dir)
@@ -331,9 +386,9 @@ class Game:  # pylint: disable=too-many-public-methods
 
     def _enqueue_status_only(self, index: int, web_dir: Path) -> None:
         """Handle case with no moves – only status.json upload."""
-        upload.get_upload_queue().put_nowait(Command(self._write_json, -1, web_dir, 'status.json'))
+        self.upload.get_upload_queue().put_nowait(Command(self._write_json, -1, web_dir, 'status.json'))
         if config.output.upload_server:
-            upload.get_upload_queue().put_nowait(Command(upload.upload_move, index))
+            self.upload.get_upload_queue().put_nowait(Command(self._upload_move, index))
 
     def _enqueue_writes(self, start_index: int, write_mode: list[str], web_dir: Path) -> None:
         """Enqueue write and upload tasks for all moves starting from index."""
@@ -342,22 +397,30 @@ class Game:  # pylint: disable=too-many-public-methods
 
         for i in range(start_index, len(self.moves)):
             if write_json:
-                upload.get_upload_queue().put_nowait(Command(self._write_json, i, web_dir, f'data-{i}.json'))
+                self.upload.get_upload_queue().put_nowait(Command(self._write_json, i, web_dir, f'data-{i}.json'))
             if write_img:
-                upload.get_upload_queue().put_nowait(Command(self._write_image, i, web_dir))
+                self.upload.get_upload_queue().put_nowait(Command(self._write_image, i, web_dir))
             if i == len(self.moves) - 1:
-                upload.get_upload_queue().put_nowait(Command(self._write_json, i, web_dir, 'status.json'))
-            if config.output.upload_server:
-                upload.get_upload_queue().put_nowait(Command(upload.upload_move, i))
+                self.upload.get_upload_queue().put_nowait(Command(self._write_json, i, web_dir, 'status.json'))
+            if config.output.upload_server:  # the hub gets the moves of an edit as one batch
+                self.upload.get_upload_queue().put_nowait(Command(self._upload_move, i, flush=i == len(self.moves) - 1))
 
     def _zip_from_game(self):
         if config.is_testing:
             logger.info('skip store because flag is_testing is set')
             return
-        game_id = self.gamestart.strftime('%y%j-%H%M%S')
-        zip_filename = f'{game_id}-{self.nicknames[0]}-{self.nicknames[1]}-{hex(int(time.time()))}'
-        web_dir = config.path.web_dir
+        zip_filename = f'{self.game_id}-{self.nicknames[0]}-{self.nicknames[1]}-{hex(int(time.time()))}'
+        web_dir = self.web_dir
         log_dir = config.path.log_dir
+        log_files = [log_dir / log_file for log_file in ['game.log', 'messages.log']]
+        if config.output.move_trace:
+            try:
+                log_files.append(self._write_trace(web_dir))
+            except OSError:
+                logger.exception('writing trace.json failed')
+        if self.archive.is_open(self.game_id):  # files of the moves are already stored
+            self.archive.finalize(zip_filename, log_files)
+            return
         try:
             with ZipFile(web_dir / f'{zip_filename}.zip', 'w') as _zip:
                 logger.info(f'create zip with {len(self.moves):d} files')
@@ -367,10 +430,9 @@ class Game:  # pylint: disable=too-many-public-methods
                         filepath = web_dir / filename
                         if filepath.exists():
                             _zip.write(filepath, arcname=filename)
-                for log_file in ['game.log', 'messages.log']:
-                    log_path = log_dir / log_file
+                for log_path in log_files:
                     if log_path.exists():
-                        _zip.write(log_path, arcname=log_file)
+                        _zip.write(log_path, arcname=log_path.name)
         except Exception:  # pylint: disable=broad-exception-caught
             logger.exception('creating zip file failed')
 
@@ -403,12 +465,13 @@ class Game:  # pylint: disable=too-many-public-methods
         if not real_tile_coords:
             return self._only_first_blank(blank_coords, new_tiles)
 
-        direction = self._get_move_direction(real_tile_coords)
+        real_tiles = from_coords(real_tile_coords)
+        direction = self._get_move_direction(real_tiles)
         if direction is None:
             return new_tiles
 
-        full_board_coords = previous_board.keys() | new_tiles.keys()
-        valid_blanks = self._find_valid_blanks(direction, blank_coords, real_tile_coords, full_board_coords)
+        full_board = from_coords(previous_board.keys() | new_tiles.keys())
+        valid_blanks = self._find_valid_blanks(direction, blank_coords, real_tiles, full_board)
 
         cleaned_new_tiles = {coord: new_tiles[coord] for coord in real_tile_coords}
         for coord in valid_blanks:
@@ -426,65 +489,62 @@ class Game:  # pylint: disable=too-many-public-methods
         first_blank = next(iter(blank_coords))
         return {first_blank: new_tiles[first_blank]}
 
-    def _get_move_direction(self, real_tile_coords: set[CoordType]) -> str | None:
-        cols = {c for c, r in real_tile_coords}
-        rows = {r for c, r in real_tile_coords}
-        if len(rows) == 1 and len(cols) > 0:
+    def _get_move_direction(self, real_tiles: int) -> str | None:
+        if real_tiles and in_one_row(real_tiles):
             return 'horizontal'
-        if len(cols) == 1 and len(rows) > 0:
+        if real_tiles and in_one_col(real_tiles):
             return 'vertical'
         return None
 
     def _find_valid_blanks(
-        self, direction: str, blank_coords: set[CoordType], real_tile_coords: set[CoordType], full_board_coords: set[CoordType]
+        self, direction: str, blank_coords: set[CoordType], real_tiles: int, full_board: int
     ) -> set[CoordType]:
-        if len(real_tile_coords) <= 1:
-            return self._find_valid_horizontal_blanks(
-                blank_coords, real_tile_coords, full_board_coords
-            ) | self._find_valid_vertical_blanks(blank_coords, real_tile_coords, full_board_coords)
+        if real_tiles.bit_count() <= 1:
+            return self._find_valid_horizontal_blanks(blank_coords, real_tiles, full_board) | self._find_valid_vertical_blanks(
+                blank_coords, real_tiles, full_board
+            )
         if direction == 'horizontal':
-            return self._find_valid_horizontal_blanks(blank_coords, real_tile_coords, full_board_coords)
-        return self._find_valid_vertical_blanks(blank_coords, real_tile_coords, full_board_coords)
+            return self._find_valid_horizontal_blanks(blank_coords, real_tiles, full_board)
+        return self._find_valid_vertical_blanks(blank_coords, real_tiles, full_board)
 
     def _log_removed_blanks(self, new_tiles: BoardType, cleaned_new_tiles: BoardType) -> None:
         if len(cleaned_new_tiles) < len(new_tiles):
             removed = new_tiles.keys() - cleaned_new_tiles.keys()
             logger.info(f'removed blankos: {removed}')
 
-    def _find_valid_horizontal_blanks(
-        self, blank_coords: set[CoordType], real_tile_coords: set[CoordType], full_board_coords: set[CoordType]
-    ) -> set[CoordType]:
-        move_row = next(iter({r for c, r in real_tile_coords}))
-        cols = [c for c, r in real_tile_coords]
-        min_col, max_col = min(cols), max(cols)
-        valid_blanks = set()
-        for b_col, b_row in (b for b in blank_coords if b[1] == move_row):
-            if all((c, move_row) in full_board_coords for c in range(min(b_col, min_col), max(b_col, max_col) + 1)):
-                valid_blanks.add((b_col, b_row))
-        return valid_blanks
-
-    def _find_valid_vertical_blanks(
-        self, blank_coords: set[CoordType], real_tile_coords: set[CoordType], full_board_coords: set[CoordType]
-    ) -> set[CoordType]:
-        move_col = next(iter({c for c, r in real_tile_coords}))
-        rows = [r for c, r in real_tile_coords]
-        min_row, max_row = min(rows), max(rows)
-        valid_blanks = set()
-        for b_col, b_row in (b for b in blank_coords if b[0] == move_col):
-            if all((move_col, r) in full_board_coords for r in range(min(b_row, min_row), max(b_row, max_row) + 1)):
-                valid_blanks.add((b_col, b_row))
-        return valid_blanks
+    def _find_valid_horizontal_blanks(self, blank_coords: set[CoordType], real_tiles: int, full_board: int) -> set[CoordType]:
+        min_col, max_col, move_row, _ = bounds(real_tiles)
+        return {
+            (b_col, b_row)
+            for b_col, b_row in blank_coords
+            if b_row == move_row and not row_span(move_row, min(b_col, min_col), max(b_col, max_col)) & ~full_board
+        }
 
+    def _find_valid_vertical_blanks(self, blank_coords: set[CoordType], real_tiles: int, full_board: int) -> set[CoordType]:
+        move_col, _, min_row, max_row = bounds(real_tiles)
+        return {
+            (b_col, b_row)
+            for b_col, b_row in blank_coords
+            if b_col == move_col and not col_span(move_col, min(b_row, min_row), max(b_row, max_row)) & ~full_board
+        }
+
+    @runtime_measure
     def add_move(  # pylint: disable=too-many-arguments,too-many-positional-arguments
-        self, player: int, played_time: tuple[int, int], img: MatLike, new_tiles: BoardType, removed_tiles: BoardType
+        self,
+        player: int,
+        played_time: tuple[int, int],
+        img: MatLike,
+        new_tiles: BoardType,
+        removed_tiles: BoardType,
+        trace: dict[str, float] | None = None,
     ) -> Game:
         """Adds a new move and determines the type automatically."""
         try:
-            self.add_regular(player, played_time, img, new_tiles)
+            self.add_regular(player, played_time, img, new_tiles, trace=trace)
         except NoMoveError:
-            self.add_exchange(player, played_time, img)
+            self.add_exchange(player, played_time, img, trace=trace)
         except InvalidMoveError:
-            self.add_unknown(player, played_time, img, new_tiles, removed_tiles)
+            self.add_unknown(player, played_time, img, new_tiles, removed_tiles, trace=trace)
         logger.info(f'Scores after move #{self.moves[-1].move} {self.moves[-1].score}\n{self.board_str()}')
         if logger.isEnabledFor(logging.DEBUG):
             msg = '\n' + ''.join(f'{mov.move:2d} {mov.gcg_str}\n' for mov in self.moves)
@@ -493,18 +553,22 @@ class Game:  # pylint: disable=too-many-public-methods
 
         return self
 
-    def add_regular(self, player: int, played_time: tuple[int, int], img: MatLike, new_tiles: BoardType) -> Game:
+    def add_regular(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, player: int, played_time: tuple[int, int], img: MatLike, new_tiles: BoardType, trace: dict | None = None
+    ) -> Game:
         """add regular move"""
         prev_move = self.moves[-1] if self.moves else None
         m = MoveRegular(
             game=self, player=player, played_time=played_time, img=img, new_tiles=new_tiles, previous_move=prev_move
         )
+        m.trace = trace or {}
         return self._insert_move(m)
 
-    def add_exchange(self, player: int, played_time: tuple[int, int], img: MatLike) -> Game:
+    def add_exchange(self, player: int, played_time: tuple[int, int], img: MatLike, trace: dict | None = None) -> Game:
         """add exchange move"""
         prev_move = self.moves[-1] if self.moves else None
         m = MoveExchange(game=self, player=player, played_time=played_time, img=img, previous_move=prev_move)
+        m.trace = trace or {}
         return self._insert_move(m)
 
     def add_two_exchanges_at(self, index: int) -> Game:
@@ -580,12 +644,19 @@ class Game:  # pylint: disable=too-many-public-methods
         return self
 
     def add_unknown(  # pylint: disable=too-many-arguments,too-many-positional-arguments
-        self, player: int, played_time: tuple[int, int], img: MatLike, new_tiles: BoardType, removed_tiles: BoardType
+        self,
+        player: int,
+        played_time: tuple[int, int],
+        img: MatLike,
+        new_tiles: BoardType,
+        removed_tiles: BoardType,
+        trace: dict | None = None,
     ) -> Game:
         """add unknown move"""
         prev_move = self.moves[-1] if self.moves else None
         m = MoveUnknown( game=self, player=player, played_time=played_time, img=img,
             new_tiles=new_tiles, removed_tiles=removed_tiles, previous_move=prev_move )  # fmt: off
+        m.trace = trace or {}
         return self._insert_move(m)
 
     def add_lastrack(self) -> Game:
@@ -636,6 +707,8 @@ class Game:  # pylint: disable=too-many-public-methods
             if updated:
                 modified_indices.add(i)
         if modified_indices:
+            for m in self.moves[min(modified_indices) :]:
+                m.calculate_bag()
             self.write_json_from(index=min(modified_indices), write_mode=[JSON_FLAG])
         return self
 
@@ -18,7 +18,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import logging
 
-from utils.util import Static
+from display import Display
 
 try:
     from hardware.oled import OLEDDisplay as DisplayImpl
@@ -28,60 +28,57 @@ except (ImportError, RuntimeError):
 logger = logging.getLogger()
 
 
-class ScrabbleWatch(Static):
-    """timer for played time"""
+class Clock:
+    """timer for played time of a game session"""
 
-    play_time: int = 0
-    time: tuple[int, int] = (0, 0)
-    current: tuple[int, int] = (0, 0)
-    paused: bool = True
-    player: int = 0  # 0/1 ... player 1/player 2
-    display = DisplayImpl()
+    def __init__(self, display: Display | None = None):
+        self.play_time = 0
+        self.time: tuple[int, int] = (0, 0)
+        self.current: tuple[int, int] = (0, 0)
+        self.paused = True
+        self.player = 0  # 0/1 ... player 1/player 2
+        self.display = display if display is not None else Display()
 
-    @classmethod
-    def start(cls, player: int) -> None:
+    def start(self, player: int) -> None:
         """start timer"""
-        last = cls.player
-        cls.play_time = 0
-        cls.player = player
-        cls.current = (0, 0)
-        cls.paused = False
-        cls.display.render_display(last, cls.time, cls.current)
-
-    @classmethod
-    def pause(cls) -> None:
+        last = self.player
+        self.play_time = 0
+        self.player = player
+        self.current = (0, 0)
+        self.paused = False
+        self.display.render_display(last, self.time, self.current)
+
+    def pause(self) -> None:
         """pause timer"""
-        cls.paused = True
-        cls.display.show_pause(cls.player, cls.time, cls.current)
+        self.paused = True
+        self.display.show_pause(self.player, self.time, self.current)
 
-    @classmethod
-    def resume(cls) -> None:
+    def resume(self) -> None:
         """resume timer"""
-        cls.paused = False
+        self.paused = False
 
-    @classmethod
-    def reset(cls) -> None:
+    def reset(self) -> None:
         """reset timer"""
-        cls.paused = True
-        cls.play_time = 0
-        cls.time = (0, 0)
-        cls.current = (0, 0)
-        cls.player = 0
-
-    @classmethod
-    def tick(cls) -> None:
+        self.paused = True
+        self.play_time = 0
+        self.time = (0, 0)
+        self.current = (0, 0)
+        self.player = 0
+
+    def tick(self) -> None:
         """add one second"""
         try:
-            cls.play_time += 1
-            if not cls.paused:
-                cls.time = (cls.time[0] + 1, cls.time[1]) if cls.player == 0 else (cls.time[0], cls.time[1] + 1)
-                cls.current = (cls.current[0] + 1, cls.current[1]) if cls.player == 0 else (cls.current[0], cls.current[1] + 1)
-                cls.display.render_display(cls.player, cls.time, cls.current)
+            self.play_time += 1
+            if not self.paused:
+                self.time = (self.time[0] + 1, self.time[1]) if self.player == 0 else (self.time[0], self.time[1] + 1)
+                self.current = (
+                    (self.current[0] + 1, self.current[1]) if self.player == 0 else (self.current[0], self.current[1] + 1)
+                )
+                self.display.render_display(self.player, self.time, self.current)
         except Exception:
-            logger.exception('ScrabbleWatch.tick: unexpected error')
+            logger.exception('Clock.tick: unexpected error')
 
-    @classmethod
-    def status(cls) -> tuple[int, tuple[int, int], tuple[int, int]]:
+    def status(self) -> tuple[int, tuple[int, int], tuple[int, int]]:
         """get current timer status
 
         Returns
@@ -89,4 +86,7 @@ class ScrabbleWatch(Static):
             time (int, int): time player 1,2
             current (int, int): time player 1,2 on current move
         """
-        return cls.player, cls.time, cls.current
+        return self.player, self.time, self.current
+
+
+ScrabbleWatch = Clock(display=DisplayImpl())  # clock of the default session (see state.State)
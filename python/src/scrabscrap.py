@@ -35,7 +35,9 @@ from threading import Event
 from admin.server import start_server, stop_server
 from config import config, version
 from hardware import camera
+from speculative import SAMPLE_INTERVAL
 from state import State
+from utils.metrics import metrics
 from utils.threadpool import pool
 from utils.timer_thread import RepeatedTimer
 
@@ -68,6 +70,10 @@ def main() -> None:
             timer.cancel()
         except Exception:
             logger.exception('cleanup: timer.cancel failed')
+        try:
+            speculation_timer.cancel()
+        except Exception:
+            logger.exception('cleanup: speculation_timer.cancel failed')
         try:
             camera.cam.cancel()
         except Exception:
@@ -102,6 +108,7 @@ def main() -> None:
 
     signal.signal(signal.SIGALRM, signal_alarm)
     atexit.register(_cleanup)
+    metrics.enabled = config.system.metrics
 
     def _on_future_done(f):
         if exc := f.exception():
@@ -115,6 +122,8 @@ def main() -> None:
     # create Timer
     timer = RepeatedTimer(1, ScrabbleWatch.tick)
     timer.start()
+    speculation_timer = RepeatedTimer(SAMPLE_INTERVAL, State.do_speculate)
+    speculation_timer.start()
 
     # start admin server
     future_server = pool.submit(start_server)
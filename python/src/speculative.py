@@ -0,0 +1,111 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from move import BoardType
+
+if TYPE_CHECKING:
+    from scrabble import Game
+
+SAMPLE_INTERVAL = 1.0  # seconds between two samples while a clock is running
+SIGNATURE_SIZE = (128, 128)
+PIXEL_DELTA = 40  # gray value difference of a changed pixel
+MAX_CHANGED_PIXELS = 8  # a single tile changes about 64 pixels of the signature
+
+logger = logging.getLogger()
+
+
+def frame_signature(img: MatLike) -> MatLike:
+    """small gray image to compare camera frames"""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if len(img.shape) == 3 else img
+    return cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def same_frame(signature1: MatLike | None, signature2: MatLike | None) -> bool:
+    """do both signatures show the same board"""
+    if signature1 is None or signature2 is None:
+        return False
+    return int(np.count_nonzero(cv2.absdiff(signature1, signature2) > PIXEL_DELTA)) <= MAX_CHANGED_PIXELS
+
+
+class Speculation:
+    """precomputed recognition of the next move while the player is still thinking"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_sample: MatLike | None = None  # signature of the previous sample
+        self.signature: MatLike | None = None  # signature of the precomputed frame
+        self.pending = False
+        self.moves = -1
+        self.board_before: BoardType = {}
+        self.result: tuple[MatLike, BoardType] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def reset(self) -> None:
+        """drop samples and precomputed result"""
+        with self.lock:
+            self.last_sample = self.signature = self.result = None
+            self.moves, self.board_before = -1, {}
+
+    def sample(self, img: MatLike) -> MatLike | None:
+        """Add a camera sample.
+
+        Returns the signature if the board is stable and not yet precomputed, otherwise None.
+        """
+        signature = frame_signature(img)
+        with self.lock:
+            stable = same_frame(signature, self.last_sample)
+            self.last_sample = signature
+            if self.pending or not stable or same_frame(signature, self.signature):
+                return None
+            self.pending = True
+        return signature
+
+    def store(self, signature: MatLike, result: tuple[MatLike, BoardType] | None, moves: int, board_before: BoardType) -> None:
+        """store precomputed result for the game state it was computed from (number of moves and last board)"""
+        with self.lock:
+            self.pending = False
+            if result is None:
+                return
+            self.signature, self.result = signature, result
+            self.moves, self.board_before = moves, board_before
+
+    def take(self, game: Game, img: MatLike) -> tuple[MatLike, BoardType] | None:
+        """return precomputed result if img and game are unchanged since the precomputation"""
+        with self.lock:
+            if self.result is None:
+                return None
+            result, signature, self.result, self.signature = self.result, self.signature, None, None
+            board = game.moves[-1].board if game.moves else {}
+            if self.moves == len(game.moves) and self.board_before == board and same_frame(frame_signature(img), signature):
+                self.hits += 1
+                logger.info(f'speculative recognition reused (hits={self.hits} misses={self.misses})')
+                return result
+            self.misses += 1
+            logger.info(f'speculative recognition outdated (hits={self.hits} misses={self.misses})')
+            return None
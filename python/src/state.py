@@ -18,24 +18,32 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 # pylint: disable=too-many-public-methods
 
 import logging
+import queue
 import threading
+import time
 from collections.abc import Callable
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
+from pathlib import Path
 from signal import alarm
 from time import sleep
 
 from config import config
+from framecache import FrameCache
 from hardware import camera
 from hardware.button import Button, ButtonEnum
+from hardware.capture import capture
+from hardware.crop import BoardCrop
 from hardware.led import LED, LEDEnum
+from journal import JOURNAL, Journal
 from move import MoveType
-from processing import check_resume, end_of_game, event_set, invalid_challenge, move, new_game, valid_challenge
+from processing import check_resume, end_of_game, event_set, invalid_challenge, move, new_game, speculate, valid_challenge
 from scrabble import Game
-from scrabblewatch import ScrabbleWatch
-from utils.threadpool import Command, command_queue
-from utils.util import Static
+from scrabblewatch import Clock, ScrabbleWatch
+from utils.archive import GameArchive
+from utils.threadpool import Command, CommandWorker, Lane, LaneQueue, command_queue
+from utils.upload import Upload
 
 logger = logging.getLogger()
 
@@ -61,200 +69,305 @@ class GameContext:
     game: Game
     picture: object = None
     ap_mode: bool = False
-    op_event = threading.Event()
+    op_event: threading.Event = field(default_factory=threading.Event)
     current_state: GameState = GameState.START
-
-
-class State(Static):
-    """State machine of the scrabble game"""
-
-    ctx: GameContext = GameContext(game=Game())
-    button_handler = Button
-
-    @classmethod
-    def init(cls) -> None:
+    press_time: float | None = None  # time of the last button press
+
+
+class GameSession:
+    """State machine of a scrabble game with its own game, clock, camera and command queue
+
+    several sessions can run in one process (e.g. one per board of a tournament), the default session of the
+    board is State. A session with an output_dir writes its files, archive and journal there, uploads them to its
+    table of the hub (default: name of output_dir) and has its own warp state and frame cache.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        game: Game | None = None,
+        clock: Clock | None = None,
+        cam: camera.Camera | None = None,
+        cmd_queue: queue.Queue | None = None,
+        button_handler=Button,
+        led=LED,
+        output_dir: Path | None = None,
+        table: str | None = None,
+    ):
+        game = game if game is not None else Game()
+        if output_dir is not None:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            game.upload = Upload(web_dir=output_dir, table=table or output_dir.name)
+            game.archive = GameArchive(web_dir=output_dir)
+            if cam is not None:  # camera.cam shares the warp of the board
+                cam.crop = BoardCrop()
+            game.frames = FrameCache(cam.crop if cam is not None else camera.cam.crop)
+        self.ctx = GameContext(game=game)
+        self.output_dir = output_dir
+        self.clock = clock if clock is not None else Clock()
+        self._cam = cam  # None: camera.cam (can be switched at runtime)
+        if cmd_queue is None:
+            cmd_queue = LaneQueue()
+            CommandWorker(cmd_queue=cmd_queue).start()
+        self.queue = cmd_queue
+        self.speculation_queue: queue.Queue | None = None  # own worker, live moves must not wait for a speculation
+        self.button_queue: queue.Queue | None = None  # button presses are processed off the gpio callback thread
+        self.button_handler = button_handler
+        self.led = led
+        self.transitions = self._transitions()
+
+    @property
+    def cam(self) -> camera.Camera:
+        """camera of the session"""
+        return self._cam if self._cam is not None else camera.cam
+
+    @property
+    def journal_path(self) -> Path:
+        """journal of the session (see scrabble.journal)"""
+        return (self.output_dir if self.output_dir is not None else config.path.work_dir) / JOURNAL
+
+    def init(self) -> None:
         """init state machine"""
-        cls.button_handler.start(func_pressed=cls.press_button)
-        cls.do_new_game()
-
-    @classmethod
-    def do_ready(cls, next_state: GameState = GameState.START) -> GameState:
+        if self.button_queue is None:
+            self.button_queue = queue.Queue()
+            CommandWorker(cmd_queue=self.button_queue).start()
+        self.button_handler.start(func_pressed=self.dispatch_button)
+        if config.scrabble.journal and not config.is_testing:
+            self.ctx.game.journal = Journal(self.journal_path)
+            if self.do_restore():
+                return
+        self.do_new_game()
+
+    def do_restore(self) -> bool:
+        """rebuild game, state and clock of an unfinished game from the journal (a running clock is paused)"""
+        journal = self.ctx.game.journal
+        if journal is None or (data := journal.load()) is None or data.get('finished'):
+            return False
+        journal.restore(self.ctx.game, data)
+        state = GameState[data.get('state', GameState.START.name)]
+        state = {GameState.S0: GameState.P0, GameState.S1: GameState.P1}.get(state, state)
+        player, played_time = data.get('clock', (0, (0, 0)))
+        self.clock.reset()
+        self.clock.player, self.clock.time = player, tuple(played_time)
+        self.ctx.current_state = state
+        self.clock.display.set_game(self.ctx.game)
+        if state == GameState.START:
+            self.clock.display.show_ready(self.ctx.game.nicknames)
+            self.led.switch(on={LEDEnum.green, LEDEnum.red})
+        else:
+            self.clock.display.show_pause(player, self.clock.time, self.clock.current)
+            self.led.switch(on={LEDEnum.yellow})
+        event_set(event=self.ctx.op_event)
+        return True
+
+    def do_ready(self, next_state: GameState = GameState.START) -> GameState:
         """Game can be started"""
-        logger.debug(f'{cls.ctx.game.nicknames}')
-        ScrabbleWatch.display.show_ready(cls.ctx.game.nicknames)
-        ScrabbleWatch.display.set_game(cls.ctx.game)
+        logger.debug(f'{self.ctx.game.nicknames}')
+        self.clock.display.show_ready(self.ctx.game.nicknames)
+        self.clock.display.set_game(self.ctx.game)
         return next_state
 
-    @classmethod
-    def do_start(cls, player: int, next_state: GameState) -> GameState:
+    def do_start(self, player: int, next_state: GameState) -> GameState:
         """Start playing with player 0/1"""
-        ScrabbleWatch.start(player)
-        LED.switch(on=PLAYER_LEDS[player])
-        ScrabbleWatch.display.render_display(player, (0, 0), (0, 0))
-        cls.ctx.picture = camera.cam.read(peek=True)
-        cls.ctx.current_state = next_state
-        event_set(event=cls.ctx.op_event)
+        self.clock.start(player)
+        self.led.switch(on=PLAYER_LEDS[player])
+        self.clock.display.render_display(player, (0, 0), (0, 0))
+        self.ctx.picture = self.cam.read(peek=True).copy()  # kept: must not be a view into the frame ring
+        self.ctx.current_state = next_state
+        event_set(event=self.ctx.op_event)
         return next_state
 
-    @classmethod
-    def do_move(cls, player: int, next_state: GameState) -> GameState:
+    def do_move(self, player: int, next_state: GameState) -> GameState:
         """analyze players 0/1 move"""
         next_player = abs(player - 1)
-        _, played_time, _ = ScrabbleWatch.status()
-        ScrabbleWatch.start(next_player)
-        LED.switch(on=PLAYER_LEDS[next_player])
-        cls.ctx.picture = camera.cam.read()
+        _, played_time, _ = self.clock.status()
+        self.clock.start(next_player)
+        self.led.switch(on=PLAYER_LEDS[next_player])
+        start = time.time()
+        self.ctx.picture = self.cam.read(timestamp=self.ctx.press_time)  # best frame around the button press
+        trace = None
+        if config.output.move_trace:  # seconds after the button press, the queue wait is added by move()
+            press_time = self.ctx.press_time or start
+            trace = {'press_time': press_time, 'press': start - press_time, 'capture': time.time() - start}
+            trace['queued'] = time.time()
         with suppress(Exception):
-            command_queue.put_nowait(Command(move, cls.ctx.game, cls.ctx.picture, player, played_time, cls.ctx.op_event))
+            self.queue.put_nowait(
+                Command(move, self.ctx.game, self.ctx.picture, player, played_time, self.ctx.op_event, trace=trace)
+            )
         return next_state
 
-    @classmethod
-    def do_pause(cls, next_state: GameState) -> GameState:
+    def do_speculate(self) -> None:
+        """sample the board while a clock is running and precompute the recognition of the next move"""
+        if not config.scrabble.speculative or self.ctx.current_state not in (GameState.S0, GameState.S1):
+            return
+        with suppress(Exception):
+            img = self.cam.read(peek=True).copy()  # queued: must not be a view into the frame ring
+            if (signature := self.ctx.game.speculation.sample(img)) is not None:
+                if self.speculation_queue is None:
+                    self.speculation_queue = queue.Queue()
+                    CommandWorker(cmd_queue=self.speculation_queue, lane=Lane.BACKGROUND).start()
+                self.speculation_queue.put_nowait(Command(speculate, self.ctx.game, img, signature))
+
+    def do_pause(self, next_state: GameState) -> GameState:
         """pause pressed while player 0 is active"""
-        ScrabbleWatch.pause()
-        LED.switch(on={LEDEnum.yellow})
-        cls.ctx.current_state = next_state
-        event_set(event=cls.ctx.op_event)
+        self.clock.pause()
+        self.led.switch(on={LEDEnum.yellow})
+        self.ctx.current_state = next_state
+        event_set(event=self.ctx.op_event)
         return next_state
 
-    @classmethod
-    def do_resume(cls, player: int, next_state: GameState) -> GameState:
+    def do_resume(self, player: int, next_state: GameState) -> GameState:
         """resume from pause while player 0 is active"""
-        ScrabbleWatch.resume()
-        LED.switch(on=PLAYER_LEDS[player])
+        self.clock.resume()
+        self.led.switch(on=PLAYER_LEDS[player])
         with suppress(Exception):
-            cls.ctx.picture = camera.cam.read(peek=True)
-            command_queue.put_nowait(Command(check_resume, cls.ctx.game, cls.ctx.picture, cls.ctx.op_event))
-        cls.ctx.current_state = next_state
-        event_set(event=cls.ctx.op_event)
+            self.ctx.picture = self.cam.read(peek=True).copy()  # queued: must not be a view into the frame ring
+            self.queue.put_nowait(Command(check_resume, self.ctx.game, self.ctx.picture, self.ctx.op_event))
+        self.ctx.current_state = next_state
+        event_set(event=self.ctx.op_event)
         return next_state
 
-    @classmethod
-    def do_valid_challenge(cls, player: int, next_state: GameState) -> GameState:
+    def do_valid_challenge(self, player: int, next_state: GameState) -> GameState:
         """player 0/1 has a valid challenge for the last move from player 1/0"""
-        _, played_time, current = ScrabbleWatch.status()
+        _, played_time, current = self.clock.status()
         if current[player] > config.scrabble.doubt_timeout:
-            ScrabbleWatch.display.add_doubt_timeout(player, played_time, current)
+            self.clock.display.add_doubt_timeout(player, played_time, current)
             logger.warning(f'valid challenge after timeout {current[0]}')
-        ScrabbleWatch.display.add_remove_tiles(player, played_time, current)  # player 1 has to remove the last move
+        self.clock.display.add_remove_tiles(player, played_time, current)  # player 1 has to remove the last move
         with suppress(Exception):
-            command_queue.put_nowait(Command(valid_challenge, cls.ctx.game, cls.ctx.op_event))
-        LED.switch(on={LEDEnum.yellow}, blink=PLAYER_LEDS[player])
+            self.queue.put_nowait(Command(valid_challenge, self.ctx.game, self.ctx.op_event))
+        self.led.switch(on={LEDEnum.yellow}, blink=PLAYER_LEDS[player])
         return next_state
 
-    @classmethod
-    def do_invalid_challenge(cls, player: int, next_state: GameState) -> GameState:
+    def do_invalid_challenge(self, player: int, next_state: GameState) -> GameState:
         """player 0/1 has an invalid challenge for the last move from player 1/0"""
-        _, played_time, current = ScrabbleWatch.status()
+        _, played_time, current = self.clock.status()
         if current[player] > config.scrabble.doubt_timeout:
-            ScrabbleWatch.display.add_doubt_timeout(player, played_time, current)
+            self.clock.display.add_doubt_timeout(player, played_time, current)
             logger.warning(f'invalid challenge after timeout {current[player]}')
-        ScrabbleWatch.display.add_malus(player, played_time, current)  # player 0 gets a malus
+        self.clock.display.add_malus(player, played_time, current)  # player 0 gets a malus
         with suppress(Exception):
-            command_queue.put_nowait(Command(invalid_challenge, cls.ctx.game, cls.ctx.op_event))
-        LED.switch(on={LEDEnum.yellow}, blink=PLAYER_LEDS[player])
+            self.queue.put_nowait(Command(invalid_challenge, self.ctx.game, self.ctx.op_event))
+        self.led.switch(on={LEDEnum.yellow}, blink=PLAYER_LEDS[player])
         return next_state
 
-    @classmethod
-    def do_new_game(cls) -> GameState:
+    def do_new_game(self) -> GameState:
         """Starts a new game"""
-        LED.switch()
-        cls.ctx.picture = None
-        ScrabbleWatch.reset()
-        cls.ctx.current_state = GameState.START
+        self.led.switch()
+        self.ctx.picture = None
+        self.clock.reset()
+        self.ctx.current_state = GameState.START
         with suppress(Exception):
-            new_game(cls.ctx.game, cls.ctx.op_event)
-        ScrabbleWatch.display.set_game(cls.ctx.game)
-        ScrabbleWatch.display.show_ready(cls.ctx.game.nicknames)
-        LED.switch(on={LEDEnum.green, LEDEnum.red})
-        return cls.ctx.current_state
-
-    @classmethod
-    def do_end_of_game(cls) -> GameState:
+            new_game(self.ctx.game, self.ctx.op_event)  # restarts the journal
+        self.clock.display.set_game(self.ctx.game)
+        self.clock.display.show_ready(self.ctx.game.nicknames)
+        self.led.switch(on={LEDEnum.green, LEDEnum.red})
+        return self.ctx.current_state
+
+    def do_end_of_game(self) -> GameState:
         """Resets state and game to default"""
 
         def has_unknown_rack() -> bool:
-            for m in cls.ctx.game.moves:
+            for m in self.ctx.game.moves:
                 if m.type in (MoveType.LAST_RACK_BONUS, MoveType.LAST_RACK_MALUS):
                     return m.points == 0
             return True
 
-        LED.switch()
-        if cls.ctx.current_state != GameState.EOG:
-            ScrabbleWatch.display.show_ready(('end of', 'game'))
-            player, _, _ = ScrabbleWatch.status()
+        self.led.switch()
+        if self.ctx.current_state != GameState.EOG:
+            self.clock.display.show_ready(('end of', 'game'))
+            player, _, _ = self.clock.status()
             picture = None
             with suppress(Exception):
-                picture = camera.cam.read(peek=True)
-            cls.ctx.current_state = GameState.EOG
+                picture = self.cam.read(peek=True).copy()  # queued: must not be a view into the frame ring
+            self.ctx.current_state = GameState.EOG
             with suppress(Exception):
-                command_queue.put_nowait(
-                    Command(end_of_game, game=cls.ctx.game, image=picture, player=player, event=cls.ctx.op_event)
+                self.queue.put_nowait(
+                    Command(end_of_game, game=self.ctx.game, image=picture, player=player, event=self.ctx.op_event)
                 )
-            command_queue.join()  # wait for finishing tasks
-        ScrabbleWatch.display.show_end_of_game(unknown_rack=has_unknown_rack())
-        LED.switch(blink={LEDEnum.yellow})
-        return cls.ctx.current_state
-
-    @classmethod
-    def do_reboot(cls) -> GameState:  # pragma: no cover
-        """Perform a reboot"""
-        LED.switch()
-        ScrabbleWatch.display.show_boot()
-        with suppress(Exception):
-            end_of_game(cls.ctx.game)
-        command_queue.join()  # wait for finishing tasks
-        ScrabbleWatch.display.stop()
-        cls.ctx.current_state = GameState.START  # method called from outside (api_server)
+            self.queue.join()  # wait for finishing tasks
+        self.clock.display.show_end_of_game(unknown_rack=has_unknown_rack())
+        self.led.switch(blink={LEDEnum.yellow})
+        return self.ctx.current_state
+
+    def do_reboot(self) -> GameState:
+        """Perform a reboot, a game with journal is restored after the reboot"""
+        self.led.switch()
+        self.clock.display.show_boot()
+        journal = self.ctx.game.journal
+        if journal is not None:  # the game is not finished
+            player, played_time, _ = self.clock.status()
+            journal.record('reboot', self.ctx.game, state=self.ctx.current_state.name, clock=(player, played_time))
+        else:
+            with suppress(Exception):
+                end_of_game(self.ctx.game)
+            self.ctx.current_state = GameState.START  # method called from outside (api_server)
+        self.queue.join()  # wait for finishing tasks
+        if journal is not None:
+            journal.flush()
+        self.clock.display.stop()
         alarm(1)  # raise alarm for reboot
-        return cls.ctx.current_state
+        return self.ctx.current_state
 
-    @classmethod
-    def do_accesspoint(cls) -> GameState:  # pragma: no cover
+    def do_accesspoint(self) -> GameState:  # pragma: no cover
         """Switch to AP Mode"""
         import subprocess
 
-        ScrabbleWatch.display.show_ready(('switch', 'AP'))
-        cls.ctx.ap_mode = not cls.ctx.ap_mode
-        cmd = ['sudo', '-n', '/usr/bin/nmcli', 'connection', 'up' if cls.ctx.ap_mode else 'down', 'ScrabScrap']
+        self.clock.display.show_ready(('switch', 'AP'))
+        self.ctx.ap_mode = not self.ctx.ap_mode
+        cmd = ['sudo', '-n', '/usr/bin/nmcli', 'connection', 'up' if self.ctx.ap_mode else 'down', 'ScrabScrap']
         logger.debug(f'switch to AP {cmd=}')
         ret = subprocess.run(cmd, check=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
         if ret.returncode == 0:
-            if cls.ctx.ap_mode:
-                LED.switch()
+            if self.ctx.ap_mode:
+                self.led.switch()
                 sleep(5)
-                ScrabbleWatch.display.show_accesspoint()
+                self.clock.display.show_accesspoint()
             else:
                 sleep(5)
-                LED.switch(on={LEDEnum.green, LEDEnum.red})
-                ScrabbleWatch.display.show_ready()
-        cls.ctx.current_state = GameState.START  # method called from outside (api_server)
-        return cls.ctx.current_state
-
-    @classmethod
-    def press_button(cls, button: str) -> None:
+                self.led.switch(on={LEDEnum.green, LEDEnum.red})
+                self.clock.display.show_ready()
+        self.ctx.current_state = GameState.START  # method called from outside (api_server)
+        return self.ctx.current_state
+
+    def dispatch_button(self, button: str, press_time: float | None = None) -> None:
+        """queue the button press, the selection of the frame waits for the frames after the press"""
+        press_time = press_time if press_time is not None else time.time()
+        if self.button_queue is None:
+            self.press_button(button, press_time)
+        else:
+            self.button_queue.put_nowait(Command(self.press_button, button, press_time))
+
+    def press_button(self, button: str, press_time: float | None = None) -> None:
         """Process button press
 
         Args:
             button: Button identifier that was pressed
+            press_time: time of the button press (default: now)
         """
+        self.ctx.press_time = press_time if press_time is not None else time.time()
+        capture.boost()  # high capture rate for the frames around the press
         try:
-            logger.debug(f'-> button {button} pressed at {cls.ctx.current_state}')
+            logger.debug(f'-> button {button} pressed at {self.ctx.current_state}')
             # Get state transitions for current state
-            state_transitions = cls.transitions.get(cls.ctx.current_state, {})
+            state_transitions = self.transitions.get(self.ctx.current_state, {})
             # Get specific transition for button
             transition_func = state_transitions.get(ButtonEnum[button])
             if transition_func is None:
-                logger.warning(f'Invalid transition: {button} at {cls.ctx.current_state}')
+                logger.warning(f'Invalid transition: {button} at {self.ctx.current_state}')
                 return
             # Execute transition function and update state
-            cls.ctx.current_state = transition_func()
-            logger.debug(f'-> new {cls.ctx.current_state}')
+            self.ctx.current_state = transition_func()
+            logger.debug(f'-> new {self.ctx.current_state}')
+            if self.ctx.game.journal is not None:
+                player, played_time, _ = self.clock.status()
+                self.ctx.game.journal.record(
+                    'button', self.ctx.game, button=button, state=self.ctx.current_state.name, clock=(player, played_time)
+                )
         except KeyError:
-            logger.warning(f'Key Error: {button} at {cls.ctx.current_state} - ignored')
+            logger.warning(f'Key Error: {button} at {self.ctx.current_state} - ignored')
         except Exception as oops:  # pylint: disable=broad-exception-caught
             logger.warning(f'ignore invalid exception on button handling {oops}')
-        # event_set(cls.ctx.op_event)
+        # event_set(self.ctx.op_event)
 
     # unused:
     # @classmethod
@@ -266,43 +379,47 @@ class State(Static):
 
     # START, pause => not supported
     # pylint: disable=unnecessary-lambda
-    transitions: dict[GameState, dict[ButtonEnum, Callable]] = {
-        GameState.START: {
-            ButtonEnum.GREEN: lambda: State.do_start(player=1, next_state=GameState.S1),
-            ButtonEnum.RED: lambda: State.do_start(player=0, next_state=GameState.S0),
-            ButtonEnum.RESET: lambda: State.do_new_game(),
-            ButtonEnum.REBOOT: lambda: State.do_reboot(),
-            ButtonEnum.AP: lambda: State.do_accesspoint(),
-        },
-        GameState.S0: {
-            ButtonEnum.GREEN: lambda: State.do_move(player=0, next_state=GameState.S1),
-            ButtonEnum.YELLOW: lambda: State.do_pause(next_state=GameState.P0),
-        },
-        GameState.P0: {
-            ButtonEnum.RED: lambda: State.do_resume(player=0, next_state=GameState.S0),
-            ButtonEnum.YELLOW: lambda: State.do_resume(player=0, next_state=GameState.S0),
-            ButtonEnum.DOUBT0: lambda: State.do_valid_challenge(player=0, next_state=GameState.P0),
-            ButtonEnum.DOUBT1: lambda: State.do_invalid_challenge(player=0, next_state=GameState.P0),
-            ButtonEnum.RESET: lambda: State.do_end_of_game(),
-            ButtonEnum.REBOOT: lambda: State.do_reboot(),
-        },
-        GameState.S1: {
-            ButtonEnum.RED: lambda: State.do_move(player=1, next_state=GameState.S0),
-            ButtonEnum.YELLOW: lambda: State.do_pause(next_state=GameState.P1),
-        },
-        GameState.P1: {
-            ButtonEnum.GREEN: lambda: State.do_resume(player=1, next_state=GameState.S1),
-            ButtonEnum.YELLOW: lambda: State.do_resume(player=1, next_state=GameState.S1),
-            ButtonEnum.DOUBT0: lambda: State.do_invalid_challenge(player=1, next_state=GameState.P1),
-            ButtonEnum.DOUBT1: lambda: State.do_valid_challenge(player=1, next_state=GameState.P1),
-            ButtonEnum.RESET: lambda: State.do_end_of_game(),
-            ButtonEnum.REBOOT: lambda: State.do_reboot(),
-        },
-        GameState.EOG: {
-            ButtonEnum.GREEN: lambda: State.do_new_game(),
-            ButtonEnum.RED: lambda: State.do_new_game(),
-            ButtonEnum.YELLOW: lambda: State.do_new_game(),
-            ButtonEnum.REBOOT: lambda: State.do_reboot(),
-            ButtonEnum.AP: lambda: State.do_accesspoint(),
-        },
-    }
+    def _transitions(self) -> dict[GameState, dict[ButtonEnum, Callable]]:
+        return {
+            GameState.START: {
+                ButtonEnum.GREEN: lambda: self.do_start(player=1, next_state=GameState.S1),
+                ButtonEnum.RED: lambda: self.do_start(player=0, next_state=GameState.S0),
+                ButtonEnum.RESET: lambda: self.do_new_game(),
+                ButtonEnum.REBOOT: lambda: self.do_reboot(),
+                ButtonEnum.AP: lambda: self.do_accesspoint(),
+            },
+            GameState.S0: {
+                ButtonEnum.GREEN: lambda: self.do_move(player=0, next_state=GameState.S1),
+                ButtonEnum.YELLOW: lambda: self.do_pause(next_state=GameState.P0),
+            },
+            GameState.P0: {
+                ButtonEnum.RED: lambda: self.do_resume(player=0, next_state=GameState.S0),
+                ButtonEnum.YELLOW: lambda: self.do_resume(player=0, next_state=GameState.S0),
+                ButtonEnum.DOUBT0: lambda: self.do_valid_challenge(player=0, next_state=GameState.P0),
+                ButtonEnum.DOUBT1: lambda: self.do_invalid_challenge(player=0, next_state=GameState.P0),
+                ButtonEnum.RESET: lambda: self.do_end_of_game(),
+                ButtonEnum.REBOOT: lambda: self.do_reboot(),
+            },
+            GameState.S1: {
+                ButtonEnum.RED: lambda: self.do_move(player=1, next_state=GameState.S0),
+                ButtonEnum.YELLOW: lambda: self.do_pause(next_state=GameState.P1),
+            },
+            GameState.P1: {
+                ButtonEnum.GREEN: lambda: self.do_resume(player=1, next_state=GameState.S1),
+                ButtonEnum.YELLOW: lambda: self.do_resume(player=1, next_state=GameState.S1),
+                ButtonEnum.DOUBT0: lambda: self.do_invalid_challenge(player=1, next_state=GameState.P1),
+                ButtonEnum.DOUBT1: lambda: self.do_valid_challenge(player=1, next_state=GameState.P1),
+                ButtonEnum.RESET: lambda: self.do_end_of_game(),
+                ButtonEnum.REBOOT: lambda: self.do_reboot(),
+            },
+            GameState.EOG: {
+                ButtonEnum.GREEN: lambda: self.do_new_game(),
+                ButtonEnum.RED: lambda: self.do_new_game(),
+                ButtonEnum.YELLOW: lambda: self.do_new_game(),
+                ButtonEnum.REBOOT: lambda: self.do_reboot(),
+                ButtonEnum.AP: lambda: self.do_accesspoint(),
+            },
+        }
+
+
+State = GameSession(clock=ScrabbleWatch, cmd_queue=command_queue)  # session of the board
@@ -27,6 +27,10 @@ ws.onmessage = (event) => {
     status_field.innerHTML = `
                 <i class="${(msg.state == "S0") ? 'bi-circle-fill text-success' : (msg.state == "S1") ? 'bi-circle-fill text-danger' : (msg.state == "EOG") ? 'bi-circle-fill' : 'bi-circle-fill text-warning'}"></i>
             `;
+    // show progress of a running repair (admin edit)
+    if (msg.repair && msg.repair.running) {
+        status_field.innerHTML += ` <small class="text-warning">repair ${msg.repair.done}/${msg.repair.total}</small>`;
+    }
     // set background image
     if (msg.image) { boardImage.src = msg.image; }
     else { boardImage.src = default_board_image; }
@@ -0,0 +1,106 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import warnings
+from contextlib import suppress
+from pathlib import Path
+from zipfile import ZipFile
+
+from config import config
+
+logger = logging.getLogger()
+
+
+class GameArchive:
+    """zip archive of the running game, the files of a move are appended as soon as they are written"""
+
+    def __init__(self, web_dir: Path | None = None):
+        self.web_dir = web_dir  # None: path.web_dir
+        self.game_id: str | None = None
+        self._zip: ZipFile | None = None
+        self._path: Path | None = None
+        self._lock = threading.Lock()
+
+    def is_open(self, game_id: str) -> bool:
+        """archive is open for game_id"""
+        return self._zip is not None and self.game_id == game_id
+
+    def open(self, game_id: str) -> None:
+        """start a new archive, an open archive of another game will be discarded"""
+        with self._lock:
+            self._discard()
+            self._path = (self.web_dir or Path(config.path.web_dir)) / f'{game_id}.zip.part'
+            try:
+                self._zip = ZipFile(self._path, 'w')
+                self.game_id = game_id
+                logger.debug(f'archive opened {self._path}')
+            except OSError:
+                logger.exception(f'can not open archive {self._path}')
+                self._zip, self._path = None, None
+
+    def add(self, path: Path) -> None:
+        """append file, a previous version of the file will be dropped on finalize"""
+        with self._lock:
+            if self._zip is None or not path.exists():
+                return
+            try:
+                with warnings.catch_warnings():
+                    warnings.filterwarnings('ignore', message='Duplicate name')
+                    self._zip.write(path, arcname=path.name)
+            except (OSError, ValueError):
+                logger.exception(f'can not add {path} to archive')
+
+    def finalize(self, zip_filename: str, extra_files: list[Path]) -> Path | None:
+        """add extra files, write the central directory and rename the archive to zip_filename
+
+        previous versions of rewritten files are left out of the central directory instead of copying the archive:
+        zip readers use the central directory, the superseded versions stay as unreferenced bytes in the file
+        """
+        with self._lock:
+            if self._zip is None or self._path is None:
+                return None
+            target = self._path.with_name(f'{zip_filename}.zip')
+            try:
+                for path in (p for p in extra_files if p.exists()):
+                    self._zip.write(path, arcname=path.name)
+                rewritten = len(self._zip.filelist) - len(self._zip.NameToInfo)
+                logger.info(f'finalize zip with {len(self._zip.NameToInfo):d} files ({rewritten} rewritten)')
+                self._zip.filelist = [info for info in self._zip.filelist if self._zip.NameToInfo[info.filename] is info]
+                self._zip.close()
+                self._path.rename(target)
+            except (OSError, ValueError):
+                logger.exception('finalize of archive failed')
+                return None
+            finally:
+                self._zip, self._path, self.game_id = None, None, None
+            return target
+
+    def _discard(self) -> None:
+        if self._zip is not None and self._path is not None:
+            with suppress(OSError, ValueError):
+                self._zip.close()
+            self._path.unlink(missing_ok=True)
+            logger.info(f'archive discarded {self._path}')
+        self._zip, self._path, self.game_id = None, None, None
+
+
+archive = GameArchive()
@@ -0,0 +1,124 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+HISTOGRAM_SAMPLES = 256  # recent values kept for the percentiles
+
+logger = logging.getLogger()
+
+
+class Histogram:
+    """count, sum and max of all values, percentiles of the recent values (not thread safe, see Metrics)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=HISTOGRAM_SAMPLES)
+
+    def observe(self, value: float) -> None:
+        """add value"""
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def as_dict(self) -> dict:
+        """histogram as json compatible dict"""
+        samples = sorted(self.samples)
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+        return {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'max': self.max,
+        }
+
+
+class Metrics:
+    """In-process registry of counters, histograms and gauges.
+
+    Disabled metrics are not recorded; measured functions are then called without timing overhead.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.started = time.time()
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.gauges: dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: int = 1) -> None:
+        """increment counter"""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """add value (e.g. latency in seconds) to histogram"""
+        if self.enabled:
+            with self._lock:
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram()
+                histogram.observe(value)
+
+    def gauge(self, name: str, func: Callable[[], float]) -> None:
+        """register gauge, the current value is read on snapshot"""
+        self.gauges[name] = func
+
+    def snapshot(self) -> dict:
+        """all metrics as json compatible dict"""
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {name: h.as_dict() for name, h in sorted(self.histograms.items())}
+        gauges = {}
+        for name, func in list(self.gauges.items()):
+            try:
+                gauges[name] = func()
+            except Exception:  # noqa: PERF203 # pylint: disable=broad-exception-caught
+                logger.exception(f'gauge {name} failed')
+        return {
+            'enabled': self.enabled,
+            'uptime': time.time() - self.started,
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': gauges,
+        }
+
+    def reset(self) -> None:
+        """clear counters and histograms"""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+
+metrics = Metrics()
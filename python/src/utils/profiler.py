@@ -0,0 +1,161 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+MAX_DURATION = 300.0  # hard limit of a profiling run in seconds
+DEFAULT_DURATION = 30.0
+DEFAULT_INTERVAL = 0.01  # seconds between two samples
+
+logger = logging.getLogger()
+
+FrameKey = tuple[str, int, str]  # file, first line, function (pstats key)
+
+
+class SamplingProfiler:
+    """Low overhead sampling profiler of all threads of the running process.
+
+    A daemon thread records the stacks of all other threads (sys._current_frames) every interval seconds and
+    stops after the duration (at most MAX_DURATION). The samples are exported as folded stacks (flamegraph.pl,
+    speedscope) or as pstats file (snakeviz, python -m pstats) with sample counts times interval as times.
+    """
+
+    def __init__(self):
+        self.samples: Counter[tuple[str, tuple[FrameKey, ...]]] = Counter()  # (thread, stack root first) => count
+        self.started = 0.0
+        self.stopped = 0.0
+        self.duration = 0.0
+        self.interval = DEFAULT_INTERVAL
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """profiler thread is sampling"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = DEFAULT_DURATION, interval: float = DEFAULT_INTERVAL) -> bool:
+        """start sampling for duration seconds (limited to MAX_DURATION), returns False if already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self.samples.clear()
+            self.duration = min(max(duration, 1.0), MAX_DURATION)
+            self.interval = max(interval, 0.001)
+            self.started, self.stopped = time.time(), 0.0
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='SamplingProfiler', daemon=True)
+            self._thread.start()
+        logger.info(f'profiler started for {self.duration:.0f}s every {1000 * self.interval:.0f}ms')
+        return True
+
+    def stop(self) -> None:
+        """stop sampling and wait for the profiler thread"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2 * self.interval + 1)
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        deadline = self.started + self.duration
+        try:
+            while not self._stop.wait(self.interval) and time.time() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():  # noqa: SLF001 # pylint: disable=protected-access
+                    if ident != own_ident:
+                        self.samples[(names.get(ident, str(ident)), self._stack(frame))] += 1
+        finally:
+            self.stopped = time.time()
+            logger.info(f'profiler stopped after {self.stopped - self.started:.1f}s with {self.count} samples')
+
+    @staticmethod
+    def _stack(frame: FrameType | None) -> tuple[FrameKey, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    @property
+    def count(self) -> int:
+        """number of recorded stacks"""
+        return sum(self.samples.values())
+
+    def status(self) -> dict:
+        """state of the profiler as json compatible dict"""
+        end = self.stopped or time.time()
+        return {
+            'running': self.running,
+            'started': self.started,
+            'elapsed': end - self.started if self.started else 0.0,
+            'duration': self.duration,
+            'interval': self.interval,
+            'samples': self.count,
+            'max_duration': MAX_DURATION,
+        }
+
+    def folded(self) -> str:
+        """samples as folded stacks: thread;file:function;... count"""
+        lines = []
+        for (thread, stack), count in sorted(self.samples.items(), key=lambda item: -item[1]):
+            frames = ';'.join(f'{Path(file).name}:{func}' for file, _, func in stack)
+            lines.append(f'{thread};{frames} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def pstats(self) -> dict:
+        """samples in the format of pstats.Stats.stats: key => (calls, calls, tottime, cumtime, callers)"""
+        own: Counter[FrameKey] = Counter()
+        cumulative: Counter[FrameKey] = Counter()
+        callers: dict[FrameKey, Counter[FrameKey]] = {}
+        for (_, stack), count in self.samples.items():
+            if not stack:
+                continue
+            own[stack[-1]] += count
+            for key in set(stack):  # recursive functions are counted once per sample
+                cumulative[key] += count
+            for caller, callee in zip(stack, stack[1:], strict=False):
+                callers.setdefault(callee, Counter())[caller] += count
+        result = {}
+        for key, count in cumulative.items():
+            calls = {c: (n, n, n * self.interval, n * self.interval) for c, n in callers.get(key, {}).items()}
+            result[key] = (count, count, own[key] * self.interval, count * self.interval, calls)
+        return result
+
+    def dump(self, path: Path, fmt: str = 'pstats') -> Path:
+        """write samples as pstats (marshal) or folded stacks"""
+        if fmt == 'folded':
+            path.write_text(self.folded(), encoding='utf-8')
+        else:
+            with path.open('wb') as file:
+                marshal.dump(self.pstats(), file)
+        return path
+
+
+profiler = SamplingProfiler()
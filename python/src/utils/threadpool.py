@@ -16,33 +16,117 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import heapq
+import itertools
 import logging
 import queue
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import IntEnum
+
+from utils.metrics import metrics
 
 logger = logging.getLogger()
 
 
+class Lane(IntEnum):
+    """scheduling lanes of the command worker (lower value = higher priority)"""
+
+    LIVE = 0  # moves, challenges and end of game of the running game
+    ADMIN = 1  # edits from the admin web interface
+    BACKGROUND = 2  # file i/o and uploads
+
+
+@dataclass
+class LaneStats:
+    """latency metrics of one lane"""
+
+    count: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    run_total: float = 0.0
+    run_max: float = 0.0
+
+    def add(self, wait: float, run: float) -> None:
+        """add the timings of an executed command"""
+        self.count += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.run_total += run
+        self.run_max = max(self.run_max, run)
+
+    def as_dict(self) -> dict:
+        """metrics as json compatible dict"""
+        return {
+            'count': self.count,
+            'wait_avg': self.wait_total / self.count if self.count else 0.0,
+            'wait_max': self.wait_max,
+            'run_avg': self.run_total / self.count if self.count else 0.0,
+            'run_max': self.run_max,
+        }
+
+
+lane_stats: dict[Lane, LaneStats] = {lane: LaneStats() for lane in Lane}
+_lane_lock = threading.Lock()
+
+
+def lane_metrics() -> dict[str, dict]:
+    """per lane latency metrics (wait in queue, execution time) in seconds"""
+    with _lane_lock:
+        return {lane.name: stats.as_dict() for lane, stats in lane_stats.items()}
+
+
 class Command:  # pylint: disable=too-few-public-methods
     """Command class for sequential execution of asynchronous tasks"""
 
-    def __init__(self, func, *args, **kwargs):
+    def __init__(self, func, *args, lane: Lane = Lane.LIVE, **kwargs):
         self.func = func
         self.args = args
         self.kwargs = kwargs
+        self.lane = lane
+        self.created = time.perf_counter()
 
     def execute(self):
         """run queued command"""
         self.func(*self.args, **self.kwargs)
 
 
+class LaneQueue(queue.Queue):
+    """Queue which delivers the commands of the lane with the highest priority first (FIFO within a lane).
+
+    A running command is never interrupted, live moves overtake waiting admin and background commands.
+    """
+
+    def _init(self, maxsize):
+        self.queue = []  # type: ignore[assignment]
+        self._seq = itertools.count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        lane = item.lane if item is not None else max(Lane)
+        heapq.heappush(self.queue, (lane, next(self._seq), item))  # type: ignore[arg-type]
+
+    def _get(self):
+        return heapq.heappop(self.queue)[2]  # type: ignore[arg-type]
+
+
 class CommandWorker(threading.Thread):
     """Worker Thread for commands"""
 
-    def __init__(self, cmd_queue: queue.Queue):
+    def __init__(self, cmd_queue: queue.Queue, lane: Lane | None = None):
         super().__init__(daemon=True, name='CommandWorker')
         self.command_queue = cmd_queue
+        self.lane = lane  # account all commands to this lane (dedicated worker)
+
+    def _account(self, command: Command, start: float) -> None:
+        end = time.perf_counter()
+        lane = self.lane if self.lane is not None else command.lane
+        with _lane_lock:
+            lane_stats[lane].add(wait=start - command.created, run=end - start)
 
     def run(self):
         """Run worker thread"""
@@ -54,7 +138,11 @@ class CommandWorker(threading.Thread):
                     if command is None:
                         logger.warning('CommandWorker received None, shutting down')  # Log shutdown
                         continue  # never end worker thread
-                    command.execute()
+                    start = time.perf_counter()
+                    try:
+                        command.execute()
+                    finally:
+                        self._account(command, start)
                     logger.debug(f'Command finished: {command.func.__name__} Queue: {self.command_queue.qsize()}')
                 except Exception as e:  # pylint: disable=broad-exception-caught
                     logger.exception(f'unexpected exception in CommandWorker {e}')
@@ -64,8 +152,9 @@ class CommandWorker(threading.Thread):
                 pass
 
 
-command_queue: queue.Queue = queue.Queue()
+command_queue: queue.Queue = LaneQueue()
 worker = CommandWorker(cmd_queue=command_queue)
 worker.start()
+metrics.gauge('command_queue', command_queue.qsize)
 
 pool = ThreadPoolExecutor()
@@ -19,37 +19,77 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 from __future__ import annotations
 
 import configparser
+import io
 import logging
 import queue
+import re
+import socket
+import zipfile
 from pathlib import Path
 
 import requests
 from requests.auth import HTTPBasicAuth
 
 from config import config
-from utils.threadpool import CommandWorker
+from utils.metrics import metrics
+from utils.threadpool import CommandWorker, Lane
+from utils.util import runtime_measure
 
 logger = logging.getLogger()
 
 UPLOAD_TIMEOUT = 20  # 20s for approx 400kb - 1MB (Image 400kb, json 20kb, optional Camera-Image 700kb) upload
+HUB_TIMEOUT = 5  # hub in the local network, failed batches are sent again with the next move
+COMPRESSED = ('.jpg', '.jpeg', '.png', '.zip')  # stored without compression in a batch
+TABLE_CHARS = re.compile(r'[^A-Za-z0-9_-]')  # characters not allowed in a table name (hub.TABLE_NAME)
+MAX_TABLE = 32
+
+
+def pack(files: dict[str, Path]) -> bytes:
+    """zip archive of the existing files (json and logs compressed)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as batch:
+        for name, path in files.items():
+            if path.is_file():
+                compression = zipfile.ZIP_STORED if name.lower().endswith(COMPRESSED) else zipfile.ZIP_DEFLATED
+                batch.write(path, arcname=name, compress_type=compression)
+    return buffer.getvalue()
 
 
 class Upload:
-    """upload files - needs configured php script on server"""
+    """upload files - needs configured php script on server
 
-    def __init__(self):
+    each game session uploads the files of its web_dir, the sessions of further boards need an own table of the
+    tournament hub (the upload server has one target per board).
+    """
+
+    def __init__(self, web_dir: Path | None = None, table: str | None = None):
+        self._web_dir = web_dir  # None: path.web_dir
+        self._table = table  # None: table of the upload settings
         self.upload_queue: queue.Queue | None = None
         self.upload_worker: CommandWorker | None = None
         self.has_exception: bool = False
+        self.batch: dict[str, Path] = {}  # files for the hub, the newest version is read on sending
+        self.session: requests.Session | None = None
+
+    @property
+    def web_dir(self) -> Path:
+        """directory of the uploaded files"""
+        return self._web_dir if self._web_dir is not None else Path(config.path.web_dir)
+
+    @property
+    def table(self) -> str:
+        """table of the board on the hub"""
+        return self._table if self._table is not None else upload_config.table
 
     def get_upload_queue(self) -> queue.Queue:
         """get upload command queue"""
         if self.upload_queue is None:
             self.upload_queue = queue.Queue()
-            self.upload_worker = CommandWorker(cmd_queue=self.upload_queue)
+            self.upload_worker = CommandWorker(cmd_queue=self.upload_queue, lane=Lane.BACKGROUND)
             self.upload_worker.start()
         return self.upload_queue  # type: ignore
 
+    @runtime_measure
     def upload(self, data: dict | None = None, files: dict | None = None) -> bool:
         """do upload/delete operation"""
 
@@ -58,6 +98,9 @@ class Upload:
             data = {'upload': 'true'}
         if upload_config.server is None:
             return False
+        if self._table is not None:
+            logger.warning(f'⚠️ http: the upload server is reserved for the board, table {self._table} needs the hub')
+            return False
         url = upload_config.server
         try:
             url = url if url.startswith(('http://', 'https://')) else f'https://{url}'
@@ -78,12 +121,15 @@ class Upload:
                 return True
         except requests.Timeout:
             self.has_exception = True
+            metrics.inc('upload_errors')
             logger.exception(f'❌ http: timeout while POST to {url}')
         except requests.ConnectionError:
             self.has_exception = True
+            metrics.inc('upload_errors')
             logger.exception(f'❌ http: connection error while POST to {url}')
         except Exception:
             self.has_exception = True
+            metrics.inc('upload_errors')
             logger.exception(f'❌ http: unexpected exception while POST to {url}')
         finally:
             # Ensure we close any file handles that might have been passed in
@@ -95,19 +141,64 @@ class Upload:
                         logger.debug('http: failed to close upload file handle', exc_info=True)
         return False
 
-    def upload_move(self, move: int) -> bool:
-        """upload one move"""
+    def upload_hub(self, path: str, files: dict[str, Path] | None = None) -> bool:
+        """post files as zip archive to the tournament hub (path: upload or delete)"""
+        hub = upload_config.hub
+        if not hub:
+            logger.warning('⚠️ hub: no hub configured')
+            return False
+        url = f'{hub.rstrip("/")}/{path}/{self.table}'
+        if self.session is None:
+            self.session = requests.Session()  # keep the connection to the hub
+        try:
+            with self.session.post(
+                url,
+                data=pack(files) if files else b'',
+                headers={'Content-Type': 'application/zip'},
+                timeout=HUB_TIMEOUT,
+                auth=HTTPBasicAuth(upload_config.user, upload_config.password),
+            ) as ret:
+                if ret.status_code != 200:
+                    logger.warning('⚠️ hub: upload failed %s %s', ret.status_code, ret.text)
+                    return False
+                return True
+        except (requests.RequestException, OSError):
+            metrics.inc('upload_errors')
+            logger.exception(f'❌ hub: POST to {url} failed')
+        return False
+
+    def flush_batch(self) -> bool:
+        """send the collected files of the moves to the hub, kept for the next try on errors"""
+        if not self.batch:
+            return True
+        if not self.upload_hub('upload', self.batch):
+            return False
+        self.batch = {}
+        return True
+
+    def upload_move(self, move: int, flush: bool = True) -> bool:
+        """upload one move (to the hub: collect files and send them with the last move of a sequence)"""
+        if upload_config.hub:
+            self.batch.update(
+                {
+                    f'image-{move}.jpg': self.web_dir / f'image-{move}.jpg',
+                    f'data-{move}.json': self.web_dir / f'data-{move}.json',
+                    'status.json': self.web_dir / 'status.json',
+                    f'image-{move}-camera.jpg': self.web_dir / f'image-{move}-camera.jpg',
+                }
+            )
+            return self.flush_batch() if flush else True
         if self.has_exception:
             logger.warning(f'⚠️ http: skip upload {move=} due previous exception/timeout')
             return False
         logger.debug(f'http: upload {move=}')
 
         files = {
-            f'image-{move}.jpg': Path(config.path.web_dir) / f'image-{move}.jpg',
-            f'data-{move}.json': Path(config.path.web_dir) / f'data-{move}.json',
-            'status.json': Path(config.path.web_dir) / 'status.json',
+            f'image-{move}.jpg': self.web_dir / f'image-{move}.jpg',
+            f'data-{move}.json': self.web_dir / f'data-{move}.json',
+            'status.json': self.web_dir / 'status.json',
             'messages.log': Path(config.path.log_dir) / 'messages.log',
-            f'image-{move}-camera.jpg': Path(config.path.web_dir) / f'image-{move}-camera.jpg',
+            f'image-{move}-camera.jpg': self.web_dir / f'image-{move}-camera.jpg',
         }
         upload_files = {}
         try:
@@ -131,10 +222,12 @@ class Upload:
     def upload_status(self) -> bool:
         """upload status"""
         logger.debug('http: upload status.json, messages.log')
-        files = {
-            'status.json': Path(config.path.web_dir) / 'status.json',
-            'messages.log': Path(config.path.log_dir) / 'messages.log',
-        }
+        if upload_config.hub:
+            self.batch.update(
+                {'status.json': self.web_dir / 'status.json', 'messages.log': Path(config.path.log_dir) / 'messages.log'}
+            )
+            return self.flush_batch()
+        files = {'status.json': self.web_dir / 'status.json', 'messages.log': Path(config.path.log_dir) / 'messages.log'}
         try:
             upload_files = {}
             for key, path in files.items():
@@ -149,6 +242,9 @@ class Upload:
     def delete_files(self) -> bool:
         """delete files of current game on server"""
         logger.debug('http: delete files')
+        if upload_config.hub:
+            self.batch = {}
+            return self.upload_hub('delete')
         return self.upload(data={'delete': 'true'})
 
     def zip_files(self, fname: str) -> bool:
@@ -157,9 +253,16 @@ class Upload:
         if self.has_exception:
             logger.warning(f'⚠️ http: skip create zip files due previous exception/timeout {fname=}')
             return False
+        if upload_config.hub:
+            return self.flush_batch()  # the hub keeps the files of the tables
         return self.upload(data={'zip': 'true', 'fname': fname})
 
 
+def table_name(name: str) -> str:
+    """name as table of the hub: first label of a host name, other characters than A-Z, a-z, 0-9, _ and - replaced"""
+    return TABLE_CHARS.sub('-', name.split('.', maxsplit=1)[0])[:MAX_TABLE] or 'board'
+
+
 class UploadConfig:
     """read upload configuration"""
 
@@ -201,6 +304,26 @@ class UploadConfig:
         """set server url"""
         self.config['server'] = value
 
+    @property
+    def hub(self) -> str | None:
+        """url of the tournament hub (http://<host>:<port>), used instead of the upload server"""
+        return self.config.get('hub', fallback=None) or None
+
+    @hub.setter
+    def hub(self, value: str):
+        """set hub url"""
+        self.config['hub'] = value
+
+    @property
+    def table(self) -> str:
+        """table name of the board at the hub (default: host name)"""
+        return table_name(self.config.get('table', fallback=None) or socket.gethostname())
+
+    @table.setter
+    def table(self, value: str):
+        """set table name"""
+        self.config['table'] = table_name(value)
+
     @property
     def user(self) -> str:
         """get user name"""
@@ -224,3 +347,4 @@ class UploadConfig:
 
 upload_config = UploadConfig()
 upload: Upload = Upload()
+metrics.gauge('upload_queue', lambda: upload.upload_queue.qsize() if upload.upload_queue is not None else 0)
@@ -18,17 +18,22 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 import functools
 import logging
+import threading
 import time
+from contextlib import contextmanager
 from logging.handlers import BaseRotatingHandler
 from typing import Any
 
 import numpy as np
 
+from utils.metrics import metrics
+
 TWarp = np.ndarray[Any, np.dtype[np.float32]]
 logger = logging.getLogger()
+runtime_listeners: list[Callable[[str, float], None]] = []  # called with (function name, elapsed seconds)
 
 # def onexit(f):
 #     # see: https://peps.python.org/pep-0318/#examples
@@ -64,24 +69,46 @@ def handle_exceptions(func: Callable[..., Any]):
     return wrapper
 
 
-def runtime_measure(func: Callable[..., Any]) -> Callable[..., Any]:  # pragma: no cover # currently not used
-    """perform runtime measure"""
+def runtime_measure(func: Callable[..., Any]) -> Callable[..., Any]:
+    """perform runtime measure, the elapsed time is recorded in the metrics histogram of the function"""
 
     @functools.wraps(func)
     def runtime(*args: Any, **kwargs: Any) -> Any:
-        start = time.perf_counter()
+        start = time.perf_counter() if metrics.enabled or runtime_listeners else None
         try:
             return func(*args, **kwargs)
         except Exception:
             logger.exception(f'function {func.__name__} failed')
             raise
         finally:
-            elapsed = time.perf_counter() - start
-            logger.info(f'{func.__name__} took {elapsed:.4f}s')
+            if start is not None:
+                elapsed = time.perf_counter() - start
+                metrics.observe(func.__name__, elapsed)
+                for listener in runtime_listeners:
+                    listener(func.__name__, elapsed)
 
     return runtime
 
 
+@contextmanager
+def runtime_trace(timings: dict[str, float] | None) -> Iterator[None]:
+    """add the runtime_measure timings of the current thread to timings (None = no trace)"""
+    if timings is None:
+        yield
+        return
+    thread = threading.get_ident()
+
+    def listener(name: str, elapsed: float) -> None:
+        if threading.get_ident() == thread:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+    runtime_listeners.append(listener)
+    try:
+        yield
+    finally:
+        runtime_listeners.remove(listener)
+
+
 def trace(func: Callable[..., Any]) -> Callable[..., Any]:
     """perform method trace"""
 
@@ -0,0 +1,114 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from config import config
+from game_board.board import GRID_H, GRID_W, OFFSET
+from move import BoardType, CoordType
+from utils.metrics import metrics
+
+CELL_PIXELS = 8  # size of a cell in the board signature
+CELL_DELTA = 20  # mean gray value difference of a changed cell
+
+logger = logging.getLogger()
+
+
+def board_signature(warped: MatLike) -> np.ndarray:
+    """small gray image of the 15x15 cells of a warped board"""
+    gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY) if len(warped.shape) == 3 else warped
+    board = gray[OFFSET : OFFSET + 15 * GRID_H, OFFSET : OFFSET + 15 * GRID_W]
+    return cv2.resize(board, (15 * CELL_PIXELS, 15 * CELL_PIXELS), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def cell_signature(signature: np.ndarray, coord: CoordType) -> np.ndarray:
+    """part of the board signature of cell coord (col, row)"""
+    col, row = coord
+    return signature[row * CELL_PIXELS : (row + 1) * CELL_PIXELS, col * CELL_PIXELS : (col + 1) * CELL_PIXELS]
+
+
+@dataclass
+class CellState:
+    """recognition history of a board cell"""
+
+    letter: str
+    prob: int
+    signature: np.ndarray
+    checks: int = 0  # analyses which confirmed the letter
+
+
+class Verification:
+    """Adaptive re-verification of the tiles on the board.
+
+    A tile is frozen (not analyzed again) after a confirmation with a probability of at least board.min_tiles_rate
+    or after scrabble.verify_moves - 1 confirmations with a lower probability. A frozen tile is analyzed again if
+    the pixels of its cell change.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cells: dict[CoordType, CellState] = {}
+        self.analyzed = 0  # re-analyzed tiles of the last move
+        self.frozen = 0  # frozen tiles of the last move
+
+    def reset(self) -> None:
+        """forget the history of all cells"""
+        with self.lock:
+            self.cells = {}
+            self.analyzed = self.frozen = 0
+
+    def _is_frozen(self, coord: CoordType, board: BoardType, signature: np.ndarray) -> bool:
+        state = self.cells.get(coord)
+        if state is None or coord not in board or board[coord].letter != state.letter:
+            return False
+        confirmed = state.checks >= max(config.scrabble.verify_moves - 1, 1) or (
+            state.checks >= 1 and state.prob >= config.board.min_tiles_rate
+        )
+        return confirmed and float(np.abs(cell_signature(signature, coord) - state.signature).mean()) <= CELL_DELTA
+
+    def coords_to_ignore(self, board: BoardType, warped: MatLike) -> set[CoordType]:
+        """tiles of the board which are not analyzed again"""
+        if not self.cells:
+            return set()
+        signature = board_signature(warped)
+        with self.lock:
+            return {coord for coord in board if self._is_frozen(coord, board, signature)}
+
+    def update(self, previous_board: BoardType, board: BoardType, warped: MatLike) -> None:
+        """record the recognized board of a move, previous_board is the board before the move"""
+        signature = board_signature(warped)
+        with self.lock:
+            frozen = {coord for coord in previous_board if self._is_frozen(coord, previous_board, signature)}
+            cells = {coord: state for coord, state in self.cells.items() if coord in frozen}
+            for coord in board.keys() - frozen:
+                tile, state = board[coord], self.cells.get(coord)
+                checks = state.checks + 1 if state is not None and state.letter == tile.letter else 0
+                cells[coord] = CellState(tile.letter, tile.prob, cell_signature(signature, coord).copy(), checks)
+            self.cells = cells
+            self.analyzed, self.frozen = len(previous_board.keys() - frozen), len(frozen)
+        metrics.inc('tiles_reanalyzed', self.analyzed)
+        metrics.inc('tiles_frozen', self.frozen)
+        logger.info(f're-analyzed {self.analyzed} tiles, {self.frozen} frozen tiles')
@@ -0,0 +1,168 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+Microbenchmark of the bitboard operations against the former set based implementations. The inputs are recorded
+while running the test_algorithm* scenarios (filter_candidates, blank validation and direction of each regular move).
+
+    cd python
+    PYTHONPATH=src:. python test/bench_bitboard.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+import unittest
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import analyzer
+import processing
+from bitboard import from_coords, in_one_col, in_one_row
+from move import BoardType, CoordType, MoveRegular
+from scrabble import Game
+
+TEST_DIR = Path(__file__).resolve().parent
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+logger = logging.getLogger()
+
+
+def legacy_filter_candidates(coord: CoordType, candidates: set[CoordType], ignore_set: set[CoordType]) -> set[CoordType]:
+    """flood fill over tuple sets (before the bitboards)"""
+    candidates = candidates.copy()
+    result = set()
+    stack = [coord]
+    while stack:
+        coordinates = stack.pop()
+        if coordinates in candidates:
+            candidates.remove(coordinates)
+            if coordinates not in ignore_set:
+                result.add(coordinates)
+            stack.extend([(coordinates[0] + dx, coordinates[1] + dy) for dx, dy in DIRECTIONS])
+    return result
+
+
+def legacy_clean_new_tiles(new_tiles: BoardType, previous_board: BoardType) -> BoardType:
+    """blank validation over tuple sets (before the bitboards)"""
+    real = {coord for coord, tile in new_tiles.items() if tile.letter != '_'}
+    blanks = {coord for coord, tile in new_tiles.items() if tile.letter == '_'}
+    if not blanks:
+        return new_tiles
+    if not real:
+        first = next(iter(blanks))
+        return {first: new_tiles[first]}
+    cols, rows = {c for c, _ in real}, {r for _, r in real}
+    if len(rows) != 1 and len(cols) != 1:
+        return new_tiles
+    full = previous_board.keys() | new_tiles.keys()
+    valid = set()
+    if len(rows) == 1:
+        row = next(iter(rows))
+        for b_col, b_row in (b for b in blanks if b[1] == row):
+            if all((c, row) in full for c in range(min(b_col, min(cols)), max(b_col, max(cols)) + 1)):
+                valid.add((b_col, b_row))
+    if len(cols) == 1 and (len(rows) > 1 or len(real) == 1):
+        col = next(iter(cols))
+        for b_col, b_row in (b for b in blanks if b[0] == col):
+            if all((col, r) in full for r in range(min(b_row, min(rows)), max(b_row, max(rows)) + 1)):
+                valid.add((b_col, b_row))
+    return {coord: new_tiles[coord] for coord in real | valid}
+
+
+def legacy_direction(new_tiles: BoardType) -> tuple[bool, bool]:
+    """horizontal and vertical changes with Counter (before the bitboards)"""
+    changed = sorted(new_tiles)
+    return len(Counter(col for col, _ in changed)) > 1, len(Counter(row for _, row in changed)) > 1
+
+
+def bitboard_direction(new_tiles: BoardType) -> tuple[bool, bool]:
+    """horizontal and vertical changes as in MoveRegular.calculate_coord"""
+    bits = from_coords(sorted(new_tiles))
+    return not in_one_col(bits), not in_one_row(bits)
+
+
+def record_scenarios() -> tuple[list[tuple], list[tuple]]:
+    """run the test_algorithm* tests and record the inputs of filter_candidates and of each regular move"""
+    candidates: list[tuple] = []
+    moves: list[tuple] = []
+    filter_candidates, calculate_coord = analyzer.filter_candidates, MoveRegular.calculate_coord
+
+    def record_filter(coord, tiles_candidates, ignore_set):
+        candidates.append((coord, set(tiles_candidates), set(ignore_set)))
+        return filter_candidates(coord, tiles_candidates, ignore_set)
+
+    def record_move(self):
+        moves.append((dict(self.new_tiles), dict(self.previous_move.board) if self.previous_move else {}))
+        return calculate_coord(self)
+
+    processing.filter_candidates = record_filter
+    MoveRegular.calculate_coord = record_move
+    try:
+        suite = unittest.defaultTestLoader.discover(
+            str(TEST_DIR), pattern='test_algorithm*.py', top_level_dir=str(TEST_DIR.parent)
+        )
+        unittest.TextTestRunner(stream=sys.stderr, verbosity=0).run(suite)
+    finally:
+        processing.filter_candidates, MoveRegular.calculate_coord = filter_candidates, calculate_coord
+    return candidates, moves
+
+
+def measure(func: Callable, inputs: list[tuple], repeat: int) -> float:
+    """microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for args in inputs:
+            func(*args)
+    return 1e6 * (time.perf_counter() - start) / max(repeat * len(inputs), 1)
+
+
+def main() -> int:
+    """record the scenarios, check equal results and print the timings"""
+    parser = argparse.ArgumentParser(description='bitboard microbenchmark over the test_algorithm* scenarios')
+    parser.add_argument('-r', '--repeat', type=int, default=200, help='repetitions per input')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    candidates, moves = record_scenarios()
+    game = Game()
+    # candidates of a move: tiles on the board and the new tiles, the tiles of the previous board are ignored
+    candidates += [((7, 7), previous.keys() | new_tiles.keys(), set(previous)) for new_tiles, previous in moves]
+    blanks = [(new_tiles, previous) for new_tiles, previous in moves]
+    directions = [(new_tiles,) for new_tiles, _ in moves]
+    benchmarks = [
+        ('filter_candidates', candidates, legacy_filter_candidates, analyzer.filter_candidates.__wrapped__),
+        ('clean_new_tiles', blanks, legacy_clean_new_tiles, game.clean_new_tiles),
+        ('direction', directions, legacy_direction, bitboard_direction),
+    ]
+    failed = False
+    print(f'{"operation":20} {"inputs":>6} {"sets us":>9} {"bits us":>9} {"speedup":>8}')
+    for name, inputs, legacy, current in benchmarks:
+        if any(legacy(*i) != current(*i) for i in inputs):
+            print(f'{name}: different results')
+            failed = True
+        sets, bits = measure(legacy, inputs, args.repeat), measure(current, inputs, args.repeat)
+        print(f'{name:20} {len(inputs):6d} {sets:9.2f} {bits:9.2f} {sets / bits if bits else 0:7.1f}x')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
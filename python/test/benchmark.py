@@ -0,0 +1,145 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Recognition benchmark over all test games (test/game*) and board images (test/board*).
+
+    cd python
+    PYTHONPATH=src python test/benchmark.py -o work/benchmark.json
+    PYTHONPATH=src python test/benchmark.py -b work/benchmark.json -t 0.25   # fails if a stage p50/p95 is 25% slower
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from analyzer import analyze, filter_candidates
+from config import config, version
+from customboard import clear_last_warp, filter_image, warp_image
+from replay import replay_folders
+from utils.util import runtime_listeners
+
+TEST_DIR = Path(__file__).resolve().parent
+STAGES = ('warp_image', 'filter_image', 'filter_candidates', 'analyze', 'add_move')
+BOARD_LAYOUTS = {'board2012': 'custom2012', 'board2020': 'custom2020'}
+THRESHOLD = 0.25  # allowed slowdown of p50/p95 against the baseline
+
+logger = logging.getLogger()
+
+
+def percentiles(values: list[float]) -> dict:
+    """count, p50, p95 and max in milliseconds"""
+    if not values:
+        return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    p50, p95 = np.percentile(values, [50, 95])
+    return {'count': len(values), 'p50': 1000 * p50, 'p95': 1000 * p95, 'max': 1000 * max(values)}
+
+
+def bench_boards(timings: dict[str, list[float]]) -> None:
+    """warp, filter and analyze every board image"""
+
+    def measure(name: str, elapsed: float) -> None:
+        timings.setdefault(name, []).append(elapsed)
+
+    runtime_listeners.append(measure)
+    try:
+        for folder, layout in BOARD_LAYOUTS.items():
+            for file in sorted((TEST_DIR / folder).glob('*.*g')):
+                config.reload(ini_file=str(TEST_DIR / 'test_config_empty.ini'), clean=True)
+                config.config.set('board', 'layout', layout)
+                config.is_testing = True
+                clear_last_warp()
+                img = cv2.imread(str(file))
+                if img is None:
+                    continue
+                start = time.perf_counter()
+                warped, warped_gray = warp_image(img)
+                _, tiles_candidates = filter_image(warped)
+                analyze(warped_gray, {}, filter_candidates((7, 7), tiles_candidates, set()))
+                timings.setdefault('board', []).append(time.perf_counter() - start)
+    finally:
+        runtime_listeners.remove(measure)
+
+
+def bench_games(timings: dict[str, list[float]]) -> list[str]:
+    """replay every recorded game, returns the games with recognition differences"""
+    folders = [str(p.parent) for p in sorted(TEST_DIR.glob('game*/game.csv'))]
+    results = replay_folders(folders)
+    for result in results:
+        for name, values in result.stages.items():
+            timings.setdefault(name, []).extend(values)
+        timings.setdefault('move', []).extend(m.elapsed for m in result.moves if m.button.upper() in ('RED', 'GREEN'))
+    return [r.folder for r in results if not r.ok]
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """stages with p50 or p95 slower than baseline * (1 + threshold)"""
+    return [
+        f'{name} {key} {stats[key]:.1f}ms > {baseline[name][key]:.1f}ms (+{threshold:.0%})'
+        for name, stats in current.items()
+        if name in baseline
+        for key in ('p50', 'p95')
+        if 0 < baseline[name][key] * (1 + threshold) < stats[key]
+    ]
+
+
+def main() -> int:
+    """run benchmark, print and store the results, compare with a baseline"""
+    parser = argparse.ArgumentParser(description='recognition benchmark over test games and board images')
+    parser.add_argument('-o', '--output', help='write results as json')
+    parser.add_argument('-b', '--baseline', help='json results of a previous run with the same options')
+    parser.add_argument('-t', '--threshold', type=float, default=THRESHOLD, help='allowed slowdown (0.25 = 25%%)')
+    parser.add_argument('--games', action=argparse.BooleanOptionalAction, default=True, help='replay test games')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    timings: dict[str, list[float]] = {}
+    start = time.perf_counter()
+    bench_boards(timings)
+    failed = bench_games(timings) if args.games else []
+    stages = {name: percentiles(timings.get(name, [])) for name in (*STAGES, 'move', 'board')}
+
+    print(f'{"stage":20} {"count":>6} {"p50 ms":>9} {"p95 ms":>9} {"max ms":>9}')
+    for name, stats in stages.items():
+        print(f'{name:20} {stats["count"]:6d} {stats["p50"]:9.2f} {stats["p95"]:9.2f} {stats["max"]:9.2f}')
+    print(f'benchmark took {time.perf_counter() - start:.1f}s')
+    if failed:
+        print(f'recognition differences in {failed}')
+
+    if args.output:
+        result = {'date': datetime.now().isoformat(timespec='seconds'), 'version': version.git_version, 'stages': stages}
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding='UTF-8')
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='UTF-8'))
+        regressions = compare(stages, baseline['stages'], args.threshold)
+        for regression in regressions:
+            print(f'regression: {regression}')
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -25,10 +25,11 @@ from time import sleep
 import cv2
 from numpy import ndarray
 
+from analyzer import analyze, filter_candidates
+from customboard import filter_image, warp_image
 from game_board.board import get_x_position, get_y_position, overlay_grid
 from hardware import camera
 from move import BoardType
-from processing import analyze, filter_candidates, filter_image, warp_image
 from scrabble import board_to_string
 from utils.threadpool import pool
 from config import config
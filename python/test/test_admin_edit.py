@@ -30,6 +30,7 @@ from display import Display
 from hardware import camera
 from move import MoveType
 from processing import admin_change_move, admin_insert_moves
+from repair import repair_progress
 from scrabble import MoveRegular
 from scrabblewatch import ScrabbleWatch
 from state import GameState, State
@@ -114,6 +115,8 @@ class AdminEditTestCase(unittest.TestCase):
         msg = '\n' + ''.join(f'{mov.move:2d} {mov.gcg_str}\n' for mov in State.ctx.game.moves)
         logger.info(f'after edit J2 MÖS.\n{msg}')
         logger.info(f'final board\n{State.ctx.game.board_str()}')
+        # only the images of the affected moves 3 and 5 are re-analyzed
+        self.assertEqual((2, 2, False), (repair_progress.total, repair_progress.done, repair_progress.running))
         self.assertEqual(43, State.ctx.game.moves[-1].score[0], f'invalid score 1 {State.ctx.game.moves[-1].score[0]}')
         self.assertEqual(92, State.ctx.game.moves[-1].score[1], f'invalid score 1 {State.ctx.game.moves[-1].score[0]}')
 
@@ -18,10 +18,11 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import logging
 import unittest
+from collections import Counter
 
 import numpy as np
 
-from move import BoardType, NoMoveError, Tile
+from move import BoardType, MoveType, NoMoveError, Tile, bag, bag_as_list, bag_letter
 from processing import end_of_game, filter_candidates
 from scrabble import Game
 from state import State
@@ -127,6 +128,48 @@ class AlgorithmTestCase(BaseTestClass):
         score = game.moves[-1].score
         self.assertEqual((4, -40), score, 'score for overtime expected')
 
+    def test_tiles_in_bag(self):
+        """Test incremental bag state on add/change/remove moves and blanks"""
+
+        def expected_bag(board: BoardType) -> list[str]:
+            on_board = Counter(bag_letter(tile) for tile in board.values())
+            return [k for k, count in bag.items() for _ in range(max(0, count - on_board[k]))]
+
+        def assert_bags(game: Game):
+            for i, m in enumerate(game.moves):
+                self.assertEqual(expected_bag(m.board), game.tiles_in_bag(index=i), f'invalid bag at move {i}')
+
+        game = State.ctx.game.new_game()
+        self.assertEqual(bag_as_list, game.tiles_in_bag())
+        board: BoardType = {}
+        firns = {
+            (3, 7): Tile('F', 75),
+            (4, 7): Tile('I', 85),
+            (5, 7): Tile('R', 75),
+            (6, 7): Tile('N', 75),
+            (7, 7): Tile('S', 75),
+        }
+        board = self.add_move(game, board, firns, (0, (1, 0)))
+        vaten = {(4, 6): Tile('V', 75), (4, 8): Tile('T', 75), (4, 9): Tile('E', 75), (4, 10): Tile('_', 75)}
+        board = self.add_move(game, dict(board), vaten, (1, (1, 1)))
+        game.add_exchange(player=0, played_time=(2, 1), img=np.zeros((1, 1)))
+        assert_bags(game)
+
+        game.add_withdraw_for(index=1, img=np.zeros((1, 1)))
+        assert_bags(game)
+
+        game.replace_blank_with((4, 10), 'n')
+        assert_bags(game)
+
+        game.remove_move_at(2)
+        assert_bags(game)
+
+        game.change_move_at(0, MoveType.REGULAR, {(3, 7): Tile('F', 99), (4, 7): Tile('I', 99), (5, 7): Tile('R', 99)})
+        for m in game.moves[1:]:
+            m.setup_board()
+            m.calculate_score()
+        assert_bags(game)
+
 
 if __name__ == '__main__':
     unittest.main(module='test_algorithm')
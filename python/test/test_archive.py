@@ -0,0 +1,89 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from zipfile import ZipFile
+
+from config import config
+from utils.archive import GameArchive
+
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ArchiveTestCase(unittest.TestCase):
+    """Test class for the streaming game archive"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.web_dir = Path(self.tmp.name)
+        self.old_web_dir = config.config.get('path', 'web_dir')
+        config.config.set('path', 'web_dir', str(self.web_dir))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.config.set('path', 'web_dir', self.old_web_dir)
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_finalize(self):
+        """rewritten files are listed once with the latest content, the archive is not copied"""
+        archive = GameArchive()
+        archive.open('game1')
+        data = self.web_dir / 'data-0.json'
+        data.write_text('old version', encoding='utf-8')
+        archive.add(data)
+        (self.web_dir / 'image-0.jpg').write_bytes(b'jpg')
+        archive.add(self.web_dir / 'image-0.jpg')
+        data.write_text('new', encoding='utf-8')
+        archive.add(data)
+        archive.add(self.web_dir / 'missing.json')
+        log = self.web_dir / 'game.log'
+        log.write_text('log', encoding='utf-8')
+
+        part_size = (self.web_dir / 'game1.zip.part').stat().st_size
+        target = archive.finalize('game1-A-B', [log, self.web_dir / 'messages.log'])
+        self.assertEqual(self.web_dir / 'game1-A-B.zip', target)
+        self.assertFalse((self.web_dir / 'game1.zip.part').exists())
+        self.assertFalse(archive.is_open('game1'))
+        with ZipFile(target) as _zip:  # type: ignore[arg-type]
+            self.assertEqual(['image-0.jpg', 'data-0.json', 'game.log'], _zip.namelist())
+            self.assertEqual(b'new', _zip.read('data-0.json'))
+            self.assertIsNone(_zip.testzip())
+        content = target.read_bytes()  # type: ignore[union-attr]
+        self.assertIn(b'old version', content[:part_size])  # superseded version stays unreferenced
+        self.assertEqual(3, content.count(b'data-0.json'))  # local headers of both versions, one directory entry
+
+    def test_discard(self):
+        """a new game discards the archive of an unfinished game"""
+        archive = GameArchive()
+        archive.open('game1')
+        archive.open('game2')
+        self.assertFalse((self.web_dir / 'game1.zip.part').exists())
+        self.assertTrue(archive.is_open('game2'))
+        self.assertIsNone(GameArchive().finalize('game3', []))
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_archive')
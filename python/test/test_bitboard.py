@@ -0,0 +1,72 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from bitboard import (
+    FULL,
+    SIZE,
+    bit,
+    bounds,
+    col_span,
+    connected,
+    from_coords,
+    in_one_col,
+    in_one_row,
+    neighbours,
+    row_span,
+    to_coords,
+)
+
+
+class BitboardTestCase(unittest.TestCase):
+    """Test class for the 225 bit board"""
+
+    def test_coords(self):
+        """fields outside the board are dropped, coords are returned in row order"""
+        coords = {(0, 0), (14, 0), (7, 7), (0, 14), (14, 14)}
+        self.assertEqual(0, bit((15, 0)) | bit((0, -1)))
+        self.assertEqual(coords, set(to_coords(from_coords([*coords, (15, 3)]))))
+        self.assertEqual([(0, 0), (14, 0), (7, 7), (0, 14), (14, 14)], list(to_coords(from_coords(coords))))
+        self.assertEqual(SIZE * SIZE, len(list(to_coords(FULL))))
+
+    def test_neighbours(self):
+        """no wrap around at the borders"""
+        self.assertEqual({(1, 0), (0, 1)}, set(to_coords(neighbours(bit((0, 0))))))
+        self.assertEqual({(13, 7), (14, 6), (14, 8)}, set(to_coords(neighbours(bit((14, 7))))))
+        self.assertEqual({(13, 14), (14, 13)}, set(to_coords(neighbours(bit((14, 14))))))
+
+    def test_connected(self):
+        """flood fill from the seed over the mask"""
+        mask = from_coords([(7, 7), (8, 7), (8, 8), (8, 9), (10, 9), (14, 6), (0, 8)])
+        self.assertEqual({(7, 7), (8, 7), (8, 8), (8, 9)}, set(to_coords(connected(bit((7, 7)), mask))))
+        self.assertEqual(0, connected(bit((6, 7)), mask))
+
+    def test_lines(self):
+        """spans, bounds and direction of lines"""
+        self.assertEqual(from_coords([(3, 7), (4, 7), (5, 7)]), row_span(7, 3, 5))
+        self.assertEqual(from_coords([(2, 12), (2, 13), (2, 14)]), col_span(2, 12, 14))
+        self.assertEqual((3, 9, 1, 12), bounds(from_coords([(9, 1), (3, 12), (5, 5)])))
+        self.assertTrue(in_one_row(row_span(14, 0, 14)))
+        self.assertFalse(in_one_row(from_coords([(14, 3), (0, 4)])))
+        self.assertTrue(in_one_col(col_span(14, 0, 14)))
+        self.assertFalse(in_one_col(from_coords([(3, 3), (4, 3)])))
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_bitboard')
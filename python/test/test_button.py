@@ -29,7 +29,7 @@ from gpiozero.pins.mock import MockFactory
 from config import config
 from display import Display
 from hardware import camera
-from hardware.button import ButtonEnum
+from hardware.button import Button, ButtonEnum
 from hardware.led import LED, LEDEnum
 from scrabblewatch import ScrabbleWatch
 from state import GameState, State
@@ -93,6 +93,7 @@ class ButtonTestCase(unittest.TestCase):
         pin.drive_high()
         time.sleep(wait)
         pin.drive_low()
+        State.button_queue.join()  # type: ignore[union-attr] # press is processed by the button worker
         logger.info(
             f'leds: green {LEDEnum.green.value} yellow {LEDEnum.yellow.value} '
             f'red {LEDEnum.red.value} state nw {State.ctx.current_state}'
@@ -184,6 +185,17 @@ class ButtonTestCase(unittest.TestCase):
         assert (LEDEnum.green.value, LEDEnum.yellow.value, LEDEnum.red.value) == (0, 1, 0)
         time.sleep(display_pause)
 
+    def test_dispatch(self):
+        """the gpio callback returns before the frames after the press are selected"""
+        self._press_button(self.pin_red)  # start
+        self.assertEqual(GameState.S0, State.ctx.current_state)
+        camera.cam.read.side_effect = lambda *args, **kwargs: time.sleep(0.3) or np.zeros((1, 1))  # type: ignore[attr-defined]
+        start = time.perf_counter()
+        Button.func_pressed('GREEN', time.time())  # type: ignore[misc]
+        self.assertLess(time.perf_counter() - start, 0.1)
+        State.button_queue.join()  # type: ignore[union-attr]
+        self.assertEqual(GameState.S1, State.ctx.current_state)
+
     def test_button_enum(self):
         assert str(ButtonEnum.GREEN) == 'GREEN'
         assert str(ButtonEnum.YELLOW) == 'YELLOW'
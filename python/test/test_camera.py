@@ -0,0 +1,193 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import os
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config import config
+from customboard import clear_last_warp, get_last_warp, warp_image
+from hardware.camera import CameraFile, index_images, read_ring
+from hardware.capture import CaptureScheduler
+from hardware.crop import board_crop
+from hardware.framebuffer import FRAME_SLOTS, FrameRing, ring_slots
+from scrabble import Game
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def image(value: int, shape: tuple[int, ...] = (4, 4, 3)) -> np.ndarray:
+    """test image filled with value"""
+    return np.full(shape, value, dtype=np.uint8)
+
+
+class CameraTestCase(unittest.TestCase):
+    """Test class for camera frame handling"""
+
+    def test_ring_views(self):
+        """ring hands out read-only views with sequence numbers"""
+        ring = FrameRing(shape=(4, 4, 3), slots=3)
+        self.assertIsNone(ring.latest())
+        for i in range(5):
+            self.assertEqual(i, ring.write(image(i), timestamp=100.0 + i))
+        latest = ring.latest()
+        assert latest is not None
+        self.assertEqual((4, 104.0, 4), (latest.seq, latest.timestamp, latest.image[0, 0, 0]))
+        self.assertFalse(latest.image.flags.writeable)
+        self.assertEqual([2, 3, 4], [f.seq for f in ring.frames()])
+        nearest = ring.nearest(102.9)
+        assert nearest is not None
+        self.assertEqual(3, nearest.seq)
+
+    def test_ring_reuse(self):
+        """views of reused slots are detected, copies fall back to the latest frame"""
+        ring = FrameRing(shape=(4, 4, 3), slots=2)
+        ring.write(image(1))
+        frame = ring.latest()
+        assert frame is not None
+        ring.write(image(2))
+        self.assertTrue(ring.is_valid(frame))
+        ring.write(image(3))  # reuses slot of frame
+        self.assertFalse(ring.is_valid(frame))
+        self.assertEqual(3, ring.copy(frame)[0, 0, 0])
+
+    def test_read_ring(self):
+        """peek returns a view, read a private copy; other resolutions reallocate the ring"""
+        ring = FrameRing(shape=(4, 4, 3))
+        self.assertEqual((2, 3, 3), read_ring(ring, (3, 2), peek=True, timestamp=None).shape)
+        ring.write(image(7, shape=(6, 6, 3)))
+        peek = read_ring(ring, (4, 4), peek=True, timestamp=None)
+        copy = read_ring(ring, (4, 4), peek=False, timestamp=None)
+        self.assertEqual((6, 6, 3), peek.shape)
+        self.assertFalse(peek.flags.writeable)
+        self.assertTrue(copy.flags.writeable)
+        self.assertFalse(np.shares_memory(peek, copy))
+
+    def test_best_frame(self):
+        """frame without motion and blur is selected around the press time"""
+        board = np.kron((np.indices((8, 8)).sum(axis=0) % 2) * 255, np.ones((32, 32))).astype(np.uint8)
+        shifted = np.roll(board, 16, axis=1)
+        ring = FrameRing(shape=board.shape, slots=4)
+        for i, img in enumerate((board, shifted, shifted, cv2.GaussianBlur(shifted, (15, 15), 5))):
+            ring.write(img, timestamp=1.0 + i / 10)
+        best = ring.best(timestamp=1.15, window=0.2)
+        assert best is not None
+        self.assertEqual(2, best.seq)
+        self.assertEqual(0, ring.best(timestamp=0.5, window=0.2).seq)  # type: ignore[union-attr]
+        self.assertTrue(ring.wait_for(1.3, timeout=0.01))
+        self.assertFalse(ring.wait_for(1.4, timeout=0.01))
+
+    def test_ring_slots(self):
+        """the ring keeps the frames before the press while the frames after the press are captured"""
+        self.assertEqual(12, ring_slots(25, 0.2))
+        self.assertEqual(FRAME_SLOTS, ring_slots(2, 0.2))
+        ring = FrameRing(shape=(4, 4, 3), slots=ring_slots(25, 0.2))
+        for i in range(-5, 6):  # 25 fps around the press at 10.0
+            ring.write(image(i + 5), timestamp=10.0 + i / 25)
+        self.assertAlmostEqual(9.8, ring.frames()[0].timestamp)
+
+    def test_capture_rate(self):
+        """idle rate until boosted, suspended without idle rate"""
+        scheduler = CaptureScheduler()
+        self.assertAlmostEqual(1 / config.video.idle_fps, scheduler.interval())  # type: ignore[arg-type]
+        scheduler.boost(seconds=10)
+        self.assertTrue(scheduler.is_boosted())
+        self.assertAlmostEqual(1 / config.video.fps, scheduler.interval())  # type: ignore[arg-type]
+        scheduler.wait()  # boost wakes up the waiting loop
+        scheduler = CaptureScheduler()
+        config.config.set('video', 'idle_fps', '0')
+        try:
+            self.assertIsNone(scheduler.interval())
+            self.assertEqual(0.0, scheduler.max_age())
+        finally:
+            config.config.remove_option('video', 'idle_fps')
+        scheduler.add_captured()
+        scheduler.add_consumed()
+        self.assertDictEqual({'captured': 1, 'consumed': 1, 'boosted': False}, scheduler.stats())
+
+    def test_crop_board(self):
+        """cropped frames of a recorded game warp to the same board"""
+        if not Path(f'{TEST_DIR}/game01/image-1.jpg').is_file():
+            self.skipTest('Image File not available')
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        clear_last_warp()
+        cam = CameraFile()
+        cam.formatter = f'{TEST_DIR}/game01/image-{{:d}}.jpg'
+        cam.resize = False
+        try:
+            full = cam.read(peek=True)
+            expected, _ = warp_image(full)
+            config.config.set('video', 'crop', 'True')
+            cropped = cam.read(peek=True)
+            self.assertLess(cropped.size, full.size)
+            self.assertEqual((0, 17), board_crop.origin(cropped))  # warp coordinates - crop_margin
+            self.assertEqual(0.0, float(np.mean(cv2.absdiff(expected, warp_image(cropped)[0]))))
+            x, y = config.video.warp_coordinates[0]  # type: ignore[index]
+            game_ini = Game().dev_str(crop_region=board_crop.region)  # stored images are cropped
+            self.assertIn(f'crop = {list(board_crop.region)}', game_ini)  # type: ignore[arg-type]
+            self.assertIn(f'warp-coord = [[{x}, {y - 17}]', game_ini)
+            self.assertNotIn('crop = ', Game().dev_str())
+
+            config.config.remove_option('video', 'warp_coordinates')  # detected warp is kept in frame coordinates
+            clear_last_warp()
+            warp_image(cam.read(peek=True))
+            detected = get_last_warp().copy()  # type: ignore[union-attr]
+            warp_image(cam.read(peek=True))
+            self.assertLessEqual(float(np.max(np.abs(detected - get_last_warp()))), 2.0)  # type: ignore[operator]
+        finally:
+            config.config.set('video', 'crop', 'False')
+            clear_last_warp()
+
+    def test_file_prefetch(self):
+        """image sequence is indexed once, following images are decoded ahead"""
+        if not Path(f'{TEST_DIR}/game01/image-3.jpg').is_file():
+            self.skipTest('Image File not available')
+        formatter = f'{TEST_DIR}/game01/image-{{:d}}.jpg'
+        files = index_images(formatter)
+        self.assertEqual(Path(formatter.format(1)), files[1])
+        self.assertEqual(set(range(1, len(files) + 1)), set(files))
+        self.assertDictEqual({}, index_images(f'{TEST_DIR}/missing/image-{{:d}}.jpg'))
+
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        cam = CameraFile()
+        cam.formatter = formatter
+        cam.resize = False
+        first = cam.read()
+        self.assertEqual(2, cam.counter)
+        cached = [key[0] for key in cam._cache]  # noqa: SLF001
+        self.assertListEqual([files[2], files[3], files[4]], cached)  # next image + development.prefetch
+        np.testing.assert_array_equal(cv2.imread(str(files[2])), cam.read(peek=True))
+        cam.counter = len(files)
+        cam.read()
+        self.assertEqual(len(files), cam.counter, 'counter stays at the last image')
+        first[:] = 0  # returned images are private copies
+        cam.counter = 1
+        self.assertGreater(int(cam.read(peek=True).max()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_camera')
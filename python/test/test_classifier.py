@@ -0,0 +1,113 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from analyzer import BLANK_PROP, analyze, get_recognizer, recognizers
+from classifier import KnnModel, KnnRecognizer, train
+from config import config
+from game_board.board import GRID_H, GRID_W, get_x_position, get_y_position
+from move import Tile
+from replay import collect
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ClassifierTestCase(unittest.TestCase):
+    """Test class for the k-NN tile classifier"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        if not Path(f'{TEST_DIR}/game01/image-1.jpg').is_file():
+            self.skipTest('Image File not available')
+        self.knn = recognizers['knn']
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        recognizers['knn'] = self.knn
+        config.reload(ini_file=None, clean=True)
+        return super().tearDown()
+
+    def test_knn_recognizer(self):
+        """trained model recognizes the tiles of the training game, analyze uses the configured recognizer"""
+        model = train([f'{TEST_DIR}/game01'], samples_per_class=10)
+        with tempfile.TemporaryDirectory() as tmp:
+            model.save(Path(tmp) / 'model.npz')
+            model = KnnModel.load(Path(tmp) / 'model.npz')
+        gray, letters = collect([f'{TEST_DIR}/game01'])[-1]
+        knn = KnnRecognizer()
+        knn.model, knn.language = model, config.board.language
+        recognizers[knn.name] = knn
+        config.config.set('board', 'recognizer', 'knn')
+        self.assertIs(knn, get_recognizer())
+        board = analyze(gray, {}, set(letters))
+        correct = sum(board[coord].letter == letter for coord, letter in letters.items())
+        self.assertGreater(correct / len(letters), 0.9)
+
+    def test_no_tile(self):
+        """empty fields and fields without a tile (noise, shadow) are not returned as confident letters"""
+        knn = KnnRecognizer()
+        knn.model, knn.language = train([f'{TEST_DIR}/game01'], samples_per_class=10), config.board.language
+        gray, letters = collect([f'{TEST_DIR}/game01'])[-1]
+        gray = gray.copy()
+        rng = np.random.default_rng(1)
+        for col, row in ((1, 0), (2, 0)):
+            x, y = get_x_position(col), get_y_position(row)
+            gray[y : y + GRID_H, x : x + GRID_W] = np.kron(rng.integers(60, 200, (5, 5)), np.ones((10, 10))).astype(np.uint8)
+        x, y = get_x_position(3), get_y_position(0)
+        gray[y : y + GRID_H, x : x + GRID_W] //= 3
+        fields = {(0, 0), (1, 0), (2, 0), (3, 0)}
+        self.assertFalse(fields & letters.keys())
+        board = knn.recognize(gray, {}, fields)
+        self.assertDictEqual({coord: Tile('_', BLANK_PROP) for coord in fields}, board)
+
+    def test_lazy_import(self):
+        """the module of the configured recognizer is imported by get_recognizer"""
+        config.config.set('board', 'recognizer', 'knn')
+        with mock.patch.dict(sys.modules):
+            sys.modules.pop('classifier')
+            del recognizers['knn']
+            self.assertEqual('knn', get_recognizer().name)
+            self.assertIn('classifier', sys.modules)
+        config.config.set('board', 'recognizer', 'unknown')
+        self.assertEqual('template', get_recognizer().name)
+
+    def test_missing_model(self):
+        """without model the knn recognizer uses the template matching"""
+        gray, letters = collect([f'{TEST_DIR}/game01'])[0]
+        config.config.set('path', 'work_dir', tempfile.gettempdir())
+        knn = KnnRecognizer()
+        board = knn.recognize(gray, {}, set(letters))
+        self.assertIsNone(knn.model)
+        self.assertDictEqual(letters, {coord: tile.letter for coord, tile in board.items()})
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_classifier')
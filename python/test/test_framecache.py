@@ -0,0 +1,100 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import os
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config import config
+from customboard import clear_last_warp
+from framecache import FRAME_CACHE_SIZE, FrameCache
+from hardware.crop import BoardCrop
+from processing import check_resume, end_of_game, move, new_game
+from scrabble import Game
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FrameCacheTestCase(unittest.TestCase):
+    """Test class for the frame analysis cache"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        config.is_testing = True
+        clear_last_warp()
+        self.cache = FrameCache()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.is_testing = False
+        return super().tearDown()
+
+    def test_bounded_cache(self):
+        """frames are identified by content, the oldest frames are dropped"""
+        frames = [np.full((100, 100, 3), i, dtype=np.uint8) for i in range(FRAME_CACHE_SIZE + 1)]
+        entries = [self.cache.get(frame) for frame in frames]
+        self.assertEqual(FRAME_CACHE_SIZE, len(self.cache.frames))
+        self.assertIs(entries[-1], self.cache.get(frames[-1].copy()))
+        self.assertIsNot(entries[0], self.cache.get(frames[0]))
+
+    def test_overwritten_frame(self):
+        """the cached frame is a copy, the slot of the frame ring can be reused before the warp"""
+        if not Path(f'{TEST_DIR}/game01/image-2.jpg').is_file():
+            self.skipTest('Image File not available')
+        slot = cv2.imread(f'{TEST_DIR}/game01/image-2.jpg')
+        expected = self.cache.get(slot.copy()).tiles_candidates()
+        self.cache.clear()
+        entry = self.cache.get(slot)
+        slot[:] = 0  # next frame written into the slot
+        self.assertSetEqual(expected, entry.tiles_candidates())
+
+    def test_shared_stages(self):
+        """move, check_resume and end_of_game reuse the stages of the same frame"""
+        if not Path(f'{TEST_DIR}/game01/image-2.jpg').is_file():
+            self.skipTest('Image File not available')
+        images = [cv2.imread(f'{TEST_DIR}/game01/image-{i}.jpg') for i in (1, 2)]
+        game = Game(frames=self.cache)
+        new_game(game)
+        move(game, images[0], 0, (0, 0))
+        check_resume(game, images[0])
+        self.assertDictEqual({'warp': 1, 'filter': 1, 'analyze': 1}, self.cache.misses)
+        self.assertDictEqual({'filter': 1}, self.cache.hits)
+        end_of_game(game, images[1], 1)  # automatic move with the same frame
+        self.assertDictEqual({'warp': 2, 'filter': 2, 'analyze': 2}, self.cache.misses)
+        self.assertDictEqual({'warp': 1, 'filter': 2}, self.cache.hits)
+
+    def test_sessions(self):
+        """frame caches of two sessions neither share frames nor the warp"""
+        other = FrameCache(crop=BoardCrop())
+        frame = np.full((100, 100, 3), 1, dtype=np.uint8)
+        self.assertIsNot(self.cache.get(frame), other.get(frame))
+        self.assertIsNot(self.cache.crop, other.crop)
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_framecache')
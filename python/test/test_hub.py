@@ -0,0 +1,195 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import sys
+import tempfile
+import threading
+import unittest
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from config import config
+from hub import MAX_FILE, TABLE_NAME, Hub
+from utils.upload import Upload, pack, table_name, upload_config
+
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BOARDS = 4
+MOVES = 5
+AUTH = ('board', 'secret')
+
+
+class HubTestCase(unittest.TestCase):
+    """Test class for the tournament hub with simulated boards on localhost"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upload_settings = dict(upload_config.config)
+        self.root = Path(self.tmp.name)
+        self.hub = Hub(self.root / 'hub', auth=AUTH)
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        server = self.run_async(self.hub.start('127.0.0.1', 0))
+        self.url = f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}'
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.run_async(self.hub.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        upload_config.config.clear()
+        upload_config.config.update(self.upload_settings)
+        config.reload(ini_file=None, clean=True)
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def run_async(self, coro):
+        """run coroutine on the loop of the hub"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout=10)
+
+    def move_files(self, folder: Path, move: int) -> dict[str, Path]:
+        """files of a move as written by the board"""
+        folder.mkdir(parents=True, exist_ok=True)
+        files = {f'image-{move}.jpg': folder / f'image-{move}.jpg', f'data-{move}.json': folder / f'data-{move}.json'}
+        files[f'image-{move}.jpg'].write_bytes(bytes(range(256)) * 40)
+        files[f'data-{move}.json'].write_text(json.dumps({'move': move}))
+        (folder / 'status.json').write_text(json.dumps({'move': move, 'table': folder.name}))
+        files['status.json'] = folder / 'status.json'
+        return files
+
+    def board(self, table: str) -> None:
+        """simulated board: one batch per move, the last batch with two moves"""
+        folder = self.root / table
+        with requests.Session() as session:
+            batch: dict[str, Path] = {}
+            for move in range(MOVES):
+                batch.update(self.move_files(folder, move))
+                if move == MOVES - 2:
+                    continue  # e.g. upload failed, sent with the next move
+                ret = session.post(f'{self.url}/upload/{table}', data=pack(batch), auth=HTTPBasicAuth(*AUTH), timeout=5)
+                self.assertEqual(200, ret.status_code, ret.text)
+                batch = {}
+
+    def spectator(self, events: list[tuple[str, dict]], subscribed: threading.Event, count: int) -> None:
+        """read the live feed until count updates are received"""
+        with requests.get(f'{self.url}/live', stream=True, timeout=10) as feed:
+            event = ''
+            for line in feed.iter_lines(chunk_size=1, decode_unicode=True):
+                if line.startswith('event: '):
+                    event = line[7:]
+                elif line.startswith('data: '):
+                    events.append((event, json.loads(line[6:])))
+                    subscribed.set()
+                    if len(events) > count:
+                        return
+
+    def test_boards(self):
+        """concurrent boards upload batches, spectators get the combined feed, files are persisted"""
+        updates = BOARDS * (MOVES - 1)
+        feeds: list[list] = [[], []]
+        subscribed = [threading.Event(), threading.Event()]
+        spectators = [
+            threading.Thread(target=self.spectator, args=(feeds[i], subscribed[i], updates), daemon=True) for i in range(2)
+        ]
+        for i, spectator in enumerate(spectators):
+            spectator.start()
+            self.assertTrue(subscribed[i].wait(5))
+
+        tables = [f'table{i}' for i in range(BOARDS)]
+        with ThreadPoolExecutor(max_workers=BOARDS) as executor:
+            list(executor.map(self.board, tables))
+        for spectator in spectators:
+            spectator.join(timeout=10)
+
+        state = requests.get(f'{self.url}/tables', timeout=5).json()
+        self.assertSetEqual(set(tables), set(state))
+        for table in tables:
+            self.assertEqual(MOVES - 1, state[table]['move'])
+            self.assertDictEqual({'move': MOVES - 1, 'table': table}, state[table]['status'])
+        for feed in feeds:
+            self.assertEqual(('snapshot', {}), feed[0])
+            self.assertEqual(updates, len([event for event, _ in feed if event == 'update']))
+
+        self.run_async(self.hub.flush())
+        for table in tables:
+            persisted = sorted(p.name for p in (self.root / 'hub' / table).iterdir())
+            self.assertEqual(2 * MOVES + 1, len(persisted), persisted)
+        ret = requests.get(f'{self.url}/files/table0/image-1.jpg', timeout=5)
+        self.assertEqual((self.root / 'table0' / 'image-1.jpg').read_bytes(), ret.content)
+
+        ret = requests.post(f'{self.url}/delete/table0', auth=HTTPBasicAuth(*AUTH), timeout=5)
+        self.assertEqual(-1, ret.json()['move'])
+        self.run_async(self.hub.flush())
+        self.assertListEqual(['status.json'], [p.name for p in (self.root / 'hub' / 'table0').iterdir()])
+
+    def test_rejected(self):
+        """uploads need the credentials, a valid table name and a valid zip without oversized files"""
+        batch = pack(self.move_files(self.root / 'board', 0))
+        self.assertEqual(401, requests.post(f'{self.url}/upload/table0', data=batch, timeout=5).status_code)
+        ret = requests.post(f'{self.url}/upload/table.0', data=batch, auth=HTTPBasicAuth(*AUTH), timeout=5)
+        self.assertEqual(400, ret.status_code)
+        ret = requests.post(f'{self.url}/upload/table0', data=b'no zip', auth=HTTPBasicAuth(*AUTH), timeout=5)
+        self.assertEqual(400, ret.status_code)
+        bomb = io.BytesIO()
+        with zipfile.ZipFile(bomb, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('data-0.json', bytes(MAX_FILE + 1))
+        ret = requests.post(f'{self.url}/upload/table0', data=bomb.getvalue(), auth=HTTPBasicAuth(*AUTH), timeout=5)
+        self.assertEqual(413, ret.status_code)
+        self.assertDictEqual({}, requests.get(f'{self.url}/tables', timeout=5).json())
+
+    def test_table_name(self):
+        """host names and configured names are valid table names of the hub"""
+        for name in ('scrabscrap.local', 'board 1', 'Tisch-1_ä', 'x' * 40, '.local'):
+            self.assertIsNotNone(TABLE_NAME.fullmatch(table_name(name)), name)
+        self.assertEqual('scrabscrap', table_name('scrabscrap.fritz.box'))
+        upload_config.config.pop('table', None)
+        self.assertIsNotNone(TABLE_NAME.fullmatch(upload_config.table))
+        upload_config.table = 'board 1'
+        self.assertEqual('board-1', upload_config.table)
+
+    def test_upload_client(self):
+        """the upload of the board collects the moves of an edit and sends them as one batch"""
+        web_dir = self.root / 'web'
+        config.config.set('path', 'web_dir', str(web_dir))
+        upload_config.hub, upload_config.table = self.url, 'board1'
+        upload_config.config['user'], upload_config.config['password'] = AUTH
+        client = Upload()
+        for move in range(3):
+            self.move_files(web_dir, move)
+            self.assertTrue(client.upload_move(move, flush=move == 2))
+        self.assertDictEqual({}, client.batch)
+        state = requests.get(f'{self.url}/tables', timeout=5).json()['board1']
+        self.assertEqual(2, state['move'])
+        self.assertEqual(1, self.hub.tables['board1'].uploads)
+        self.assertTrue(client.delete_files())
+        self.assertEqual(-1, self.hub.tables['board1'].move)
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_hub')
@@ -0,0 +1,188 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import csv
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from config import config
+from customboard import clear_last_warp
+from hardware import camera
+from journal import Journal
+from move import MoveType
+from processing import admin_change_move, admin_ins_challenge, admin_toggle_challenge_type
+from scrabble import Game
+from state import GameSession, GameState
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MOVES = 20  # moves of game01
+
+
+class JournalTestCase(unittest.TestCase):
+    """Test class for the recovery of a game from the journal"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        config.config.set('output', 'upload_server', 'False')
+        config.is_testing = True
+        clear_last_warp()
+        if not Path(config.development.simulate_path.format(MOVES)).is_file():
+            self.skipTest('Image File not available')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'journal.jsonl'
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+        config.is_testing = False
+        config.reload(ini_file=None, clean=True)
+        return super().tearDown()
+
+    def session(self) -> GameSession:
+        """session with its own file camera and a journal"""
+        cam = camera.CameraFile()
+        cam.formatter = config.development.simulate_path
+        cam.resize = False
+        session = GameSession(cam=cam)
+        session.ctx.game.journal = Journal(self.path)
+        return session
+
+    def play(self) -> GameSession:
+        """play the moves of game01, pause and edit the game"""
+        with Path(f'{TEST_DIR}/game01/game.csv').open(encoding='utf-8') as file:
+            rows = list(csv.DictReader(file, skipinitialspace=True))[:MOVES]
+        session = self.session()
+        session.do_new_game()
+        session.ctx.game.set_player_names('Anna', 'Bernd')
+        session.press_button(config.test.start.upper())
+        for row in rows:
+            session.cam.counter = int(row['Move'])  # type: ignore[attr-defined]
+            session.press_button(row['Button'].upper())
+        session.press_button('YELLOW')
+        session.queue.join()
+        game = session.ctx.game
+        admin_ins_challenge(game, 3, MoveType.CHALLENGE_BONUS)
+        admin_toggle_challenge_type(game, 4)
+        admin_change_move(game, len(game.moves) - 1, MoveType.EXCHANGE)
+        game.journal.flush()  # type: ignore[union-attr]
+        return session
+
+    def assert_restored(self, expected: Game, game: Game) -> None:
+        """same moves, boards, scores and bag"""
+        self.assertEqual(expected.nicknames, game.nicknames)
+        self.assertEqual(expected.gamestart, game.gamestart)
+        self.assertListEqual([m.gcg_str for m in expected.moves], [m.gcg_str for m in game.moves])
+        for old, new in zip(expected.moves, game.moves, strict=True):
+            self.assertEqual(old.type, new.type)
+            self.assertDictEqual(old.board, new.board)
+            self.assertDictEqual(old.new_tiles, new.new_tiles)
+            self.assertEqual((old.score, old.played_time, old.rack_size), (new.score, new.played_time, new.rack_size))
+        self.assertListEqual(expected.moves[-1].tiles_in_bag(), game.moves[-1].tiles_in_bag())
+        status = [json.loads(g.json_str()) for g in (expected, game)]
+        for data in status:
+            data.pop('timestamp')
+        self.assertDictEqual(*status)
+
+    def test_restore(self):
+        """the game is rebuilt from snapshot and journal without the recognition"""
+        played = self.play()
+        self.assertTrue(self.path.with_name('journal-snapshot.json').exists())
+        self.assertEqual(MoveType.EXCHANGE, played.ctx.game.moves[-1].type)
+
+        start = time.perf_counter()
+        journal = Journal(self.path)
+        data = journal.load()
+        self.assertIsNotNone(data)
+        game = journal.restore(Game(), data)  # type: ignore[arg-type]
+        elapsed = time.perf_counter() - start
+        logger.info(f'restore of {len(game.moves)} moves: {1000 * elapsed:.1f} ms')
+        self.assertLess(elapsed, 1.0)
+        self.assert_restored(played.ctx.game, game)
+        self.assertEqual(MOVES + 1, len(game.moves))
+        self.assertEqual(MoveType.WITHDRAW, game.moves[4].type)
+
+    def test_session(self):
+        """a restored session continues paused with the clock of the last button press"""
+        played = self.play()
+        player, played_time, _ = played.clock.status()
+        with self.path.open('a', encoding='utf-8') as file:
+            file.write('{"seq": 99, "event": "but')  # power loss while writing
+
+        session = self.session()
+        self.assertTrue(session.do_restore())
+        self.assert_restored(played.ctx.game, session.ctx.game)
+        self.assertEqual(GameState[f'P{player}'], session.ctx.current_state)
+        self.assertEqual((player, played_time), session.clock.status()[:2])
+        self.assertTrue(session.clock.paused)
+
+        session.press_button(f'{("RED", "GREEN")[player]}')  # resume
+        session.ctx.game.journal.flush()  # type: ignore[union-attr]
+        records = [json.loads(line) for line in self.path.read_text(encoding='utf-8').splitlines()]
+        self.assertEqual('button', records[-1]['event'])
+        self.assertEqual(records[-2]['seq'] + 1, records[-1]['seq'])
+
+    def test_reboot(self):
+        """a reboot does not finish the game, it is restored after the reboot"""
+        played = self.play()
+        state = played.ctx.current_state
+        with mock.patch('state.alarm') as alarm:
+            played.press_button('REBOOT')
+        alarm.assert_called_once()
+        self.assertEqual(state, played.ctx.current_state)
+        records = [json.loads(line) for line in self.path.read_text(encoding='utf-8').splitlines()]
+        self.assertIn('reboot', [rec['event'] for rec in records])
+
+        session = self.session()
+        self.assertTrue(session.do_restore())
+        self.assert_restored(played.ctx.game, session.ctx.game)
+        self.assertEqual(state, session.ctx.current_state)
+
+    def test_path(self):
+        """sessions with an output_dir have their own journal"""
+        self.assertEqual(config.path.work_dir / 'journal.jsonl', GameSession().journal_path)
+        paths = {GameSession(output_dir=Path(self.tmp.name) / table).journal_path for table in ('table1', 'table2')}
+        self.assertSetEqual({Path(self.tmp.name) / table / 'journal.jsonl' for table in ('table1', 'table2')}, paths)
+
+    def test_finished(self):
+        """a finished game is not restored"""
+        session = self.session()
+        session.do_new_game()
+        session.press_button(config.test.start.upper())
+        session.cam.counter = 1  # type: ignore[attr-defined]
+        session.press_button('GREEN')
+        session.press_button('YELLOW')
+        session.press_button('RESET')  # end of game
+        session.ctx.game.journal.flush()  # type: ignore[union-attr]
+        self.assertFalse(self.session().do_restore())
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_journal')
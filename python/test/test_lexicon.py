@@ -0,0 +1,104 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from config import config
+from lexicon import Dawg, Lexicon, build, played_words
+from move import Tile
+from scrabble import Game
+
+WORDS = ['ZUG', 'ZUGE', 'TAG', 'TAGE', 'AB', 'ABER', 'BAR', 'BARE', 'ÄRGER', 'EB']
+
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class LexiconTestCase(unittest.TestCase):
+    """Test class for the word check with the lexicon"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        config.reload(ini_file=None, clean=True)
+        config.config.set('path', 'work_dir', self.tmp.name)
+        config.config.set('scrabble', 'lexicon', 'True')
+        (Path(self.tmp.name) / 'lexicon-de.txt').write_text('\n'.join(WORDS), encoding='utf-8')
+        Lexicon.reset()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        Lexicon.reset()
+        config.reload(ini_file=None, clean=True)
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_dawg(self):
+        """words, prefixes and blanks, common suffixes share the nodes"""
+        path = Path(self.tmp.name) / 'test.dawg'
+        self.assertEqual(3, build(['AB', 'CB'], path))
+        build(WORDS, path)
+        dawg = Dawg(path)
+        self.assertTrue(all(word in dawg for word in WORDS))
+        self.assertNotIn('ZU', dawg)
+        self.assertNotIn('ZUGES', dawg)
+        self.assertIn('ärger', dawg)
+        self.assertTrue(dawg.match('T_GE'))
+        self.assertFalse(dawg.match('X_'))
+        dawg.close()
+
+    def test_played_words(self):
+        """main word and cross words of the new tiles"""
+        board = {(7, 7): Tile('Z', 99), (8, 7): Tile('U', 99), (9, 7): Tile('G', 99), (9, 8): Tile('E', 99)}
+        self.assertListEqual([('ZUG', [(7, 7), (8, 7), (9, 7)])], played_words(board, {(7, 7): board[(7, 7)]}))
+        self.assertListEqual([('GE', [(9, 7), (9, 8)])], played_words(board, {(9, 8): board[(9, 8)]}))
+        board[(10, 8)] = Tile('b', 75)  # blank
+        words = {word for word, _ in played_words(board, {(9, 8): board[(9, 8)], (10, 8): board[(10, 8)]})}
+        self.assertSetEqual({'EB', 'GE'}, words)
+
+    def test_correct(self):
+        """low probability tile of an invalid word gets the alternative letter"""
+        board = {(7, 7): Tile('Z', 99), (8, 7): Tile('O', 90), (9, 7): Tile('G', 99)}
+        self.assertListEqual(['ZOG'], Lexicon.invalid_words(board, board))
+        corrected = Lexicon.correct(board, board, lambda coord: [Tile('O', 90), Tile('U', 88), Tile('Q', 80)])
+        self.assertDictEqual({(8, 7): Tile('U', 90)}, corrected)
+        board[(8, 7)] = Tile('O', 99)  # confirmed tiles are not changed
+        self.assertDictEqual({}, Lexicon.correct(board, board, lambda coord: [Tile('U', 88)]))
+
+    def test_json(self):
+        """invalid words are flagged in the move data"""
+        game = Game()
+        new_tiles = {(7, 7): Tile('Z', 99), (8, 7): Tile('U', 99), (9, 7): Tile('G', 99)}
+        game.add_regular(player=0, played_time=(1, 0), img=np.zeros((1, 1)), new_tiles=new_tiles)
+        game.add_regular(player=1, played_time=(1, 1), img=np.zeros((1, 1)), new_tiles={(9, 8): Tile('X', 99)})
+        moves = game.get_json_data()['moves_data']
+        self.assertListEqual([[], ['GX']], [m['invalid_words'] for m in moves])
+        config.config.set('scrabble', 'lexicon', 'False')
+        self.assertNotIn('invalid_words', game.get_json_data()['moves_data'][0])
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_lexicon')
@@ -0,0 +1,181 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import marshal
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+
+from config import config
+from customboard import clear_last_warp
+from processing import move, new_game
+from scrabble import Game
+from utils.metrics import Histogram, Metrics, metrics
+from utils.profiler import MAX_DURATION, SamplingProfiler
+from utils.util import runtime_measure, runtime_trace
+
+TEST_DIR = os.path.dirname(__file__)
+
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+@runtime_measure
+def measured(value: int) -> int:
+    """function with recorded runtime"""
+    return value + 1
+
+
+class MetricsTestCase(unittest.TestCase):
+    """Test class for the metrics registry"""
+
+    def tearDown(self) -> None:
+        metrics.enabled = True
+        return super().tearDown()
+
+    def test_histogram(self):
+        """percentiles of the recent values"""
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.observe(value / 100)
+        result = histogram.as_dict()
+        self.assertEqual(100, result['count'])
+        self.assertAlmostEqual(0.505, result['avg'])
+        self.assertAlmostEqual(0.51, result['p50'])
+        self.assertAlmostEqual(0.96, result['p95'])
+        self.assertAlmostEqual(1.0, result['max'])
+
+    def test_registry(self):
+        """counters, gauges and disabled registry"""
+        registry = Metrics()
+        registry.inc('moves')
+        registry.inc('moves', 2)
+        registry.gauge('queue', lambda: 5)
+        registry.observe('warp', 0.1)
+        registry.enabled = False
+        registry.inc('moves')
+        registry.observe('warp', 0.2)
+        snapshot = registry.snapshot()
+        self.assertDictEqual({'moves': 3}, snapshot['counters'])
+        self.assertDictEqual({'queue': 5}, snapshot['gauges'])
+        self.assertEqual(1, snapshot['histograms']['warp']['count'])
+        registry.reset()
+        self.assertDictEqual({}, registry.snapshot()['histograms'])
+
+    def test_concurrent(self):
+        """snapshots while other threads observe new and existing histograms"""
+        registry = Metrics()
+        threads = 4
+        values = 2000
+
+        def observe(thread: int) -> None:
+            for i in range(values):
+                registry.observe(f'stage{i % 50}', 0.001)
+                registry.observe(f'thread{thread}-{i}', 0.001)
+
+        workers = [threading.Thread(target=observe, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        while any(worker.is_alive() for worker in workers):
+            registry.snapshot()  # must not raise "changed size during iteration"
+        histograms = registry.snapshot()['histograms']
+        self.assertEqual(threads * values, sum(histograms[f'stage{i}']['count'] for i in range(50)))
+
+    def test_runtime_measure(self):
+        """decorated functions are recorded only if metrics are enabled"""
+        count = metrics.snapshot()['histograms'].get('measured', {}).get('count', 0)
+        self.assertEqual(2, measured(1))
+        self.assertEqual(count + 1, metrics.histograms['measured'].count)
+        metrics.enabled = False
+        measured(1)
+        self.assertEqual(count + 1, metrics.histograms['measured'].count)
+
+    def test_runtime_trace(self):
+        """trace collects the timings of the current thread only"""
+        timings: dict[str, float] = {}
+        with runtime_trace(timings):
+            measured(1)
+            measured(2)
+            thread = threading.Thread(target=measured, args=(3,))
+            thread.start()
+            thread.join()
+        measured(4)
+        self.assertListEqual(['measured'], list(timings))
+        with runtime_trace(None):  # no trace
+            measured(5)
+        self.assertListEqual(['measured'], list(timings))
+
+    def test_move_trace(self):
+        """move stores the stage timings in the trace of the new move"""
+        if not Path(f'{TEST_DIR}/game01/image-1.jpg').is_file():
+            self.skipTest('Image File not available')
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        config.is_testing = True
+        clear_last_warp()
+        game = Game()
+        new_game(game)
+        trace = {'press_time': 0.0, 'queued': 0.0}
+        move(game, cv2.imread(f'{TEST_DIR}/game01/image-1.jpg'), 0, (0, 0), trace=trace)
+        self.assertIs(trace, game.moves[-1].trace)
+        self.assertNotIn('queued', trace)
+        for stage in ('queue_wait', 'warp_image', 'analyze', 'add_move', 'processed'):
+            self.assertIn(stage, trace)
+
+    def test_profiler(self):
+        """profiler samples other threads and stops at the time limit"""
+
+        def busy(until: float) -> None:
+            while time.time() < until:
+                sum(range(1000))
+
+        sampler = SamplingProfiler()
+        worker = threading.Thread(target=busy, args=(time.time() + 0.5,), name='busy')
+        worker.start()
+        self.assertTrue(sampler.start(duration=1, interval=0.005))
+        self.assertFalse(sampler.start())  # already running
+        worker.join()
+        sampler.stop()
+        self.assertFalse(sampler.running)
+        self.assertGreater(sampler.count, 0)
+        self.assertIn('busy;', sampler.folded())
+        self.assertTrue(any(func == 'busy' for _, _, func in sampler.pstats()))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = sampler.dump(Path(tmp) / 'profile.pstats')
+            with path.open('rb') as file:
+                self.assertEqual(sampler.pstats().keys(), marshal.load(file).keys())
+            pstats.Stats(str(path)).sort_stats('cumulative')
+        sampler.start(duration=1, interval=0.01)
+        time.sleep(1.2)
+        self.assertFalse(sampler.running)  # hard time limit
+        sampler.start(duration=10 * MAX_DURATION)
+        self.assertEqual(MAX_DURATION, sampler.duration)
+        sampler.stop()
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_metrics')
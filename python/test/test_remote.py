@@ -0,0 +1,112 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+
+from analyzer import TemplateRecognizer, analyze, get_recognizer
+from config import config
+from customboard import clear_last_warp, filter_image, warp_image
+from remote import CROP, FRAME, MAGIC, MAX_META, MAX_SHAPE, RemoteRecognizer, Worker, recv_frame, send_frame
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class RemoteTestCase(unittest.TestCase):
+    """Test class for the recognition on a worker on localhost"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        if not Path(f'{TEST_DIR}/game01/image-5.jpg').is_file():
+            self.skipTest('Image File not available')
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        config.is_testing = True
+        clear_last_warp()
+        warped, self.gray = warp_image(cv2.imread(f'{TEST_DIR}/game01/image-5.jpg'))
+        _, self.candidates = filter_image(warped)
+        self.worker = Worker(('127.0.0.1', 0))
+        threading.Thread(target=self.worker.serve_forever, daemon=True).start()
+        config.config.set('board', 'recognizer', 'remote')
+        config.config.set('board', 'remote_worker', f'127.0.0.1:{self.worker.server_address[1]}')
+        config.config.set('board', 'remote_timeout', '10')
+        self.remote = RemoteRecognizer()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.remote.close()
+        self.worker.shutdown()
+        self.worker.server_close()
+        config.is_testing = False
+        config.reload(ini_file=None, clean=True)
+        return super().tearDown()
+
+    def test_worker(self):
+        """the worker recognizes the same tiles as the board"""
+        expected = TemplateRecognizer().recognize(self.gray, {}, set(self.candidates))
+        self.assertGreater(len(expected), 0)
+        for _ in range(2):  # second move on the same connection
+            board = self.remote.recognize(self.gray, {}, set(self.candidates))
+            self.assertDictEqual(expected, board)
+            self.assertIn('worker', self.remote.last)
+        self.assertEqual('remote', get_recognizer().name)
+        self.assertDictEqual(expected, analyze(self.gray, {}, set(self.candidates)))
+
+    def test_invalid_requests(self):
+        """oversized frames close the connection, invalid shapes and coords are answered with an error"""
+        address = ('127.0.0.1', self.worker.server_address[1])
+        with socket.create_connection(address, timeout=5) as sock:
+            sock.sendall(FRAME.pack(MAGIC, MAX_META + 1, 0))
+            self.assertEqual(b'', sock.recv(1))
+        with socket.create_connection(address, timeout=5) as sock:
+            meta = {'seq': 1, 'language': config.board.language, 'shape': [MAX_SHAPE + 1, 10], 'coords': [], 'board': []}
+            send_frame(sock, meta)
+            self.assertIn('invalid shape', recv_frame(sock)[0]['error'])
+            send_frame(sock, meta | {'shape': [976, 976], 'coords': [[15, 0]]}, bytes(CROP[0] * CROP[1]))
+            self.assertIn('invalid coords', recv_frame(sock)[0]['error'])
+
+    def test_fallback(self):
+        """without answer of the worker the fields are analyzed on the board after the timeout"""
+        silent = socket.create_server(('127.0.0.1', 0))
+        config.config.set('board', 'remote_worker', f'127.0.0.1:{silent.getsockname()[1]}')
+        config.config.set('board', 'remote_timeout', '0.2')
+        expected = TemplateRecognizer().recognize(self.gray, {}, set(self.candidates))
+        try:
+            start = time.perf_counter()
+            self.assertDictEqual(expected, self.remote.recognize(self.gray, {}, set(self.candidates)))
+            self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+            self.assertIn('local', self.remote.last)
+            self.assertGreater(self.remote.retry_at, time.monotonic())
+            self.assertIsNone(self.remote.sock)
+        finally:
+            silent.close()
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_remote')
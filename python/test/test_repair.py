@@ -0,0 +1,144 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from config import config
+from move import MoveType, Tile
+from repair import analyze_tasks, apply_repair, plan_repair
+from scrabble import Game
+
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# H8 AB, H10 Cd (d blank), exchange, 8H AE
+MOVES = [
+    {(7, 7): Tile('A', 99), (8, 7): Tile('B', 99)},
+    {(9, 7): Tile('C', 99), (10, 7): Tile('d', 99)},
+    {},
+    {(7, 8): Tile('E', 99)},
+]
+ON_IMAGE = [set().union(*(tiles.keys() for tiles in MOVES[: i + 1])) for i in range(len(MOVES))]  # fields on image i
+
+
+def image(index: int) -> np.ndarray:
+    """image of move index (the index is the pixel value)"""
+    return np.full((1, 1, 3), index, dtype=np.uint8)
+
+
+def candidate_fields(img: np.ndarray, board_keys: set) -> set:
+    """new tiles on the image in relation to board_keys"""
+    return ON_IMAGE[int(img[0, 0, 0])] - board_keys
+
+
+class RepairTestCase(unittest.TestCase):
+    """Test class for the repair of the moves following an admin edit"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        config.is_testing = True
+        self.game = Game()
+        for i, tiles in enumerate(MOVES):
+            if tiles:
+                self.game.add_regular(i % 2, (i, i), image(i), dict(tiles))
+            else:
+                self.game.add_exchange(i % 2, (i, i), image(i))
+        self.previous_keys = [set(m.board.keys()) for m in self.game.moves]
+        patcher = mock.patch('repair._candidate_fields', side_effect=candidate_fields)
+        self.candidate_fields = patcher.start()
+        self.addCleanup(patcher.stop)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.is_testing = False
+        return super().tearDown()
+
+    def repair(self, index: int, found: dict) -> None:
+        """plan, analyze (found: tiles of the re-analyzed fields) and apply the repair after move index"""
+        planned, tasks = plan_repair(self.game, index, self.previous_keys)
+        with mock.patch('repair.analyze', side_effect=lambda _gray, _board, fields: {c: found[c] for c in fields}):
+            analyze_tasks(planned, tasks)
+        apply_repair(self.game, index, planned)
+
+    def test_last_move(self):
+        """an edit of the last move repairs nothing"""
+        self.assertEqual(({}, []), plan_repair(self.game, len(MOVES) - 1, self.previous_keys))
+        self.candidate_fields.assert_not_called()
+
+    def test_same_fields(self):
+        """an edited letter does not change the occupied fields, the following moves keep their tiles"""
+        self.game.change_move_at(0, MoveType.REGULAR, {(7, 7): Tile('A', 99), (8, 7): Tile('H', 99)})
+        planned, tasks = plan_repair(self.game, 0, self.previous_keys)
+        self.assertEqual([], tasks)
+        self.assertDictEqual({i: MOVES[i] for i in (1, 2, 3)}, planned)
+        self.candidate_fields.assert_not_called()
+        apply_repair(self.game, 0, planned)
+        self.assertEqual('H', self.game.moves[-1].board[(8, 7)].letter)
+        self.assertEqual(
+            [MoveType.REGULAR, MoveType.REGULAR, MoveType.EXCHANGE, MoveType.REGULAR], [m.type for m in self.game.moves]
+        )
+
+    def test_first_move(self):
+        """a tile removed from the first move is found on the next image, only its field is analyzed"""
+        self.game.change_move_at(0, MoveType.REGULAR, {(7, 7): Tile('A', 99)})
+        planned, tasks = plan_repair(self.game, 0, self.previous_keys)
+        self.assertEqual([(1, {(8, 7)})], [(task.index, task.fields) for task in tasks])
+        self.assertDictEqual({1: MOVES[1], 2: {}, 3: MOVES[3]}, planned)  # the blank is reused
+
+        self.repair(0, found={(8, 7): Tile('B', 95)})
+        self.assertDictEqual(MOVES[1] | {(8, 7): Tile('B', 95)}, self.game.moves[1].new_tiles)
+        self.assertEqual(MoveType.EXCHANGE, self.game.moves[2].type)
+        self.assertDictEqual(MOVES[3], self.game.moves[3].new_tiles)
+        self.assertEqual(set(ON_IMAGE[-1]), set(self.game.moves[-1].board.keys()))
+
+    def test_exchange(self):
+        """a tile removed from the move before an exchange makes the exchange a regular move"""
+        self.game.change_move_at(1, MoveType.REGULAR, {(9, 7): Tile('C', 99)})
+        planned, tasks = plan_repair(self.game, 1, self.previous_keys)
+        self.assertEqual([(2, {(10, 7)})], [(task.index, task.fields) for task in tasks])
+        self.assertDictEqual({2: {}, 3: MOVES[3]}, planned)
+
+        self.repair(1, found={(10, 7): Tile('D', 90)})
+        self.assertEqual(MoveType.REGULAR, self.game.moves[2].type)
+        self.assertDictEqual({(10, 7): Tile('D', 90)}, self.game.moves[2].new_tiles)
+        self.assertEqual(MoveType.REGULAR, self.game.moves[3].type)
+
+    def test_modified_move(self):
+        """moves edited by the admin keep their tiles, the removed tile is found on the next image"""
+        self.game.moves[1].is_modified = True
+        self.game.change_move_at(0, MoveType.REGULAR, {(7, 7): Tile('A', 99)})
+        planned, tasks = plan_repair(self.game, 0, self.previous_keys)
+        self.assertEqual([(2, {(8, 7)})], [(task.index, task.fields) for task in tasks])
+        self.assertNotIn(1, planned)
+
+    def test_no_tiles(self):
+        """a regular move without tiles after the repair becomes an exchange"""
+        apply_repair(self.game, 2, {3: {}})
+        self.assertEqual(MoveType.EXCHANGE, self.game.moves[3].type)
+        self.assertEqual(self.game.moves[2].score, self.game.moves[3].score)
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_repair')
@@ -0,0 +1,68 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import os
+import sys
+import unittest
+from pathlib import Path
+
+from config import config
+from replay import replay_game
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ReplayTestCase(unittest.TestCase):
+    """Test class for the headless replay"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        config.config.set('scrabble', 'tournament', 'marker')
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.reload(ini_file=None, clean=True)
+        return super().tearDown()
+
+    def test_replay_game(self):
+        """recorded game is replayed without differences to game.csv"""
+        if not Path(f'{TEST_DIR}/game01/image-1.jpg').is_file():
+            self.skipTest('Image File not available')
+        result = replay_game(f'{TEST_DIR}/game01')
+        self.assertIsNone(result.error)
+        self.assertEqual(27, len(result.moves))
+        self.assertListEqual([], [m for m in result.moves if not m.ok])
+        self.assertEqual(27, len(result.stages['analyze']))
+        self.assertIn('warp_image', result.stages)
+        self.assertFalse(config.is_testing, 'test mode must be restored')
+        self.assertEqual('marker', config.config.get('scrabble', 'tournament'))
+
+    def test_missing_folder(self):
+        """missing images are reported as error"""
+        result = replay_game(f'{TEST_DIR}/missing')
+        self.assertFalse(result.ok)
+        self.assertIn('no images', result.error or '')
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_replay')
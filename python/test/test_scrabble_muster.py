@@ -24,9 +24,9 @@ from pathlib import Path
 
 import cv2
 
+from analyzer import analyze, filter_candidates
 from config import config
-from customboard import clear_last_warp
-from processing import analyze, filter_candidates, filter_image, warp_image
+from customboard import clear_last_warp, filter_image, warp_image
 from scrabble import board_to_string
 
 TEST_DIR = os.path.dirname(__file__)
@@ -0,0 +1,136 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import csv
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from config import config
+from customboard import clear_last_warp
+from hardware import camera
+from state import GameSession, GameState
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MOVES = 8  # moves of game01 played on each board
+
+
+class GameSessionTestCase(unittest.TestCase):
+    """Test class for several game sessions in one process"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        config.config.set('output', 'upload_server', 'False')
+        config.is_testing = True
+        clear_last_warp()
+        if not Path(config.development.simulate_path.format(MOVES)).is_file():
+            self.skipTest('Image File not available')
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.is_testing = False
+        config.reload(ini_file=None, clean=True)
+        return super().tearDown()
+
+    def session(self, output_dir: Path | None = None) -> GameSession:
+        """session with its own file camera"""
+        cam = camera.CameraFile()
+        cam.formatter = config.development.simulate_path
+        cam.resize = False
+        session = GameSession(cam=cam, output_dir=output_dir)
+        session.do_new_game()
+        return session
+
+    def play(self, boards: list[GameSession]) -> None:
+        """play the first moves of game01 interleaved on the boards"""
+        with Path(f'{TEST_DIR}/game01/game.csv').open(encoding='utf-8') as file:
+            rows = list(csv.DictReader(file, skipinitialspace=True))[:MOVES]
+        for board in boards:
+            board.press_button(config.test.start.upper())
+        for row in rows:
+            for board in boards:
+                board.cam.counter = int(row['Move'])  # type: ignore[attr-defined]
+                board.press_button(row['Button'].upper())
+        for board in boards:
+            board.queue.join()
+            board.ctx.game.upload.get_upload_queue().join()
+
+    def test_two_boards(self):
+        """two boards play the same game interleaved with separate game, clock, camera and command queue"""
+        with Path(f'{TEST_DIR}/game01/game.csv').open(encoding='utf-8') as file:
+            rows = list(csv.DictReader(file, skipinitialspace=True))[:MOVES]
+        boards = [self.session(), self.session()]
+        self.assertIsNot(boards[0].queue, boards[1].queue)
+
+        boards[0].press_button(config.test.start.upper())
+        self.assertFalse(boards[0].clock.paused)
+        self.assertTrue(boards[1].clock.paused, 'clock of the other board must not run')
+        self.assertEqual(GameState.START, boards[1].ctx.current_state)
+        boards[1].press_button(config.test.start.upper())
+
+        for row in rows:
+            for board in boards:
+                board.cam.counter = int(row['Move'])  # type: ignore[attr-defined]
+                board.press_button(row['Button'].upper())
+        for board in boards:
+            board.queue.join()
+            self.assertEqual(GameState[rows[-1]['State'].upper()], board.ctx.current_state)
+            self.assertEqual(MOVES, len(board.ctx.game.moves))
+            self.assertEqual((int(rows[-1]['Score1']), int(rows[-1]['Score2'])), board.ctx.game.moves[-1].score)
+        self.assertIsNot(boards[0].ctx.game.moves[-1].board, boards[1].ctx.game.moves[-1].board)
+        self.assertIsNot(boards[0].ctx.op_event, boards[1].ctx.op_event)
+
+    def test_separate_output(self):
+        """boards with an output_dir write their own files, a new game on one board keeps the files of the other"""
+        config.is_testing = False  # write files
+        with tempfile.TemporaryDirectory() as tmp:
+            dirs = [Path(tmp) / 'table1', Path(tmp) / 'table2']
+            boards = [self.session(dirs[0]), self.session(dirs[1])]
+            self.assertIsNot(boards[0].ctx.game.frames, boards[1].ctx.game.frames)
+            self.assertIsNot(boards[0].ctx.game.frames.crop, boards[1].ctx.game.frames.crop)
+            self.assertIs(boards[0].cam.crop, boards[0].ctx.game.frames.crop)
+            self.assertEqual(['table1', 'table2'], [board.ctx.game.upload.table for board in boards])
+            boards[1].ctx.game.set_player_names('Anna', 'Bernd')
+            self.play(boards)
+
+            for board, output_dir in zip(boards, dirs, strict=True):
+                files = {path.name for path in output_dir.iterdir()}
+                self.assertTrue({f'image-{i}.jpg' for i in range(MOVES)} <= files)
+                self.assertTrue({f'data-{i}.json' for i in range(MOVES)} <= files)
+                self.assertIn(f'{board.ctx.game.game_id}.zip.part', files)
+                status = json.loads((output_dir / 'status.json').read_text(encoding='utf-8'))
+                self.assertEqual(board.ctx.game.nicknames[0], status['name1'])
+
+            boards[0].do_new_game()
+            boards[0].ctx.game.upload.get_upload_queue().join()
+            self.assertFalse(list(dirs[0].glob('image-*.jpg')))
+            self.assertEqual(MOVES, len(list(dirs[1].glob('image-*.jpg'))))
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_session')
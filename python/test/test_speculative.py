@@ -0,0 +1,113 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import os
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+
+from config import config
+from customboard import clear_last_warp
+from hardware import camera
+from processing import move, speculate
+from scrabble import Game
+from state import GameSession
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeTestCase(unittest.TestCase):
+    """Test class for speculative recognition"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        config.reload(ini_file=f'{TEST_DIR}/game01/scrabble.ini', clean=True)
+        config.config.set('scrabble', 'speculative', 'True')
+        config.is_testing = True
+        clear_last_warp()
+        if not Path(f'{TEST_DIR}/game01/image-2.jpg').is_file():
+            self.skipTest('Image File not available')
+        self.images = [cv2.imread(f'{TEST_DIR}/game01/image-{i}.jpg') for i in (1, 2)]
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.is_testing = False
+        config.config.set('scrabble', 'speculative', 'False')
+        return super().tearDown()
+
+    def precompute(self, game: Game, img):
+        """sample the same frame twice and run the speculation"""
+        self.assertIsNone(game.speculation.sample(img), 'first sample must not be stable')
+        signature = game.speculation.sample(img)
+        self.assertIsNotNone(signature, 'second sample must be stable')
+        self.assertIsNone(game.speculation.sample(img), 'speculation already pending')
+        speculate(game, img, signature)  # type: ignore[arg-type]
+        self.assertIsNotNone(game.speculation.result)
+
+    def test_reuse(self):
+        """precomputed board is reused if the frame is unchanged"""
+        expected = Game()
+        move(expected, self.images[0], 0, (1, 0))
+
+        game = Game()
+        self.precompute(game, self.images[0])
+        hits = game.speculation.hits
+        move(game, self.images[0], 0, (1, 0))
+        self.assertEqual(hits + 1, game.speculation.hits)
+        self.assertDictEqual(expected.moves[-1].board, game.moves[-1].board)
+        self.assertEqual(expected.moves[-1].score, game.moves[-1].score)
+
+    def test_outdated(self):
+        """precomputed board is dropped if the frame has changed"""
+        game = Game()
+        move(game, self.images[0], 0, (1, 0))
+        self.precompute(game, self.images[0])
+        misses = game.speculation.misses
+        move(game, self.images[1], 1, (1, 1))
+        self.assertEqual(misses + 1, game.speculation.misses)
+        self.assertGreater(len(game.moves[-1].new_tiles), 0, 'new tiles expected')
+
+    def test_session(self):
+        """the speculation of a session runs beside its command queue and is reused by the next move"""
+        cam = camera.CameraFile()
+        cam.formatter = config.development.simulate_path
+        cam.resize = False
+        session = GameSession(cam=cam)
+        session.do_new_game()
+        session.press_button(config.test.start.upper())
+        session.do_speculate()
+        session.do_speculate()  # stable board
+        self.assertIsNotNone(session.speculation_queue)
+        self.assertEqual(0, session.queue.qsize(), 'speculation must not block the command queue')
+        session.speculation_queue.join()  # type: ignore[union-attr]
+        self.assertIsNotNone(session.ctx.game.speculation.result)
+        hits = session.ctx.game.speculation.hits
+        session.press_button('GREEN' if config.test.start.upper() == 'RED' else 'RED')
+        session.queue.join()
+        self.assertEqual(hits + 1, session.ctx.game.speculation.hits)
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_speculative')
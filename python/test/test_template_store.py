@@ -0,0 +1,86 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import imutils
+import numpy as np
+
+from analyzer import TemplateStore, recognizers, tiles_templates
+from framecache import FrameCache
+
+TEST_DIR = os.path.dirname(__file__)
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class TemplateStoreTestCase(unittest.TestCase):
+    """Test class for the pre-normalized template store"""
+
+    def setUp(self):
+        logging.disable(logging.DEBUG)  # nur Info Ausgaben
+        if not Path(f'{TEST_DIR}/game01/image-20.jpg').is_file():
+            self.skipTest('Image File not available')
+        frame = FrameCache().get(cv2.imread(f'{TEST_DIR}/game01/image-20.jpg'))
+        _, self.warped_gray = frame.warp()
+        self.candidates = frame.tiles_candidates()
+        return super().setUp()
+
+    def test_correlate(self):
+        """scores of the store are the maxima of cv2.matchTemplate, several segments with one call"""
+        store = TemplateStore.build(tiles_templates)
+        segments = [
+            imutils.rotate(self.warped_gray[y : y + 80, x : x + 80], angle)
+            for y, x, angle in ((335, 335, 0), (335, 385, 5), (385, 335, -10), (10, 10, 0))
+        ]
+        expected = [
+            [cv2.minMaxLoc(cv2.matchTemplate(segment, t.img, cv2.TM_CCOEFF_NORMED))[1] for t in tiles_templates]
+            for segment in segments
+        ]
+        np.testing.assert_allclose(expected, store.correlate(segments), atol=1e-4)
+
+    def test_cache(self):
+        """store is memory mapped from the cache file and rebuilt if the templates change"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'templates.npy'
+            store = TemplateStore.cached(tiles_templates, path)
+            self.assertIsInstance(store.matrix, np.memmap)
+            self.assertTrue(np.array_equal(TemplateStore.build(tiles_templates).matrix, store.matrix))
+            mtime = path.stat().st_mtime_ns
+            TemplateStore.cached(tiles_templates, path)
+            self.assertEqual(mtime, path.stat().st_mtime_ns)
+            store = TemplateStore.cached(tiles_templates[:-1], path)
+            self.assertEqual(len(tiles_templates) - 1, len(store.names))
+
+    def test_matrix_recognizer(self):
+        """template store recognizes the same tiles as cv2.matchTemplate"""
+        expected = recognizers['template'].recognize(self.warped_gray, {}, set(self.candidates))
+        board = recognizers['matrix'].recognize(self.warped_gray, {}, set(self.candidates))
+        self.assertDictEqual(expected, board)
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_template_store')
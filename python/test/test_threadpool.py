@@ -0,0 +1,63 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import sys
+import threading
+import unittest
+
+from utils.threadpool import Command, CommandWorker, Lane, LaneQueue, lane_metrics
+
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ThreadpoolTestCase(unittest.TestCase):
+    """Test class for command lanes"""
+
+    def test_lane_order(self):
+        """live commands overtake waiting admin/background commands, FIFO within a lane"""
+        q = LaneQueue()
+        done: list[str] = []
+        for name, lane in (('io1', Lane.BACKGROUND), ('edit1', Lane.ADMIN), ('move1', Lane.LIVE), ('edit2', Lane.ADMIN)):
+            q.put_nowait(Command(done.append, name, lane=lane))
+        q.put_nowait(Command(done.append, 'move2'))
+        while not q.empty():
+            q.get_nowait().execute()
+            q.task_done()
+        self.assertEqual(['move1', 'move2', 'edit1', 'edit2', 'io1'], done)
+
+    def test_worker_metrics(self):
+        """worker accounts wait and runtime per lane"""
+        q = LaneQueue()
+        before = lane_metrics()['ADMIN']['count']
+        blocker = threading.Event()
+        q.put_nowait(Command(blocker.wait, 5, lane=Lane.ADMIN))
+        q.put_nowait(Command(lambda: None, lane=Lane.ADMIN))
+        CommandWorker(cmd_queue=q).start()
+        blocker.set()
+        q.join()
+        metrics = lane_metrics()['ADMIN']
+        self.assertEqual(before + 2, metrics['count'])
+        self.assertGreaterEqual(metrics['wait_max'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_threadpool')
@@ -0,0 +1,70 @@
+"""
+This file is part of the scrabble-scraper-v2 distribution
+(https://github.com/scrabscrap/scrabble-scraper-v2)
+Copyright (c) 2025 Rainer Rohloff.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, version 3.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import logging
+import sys
+import unittest
+
+import numpy as np
+
+from config import config
+from game_board.board import GRID_H, GRID_W, OFFSET
+from move import Tile
+from verification import Verification
+
+logging.basicConfig(
+    stream=sys.stdout, level=logging.DEBUG, force=True, format='%(asctime)s [%(levelname)-5.5s] %(funcName)-20s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class VerificationTestCase(unittest.TestCase):
+    """Test class for the adaptive re-verification of tiles"""
+
+    def setUp(self):
+        config.reload(ini_file=None, clean=True)
+        self.verification = Verification()
+        self.warped = np.full((800, 800), 128, dtype=np.uint8)
+        return super().setUp()
+
+    def test_freeze_tiles(self):
+        """confirmed tiles are frozen, low probabilities need verify_moves - 1 confirmations"""
+        board = {(7, 7): Tile('A', 98), (8, 7): Tile('B', 90)}
+        self.verification.update({}, board, self.warped)
+        self.assertSetEqual(set(), self.verification.coords_to_ignore(board, self.warped))
+        self.verification.update(board, board, self.warped)  # first confirmation
+        self.assertSetEqual({(7, 7)}, self.verification.coords_to_ignore(board, self.warped))
+        self.verification.update(board, board, self.warped)  # second confirmation (verify_moves=3)
+        self.assertEqual(1, self.verification.analyzed)
+        self.assertSetEqual({(7, 7), (8, 7)}, self.verification.coords_to_ignore(board, self.warped))
+        changed = {(7, 7): Tile('C', 99), (8, 7): Tile('B', 90)}
+        self.assertSetEqual({(8, 7)}, self.verification.coords_to_ignore(changed, self.warped))  # letter edited
+
+    def test_changed_pixels(self):
+        """a frozen tile is analyzed again if its cell changes"""
+        board = {(7, 7): Tile('A', 98)}
+        self.verification.update({}, board, self.warped)
+        self.verification.update(board, board, self.warped)
+        self.assertSetEqual({(7, 7)}, self.verification.coords_to_ignore(board, self.warped))
+        x, y = OFFSET + 7 * GRID_W, OFFSET + 7 * GRID_H
+        self.warped[y : y + GRID_H, x : x + GRID_W] = 0
+        self.assertSetEqual(set(), self.verification.coords_to_ignore(board, self.warped))
+
+
+if __name__ == '__main__':
+    unittest.main(module='test_verification')